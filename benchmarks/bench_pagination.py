@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark de paginación por offset frente a paginación keyset.
+
+Levanta un OpenProject simulado (aiohttp.web) con una colección de work
+packages y la recorre con `OpenProjectClient.iter_collection` en los dos
+modos. El servidor simula el coste de un OFFSET en base de datos (las filas
+saltadas se leen igualmente) y, entre petición y petición, cambia filas de la
+colección (entran o salen del filtro) como lo harían escrituras concurrentes.
+
+Para cada modo muestra el tiempo total, las peticiones, las filas duplicadas
+que envió el servidor (el cliente las descarta por id) y las filas estables
+(no tocadas durante el recorrido) que el recorrido no llegó a ver.
+
+Uso:
+    python benchmarks/bench_pagination.py --rows 50000 --page-size 100 --churn 5
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from openproject_mcp import OpenProjectClient  # noqa: E402
+
+
+class FakeCollection:
+    """Colección ordenada por id con coste de OFFSET y escrituras concurrentes"""
+
+    def __init__(self, rows: int, churn: int, base_ms: float, row_cost_us: float, seed: int):
+        self.rng = random.Random(seed)
+        # El universo es algo mayor que la colección: hay filas fuera del filtro
+        self.universe = int(rows * 1.2)
+        self.ids = sorted(self.rng.sample(range(1, self.universe + 1), rows))
+        self.churn = churn
+        self.base_ms = base_ms
+        self.row_cost_us = row_cost_us
+        self.reset_run()
+
+    def reset_run(self) -> None:
+        self.requests = 0
+        self.served = 0
+        self.served_ids = set()
+        self.touched = set()
+
+    def mutate(self) -> None:
+        """Sacar y meter filas al azar, desplazando las páginas siguientes"""
+        for _ in range(self.churn):
+            row_id = self.rng.randint(1, self.universe)
+            index = bisect.bisect_left(self.ids, row_id)
+            if index < len(self.ids) and self.ids[index] == row_id:
+                del self.ids[index]
+            else:
+                self.ids.insert(index, row_id)
+            self.touched.add(row_id)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        query = request.query
+        page_size = int(query.get("pageSize", 20))
+        start = 0
+        for entry in json.loads(query.get("filters", "[]")):
+            if "id" in entry and entry["id"]["operator"] == ">":
+                # Con índice por id el cursor es una búsqueda, no un recorrido
+                start = bisect.bisect_right(self.ids, int(entry["id"]["values"][0]))
+        skipped = (int(query.get("offset", 1)) - 1) * page_size
+        rows = self.ids[start + skipped:start + skipped + page_size]
+        total = len(self.ids) - start
+
+        await asyncio.sleep((self.base_ms * 1000 + (skipped + len(rows)) * self.row_cost_us) / 1e6)
+        self.requests += 1
+        self.served += len(rows)
+        self.served_ids.update(rows)
+        self.mutate()
+        return web.json_response({
+            "_type": "Collection",
+            "total": total,
+            "count": len(rows),
+            "pageSize": page_size,
+            "offset": int(query.get("offset", 1)),
+            "_embedded": {"elements": [{"_type": "WorkPackage", "id": row_id} for row_id in rows]},
+        })
+
+
+async def crawl(client: OpenProjectClient, collection: FakeCollection, keyset: bool, page_size: int) -> dict:
+    """Recorrer la colección completa en un modo y medirlo"""
+    collection.reset_run()
+    initial = set(collection.ids)
+    received = 0
+    started = time.perf_counter()
+    async for elements, _total in client.iter_collection(
+        "/work_packages", page_size=page_size, keyset=keyset
+    ):
+        received += len(elements)
+    elapsed = time.perf_counter() - started
+
+    stable = initial - collection.touched
+    return {
+        "mode": "keyset" if keyset else "offset",
+        "seconds": elapsed,
+        "requests": collection.requests,
+        "received": received,
+        "duplicates": collection.served - len(collection.served_ids),
+        "missed": len(stable - collection.served_ids),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--churn", type=int, default=5, help="filas cambiadas por petición")
+    parser.add_argument("--base-ms", type=float, default=2.0, help="latencia fija por petición")
+    parser.add_argument("--row-cost-us", type=float, default=0.5, help="coste por fila leída")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    os.environ.pop("OPENPROJECT_DISK_CACHE", None)
+    collection = FakeCollection(args.rows, args.churn, args.base_ms, args.row_cost_us, args.seed)
+    app = web.Application()
+    app.router.add_get("/api/v3/work_packages", collection.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+
+    client = OpenProjectClient(f"http://127.0.0.1:{args.port}", "benchmark")
+    try:
+        for keyset in (False, True):
+            result = await crawl(client, collection, keyset, args.page_size)
+            print(
+                f"{result['mode']:<7} {result['seconds']:>8.2f}s requests={result['requests']:<6} "
+                f"received={result['received']:<7} duplicates={result['duplicates']:<5} "
+                f"missed={result['missed']}"
+            )
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
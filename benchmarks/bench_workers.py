@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalado por número de workers de server_http.py.
+
+Arranca `uvicorn server_http:create_app --factory --workers N` para cada valor
+de N, lanza carga concurrente contra un endpoint y muestra peticiones/segundo
+y latencias. Por defecto usa `/health`, que no depende de OpenProject, de modo
+que mide el techo del propio adaptador HTTP.
+
+Uso:
+    python benchmarks/bench_workers.py --workers 1 2 4 --concurrency 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    """Esperar a que el servidor responda en /health"""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor en {url} no arrancó en {timeout}s")
+
+
+async def run_load(url: str, path: str, method: str, concurrency: int, duration: float) -> dict:
+    """Enviar peticiones en bucle desde `concurrency` tareas durante `duration` segundos"""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    async with session.request(method, f"{url}{path}") as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                            continue
+                except aiohttp.ClientError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Arrancar uvicorn con la app factory y N workers"""
+    env = dict(os.environ)
+    # Evitar que el rate limiter del adaptador sature el benchmark
+    env.setdefault("RATE_LIMIT", "100000000/minute")
+    env.setdefault("OPENPROJECT_URL", "http://127.0.0.1:9")
+    env.setdefault("OPENPROJECT_API_KEY", "benchmark")
+    env["LOG_LEVEL"] = "WARNING"
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "server_http:create_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+    for workers in args.workers:
+        process = start_server(workers, args.port)
+        try:
+            await wait_until_ready(url)
+            # Calentamiento breve para que todos los workers acepten conexiones
+            await run_load(url, args.path, args.method, args.concurrency, 1.0)
+            result = await run_load(url, args.path, args.method, args.concurrency, args.duration)
+            result["workers"] = workers
+            results.append(result)
+            print(
+                f"workers={workers:<3} rps={result['rps']:>10.1f} "
+                f"p50={result['p50_ms']:>7.2f}ms p99={result['p99_ms']:>7.2f}ms "
+                f"errors={result['errors']}"
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if results:
+        base = results[0]["rps"] or 1.0
+        print("\nEscalado relativo al primer valor:")
+        for result in results:
+            print(f"  {result['workers']} worker(s): x{result['rps'] / base:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
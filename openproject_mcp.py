@@ -8,13 +8,32 @@ standardized interface.
 """
 
 import os
+import re
+import sys
+import csv
+import gzip
 import json
+import tempfile
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import time
+import hashlib
+import sqlite3
+import threading
+import zlib
+import contextvars
+import unicodedata
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Dict, FrozenSet, Iterable, Iterator,
+    List, Optional, Tuple, Union,
+)
+from datetime import date, datetime, timedelta
 import asyncio
 import aiohttp
-from urllib.parse import quote
+from urllib.parse import quote, urlencode
 import base64
 import ssl
 from dotenv import load_dotenv
@@ -41,6 +60,2138 @@ __author__ = "Your Name"
 __license__ = "MIT"
 
 
+# Priority classes for outbound requests, from most to least urgent
+PRIORITY_INTERACTIVE_READ = "interactive_read"
+PRIORITY_INTERACTIVE_WRITE = "interactive_write"
+PRIORITY_BULK = "bulk"
+PRIORITY_REFRESH = "refresh"
+
+# Weighted fair queuing shares: with all lanes backlogged, interactive reads get
+# 8 slots for every slot handed to a cache refresh
+PRIORITY_WEIGHTS = {
+    PRIORITY_INTERACTIVE_READ: 8.0,
+    PRIORITY_INTERACTIVE_WRITE: 4.0,
+    PRIORITY_BULK: 2.0,
+    PRIORITY_REFRESH: 1.0,
+}
+
+# Priority inherited by every request issued in the current task (see
+# OpenProjectClient.priority); None means "derive it from the HTTP method"
+_request_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "openproject_request_priority", default=None
+)
+
+# Dataloaders of the current request scope (see OpenProjectClient.request_scope);
+# None outside a scope, where lookups are still batched but not memoized
+_loader_scope: contextvars.ContextVar[Optional[Dict[Tuple[int, str], "DataLoader"]]] = contextvars.ContextVar(
+    "openproject_loader_scope", default=None
+)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limiter for upstream requests.
+
+    Every request to OpenProject takes a slot before it is sent. While responses
+    come back within the latency target the limit grows by roughly one slot per
+    round-trip window; a timeout, 429 or 5xx cuts it multiplicatively.
+
+    Callers beyond the current limit wait in one lane per priority class and
+    free slots are handed out by weighted fair queuing (PRIORITY_WEIGHTS), so a
+    quick interactive read does not queue behind hundreds of crawl pages.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target: float = 2.0,
+        backoff_factor: float = 0.5,
+        backoff_cooldown: float = 1.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Concurrency allowed before any feedback is received
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            latency_target: Latency (seconds) under which a response counts as healthy
+            backoff_factor: Multiplier applied to the limit on overload
+            backoff_cooldown: Minimum seconds between two consecutive backoffs
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self.backoff_cooldown = backoff_cooldown
+
+        self.in_flight = 0
+        # Per-lane FIFO of (virtual finish tag, future)
+        self._lanes: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {
+            lane: deque() for lane in PRIORITY_WEIGHTS
+        }
+        self._lane_finish: Dict[str, float] = {lane: 0.0 for lane in PRIORITY_WEIGHTS}
+        self._virtual_time = 0.0
+        self._last_backoff = 0.0
+
+        # Metrics
+        self.acquired = 0
+        self.increases = 0
+        self.backoffs = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self.last_latency = 0.0
+        self.lane_stats: Dict[str, Dict[str, float]] = {
+            lane: {"acquired": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for lane in PRIORITY_WEIGHTS
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a slot"""
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _record_wait(self, lane: str, waited: float) -> None:
+        self.acquired += 1
+        self.total_wait += waited
+        self.last_wait = waited
+        self.max_wait = max(self.max_wait, waited)
+        stats = self.lane_stats[lane]
+        stats["acquired"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop the waiter with the smallest virtual finish tag across lanes"""
+        best_lane = None
+        for lane, queue in self._lanes.items():
+            while queue and queue[0][1].done():
+                queue.popleft()  # cancelled while waiting
+            if queue and (best_lane is None or queue[0][0] < self._lanes[best_lane][0][0]):
+                best_lane = lane
+        if best_lane is None:
+            return None
+        tag, waiter = self._lanes[best_lane].popleft()
+        self._virtual_time = max(self._virtual_time, tag)
+        return waiter
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to waiting callers by weighted fair queuing"""
+        while self._has_capacity():
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority: str = PRIORITY_INTERACTIVE_READ) -> None:
+        """
+        Wait for an upstream slot.
+
+        Args:
+            priority: Priority class (one of PRIORITY_WEIGHTS)
+        """
+        lane = priority if priority in self._lanes else PRIORITY_INTERACTIVE_READ
+        if self._has_capacity() and not self.queue_depth:
+            self.in_flight += 1
+            self._record_wait(lane, 0.0)
+            return
+
+        # Start-time fair queuing: a lane that was idle starts at the current
+        # virtual time, a backlogged one continues after its previous request
+        tag = max(self._virtual_time, self._lane_finish[lane]) + 1.0 / PRIORITY_WEIGHTS[lane]
+        self._lane_finish[lane] = tag
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (tag, waiter)
+        self._lanes[lane].append(entry)
+        self._wake_waiters()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self.in_flight -= 1
+                self._wake_waiters()
+            elif entry in self._lanes[lane]:
+                self._lanes[lane].remove(entry)
+            raise
+        self._record_wait(lane, time.monotonic() - started)
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Return a slot and adjust the limit from the request outcome.
+
+        Args:
+            latency: Duration of the upstream request in seconds
+            overloaded: True for timeouts, 429 and 5xx responses
+        """
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight = max(0, self.in_flight - 1)
+        self.last_latency = latency
+
+        now = time.monotonic()
+        if overloaded:
+            if now - self._last_backoff >= self.backoff_cooldown:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_factor)
+                self._last_backoff = now
+                self.backoffs += 1
+                logger.warning(
+                    f"Upstream overloaded, concurrency limit reduced to {int(self.limit)}"
+                )
+        elif latency <= self.latency_target and saturated:
+            # Only grow while the current limit is actually being used
+            if self.limit < self.max_limit:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+                self.increases += 1
+
+        self._wake_waiters()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter state for metrics endpoints"""
+        return {
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "requests": self.acquired,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2)
+            if self.acquired
+            else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "last_wait_ms": round(self.last_wait * 1000, 2),
+            "last_latency_ms": round(self.last_latency * 1000, 2),
+            "increases": self.increases,
+            "backoffs": self.backoffs,
+            "lanes": {
+                lane: {
+                    "weight": PRIORITY_WEIGHTS[lane],
+                    "queue_depth": len(self._lanes[lane]),
+                    "requests": int(stats["acquired"]),
+                    "avg_wait_ms": round(stats["total_wait"] / stats["acquired"] * 1000, 2)
+                    if stats["acquired"]
+                    else 0.0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 2),
+                }
+                for lane, stats in self.lane_stats.items()
+            },
+        }
+
+
+# One limiter per OpenProject instance, shared by every client in the process
+_UPSTREAM_LIMITERS: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_upstream_limiter(base_url: str) -> AdaptiveConcurrencyLimiter:
+    """
+    Return the process-wide limiter for an OpenProject instance.
+
+    Args:
+        base_url: Base URL of the OpenProject instance
+
+    Returns:
+        AdaptiveConcurrencyLimiter: Shared limiter for that instance
+    """
+    limiter = _UPSTREAM_LIMITERS.get(base_url)
+    if limiter is None:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=int(os.getenv("OPENPROJECT_INITIAL_CONCURRENCY", "4")),
+            min_limit=int(os.getenv("OPENPROJECT_MIN_CONCURRENCY", "1")),
+            max_limit=int(os.getenv("OPENPROJECT_MAX_CONCURRENCY", "32")),
+            latency_target=float(os.getenv("OPENPROJECT_LATENCY_TARGET", "2.0")),
+        )
+        _UPSTREAM_LIMITERS[base_url] = limiter
+    return limiter
+
+
+_ISO_DURATION_RE = re.compile(
+    r"^(?P<sign>-)?P(?:(?P<weeks>\d+(?:[.,]\d+)?)W)?(?:(?P<days>\d+(?:[.,]\d+)?)D)?"
+    r"(?:T(?:(?P<hours>\d+(?:[.,]\d+)?)H)?(?:(?P<minutes>\d+(?:[.,]\d+)?)M)?"
+    r"(?:(?P<seconds>\d+(?:[.,]\d+)?)S)?)?$"
+)
+
+
+def parse_iso_duration(value: Any) -> float:
+    """
+    Convert an ISO 8601 duration as returned by OpenProject into hours.
+
+    Handles the forms the API emits ("PT2.5H", "PT1H30M", "P1DT2H", "PT0S");
+    plain numbers are taken as hours already.
+
+    Args:
+        value: Duration string, number or None
+
+    Returns:
+        float: Duration in hours (0.0 for None/empty)
+
+    Raises:
+        ValueError: If the value is not a supported duration
+    """
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = _ISO_DURATION_RE.match(str(value).strip().upper())
+    if not match or str(value).strip().upper() in ("P", "PT", "-P", "-PT"):
+        raise ValueError(f"Invalid ISO 8601 duration: {value!r}")
+
+    parts = {
+        name: float(number.replace(",", "."))
+        for name, number in match.groupdict().items()
+        if name != "sign" and number
+    }
+    hours = (
+        parts.get("weeks", 0.0) * 168
+        + parts.get("days", 0.0) * 24
+        + parts.get("hours", 0.0)
+        + parts.get("minutes", 0.0) / 60
+        + parts.get("seconds", 0.0) / 3600
+    )
+    return -hours if match.group("sign") else hours
+
+
+def time_entry_filters(
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    work_package_id: Optional[int] = None,
+    activity_id: Optional[int] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Build OpenProject filters for time entries.
+
+    Args:
+        project_id: Optional project ID
+        user_id: Optional user ID
+        work_package_id: Optional work package ID
+        activity_id: Optional activity ID
+        from_date: Optional first day (YYYY-MM-DD), inclusive
+        to_date: Optional last day (YYYY-MM-DD), inclusive
+
+    Returns:
+        List[Dict]: Filter list (empty if no criteria)
+
+    Raises:
+        ValueError: If from_date or to_date is not a YYYY-MM-DD date
+    """
+    filters = []
+    for name, value in (
+        ("project", project_id),
+        ("user", user_id),
+        ("workPackage", work_package_id),
+        ("activity", activity_id),
+    ):
+        if value:
+            filters.append({name: {"operator": "=", "values": [str(value)]}})
+    if from_date or to_date:
+        filters.append(
+            {"spentOn": {"operator": "<>d", "values": [
+                _filter_date("from_date", from_date), _filter_date("to_date", to_date),
+            ]}}
+        )
+    return filters
+
+
+# list_work_packages sort keys -> OpenProject sortBy attribute
+WORK_PACKAGE_SORT_FIELDS = {
+    "id": "id",
+    "subject": "subject",
+    "type": "type",
+    "status": "status",
+    "priority": "priority",
+    "assignee": "assignee",
+    "author": "author",
+    "responsible": "responsible",
+    "version": "version",
+    "parent": "parent",
+    "start_date": "startDate",
+    "due_date": "dueDate",
+    "created_at": "createdAt",
+    "updated_at": "updatedAt",
+    "percentage_done": "percentageDone",
+}
+
+
+# Keyword criteria of work_package_filters besides project_id and status
+WORK_PACKAGE_CRITERIA = (
+    "assignee",
+    "author",
+    "responsible",
+    "type_id",
+    "priority_id",
+    "version_id",
+    "parent_id",
+    "subject_contains",
+    "created_since",
+    "updated_since",
+    "updated_before",
+    "due_after",
+    "due_before",
+)
+
+
+def _filter_values(name: str, value: Any, principal: bool = False) -> List[str]:
+    """Ids of a list filter from an int, a list or a comma-separated string"""
+    items = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    values = [str(item).strip() for item in items if str(item).strip()]
+    for item in values:
+        if not item.isdigit() and not (principal and item == "me"):
+            raise ValueError(f"Invalid {name}: {item!r} (expected ids)")
+    return values
+
+
+def _filter_date(name: str, value: Optional[str]) -> str:
+    """Validate a YYYY-MM-DD bound of a date range filter ("" when open)"""
+    if not value:
+        return ""
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r} (expected YYYY-MM-DD)")
+
+
+def work_package_filters(
+    project_id: Optional[int] = None,
+    status: Any = "open",
+    assignee: Any = None,
+    author: Any = None,
+    responsible: Any = None,
+    type_id: Any = None,
+    priority_id: Any = None,
+    version_id: Any = None,
+    parent_id: Any = None,
+    subject_contains: Optional[str] = None,
+    created_since: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    updated_before: Optional[str] = None,
+    due_after: Optional[str] = None,
+    due_before: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Build OpenProject filters for work packages.
+
+    Id criteria accept an id, a list or a comma-separated string; assignee,
+    author and responsible also accept "me", and assignee/responsible "none"
+    for unassigned work packages. Dates are YYYY-MM-DD and inclusive.
+
+    Args:
+        project_id: Optional project ID
+        status: "open", "closed", "all" or status ids
+        assignee: Optional assignee ids
+        author: Optional author ids
+        responsible: Optional accountable user ids
+        type_id: Optional type ids
+        priority_id: Optional priority ids
+        version_id: Optional version ids
+        parent_id: Optional parent work package ids
+        subject_contains: Optional text the subject must contain
+        created_since: Optional first creation day
+        updated_since: Optional first day of last update
+        updated_before: Optional last day of last update
+        due_after: Optional first due date
+        due_before: Optional last due date
+
+    Returns:
+        List[Dict]: Filter list (empty if no criteria)
+
+    Raises:
+        ValueError: If a criterion is malformed
+    """
+    filters = []
+    if project_id:
+        filters.append({"project": {"operator": "=", "values": [str(project_id)]}})
+
+    status = status or "all"
+    if status in ("open", "closed"):
+        filters.append({"status": {"operator": "o" if status == "open" else "c", "values": []}})
+    elif status != "all":
+        filters.append({"status": {"operator": "=", "values": _filter_values("status", status)}})
+
+    for name, argument, value in (
+        ("assignee", "assignee", assignee),
+        ("author", "author", author),
+        ("responsible", "responsible", responsible),
+        ("type", "type_id", type_id),
+        ("priority", "priority_id", priority_id),
+        ("version", "version_id", version_id),
+        ("parent", "parent_id", parent_id),
+    ):
+        if value is None or value == "" or value == []:
+            continue
+        if name in ("assignee", "responsible") and str(value).lower() == "none":
+            filters.append({name: {"operator": "!*", "values": []}})
+        else:
+            principal = name in ("assignee", "author", "responsible")
+            filters.append({name: {"operator": "=", "values": _filter_values(argument, value, principal)}})
+
+    if subject_contains:
+        filters.append({"subject": {"operator": "~", "values": [subject_contains]}})
+
+    for name, since, before in (
+        ("createdAt", ("created_since", created_since), ("", None)),
+        ("updatedAt", ("updated_since", updated_since), ("updated_before", updated_before)),
+        ("dueDate", ("due_after", due_after), ("due_before", due_before)),
+    ):
+        if since[1] or before[1]:
+            filters.append({name: {"operator": "<>d", "values": [
+                _filter_date(*since), _filter_date(*before),
+            ]}})
+    return filters
+
+
+def work_package_sort(sort_by: Any) -> List[List[str]]:
+    """
+    Build an OpenProject sortBy list for work packages.
+
+    Args:
+        sort_by: "field[:asc|desc]" keys of WORK_PACKAGE_SORT_FIELDS, as a list
+            or a comma-separated string (e.g. "priority:desc,due_date")
+
+    Returns:
+        List[List[str]]: [[attribute, direction], ...] (empty if no sort given)
+
+    Raises:
+        ValueError: If a field or direction is unknown
+    """
+    if not sort_by:
+        return []
+    keys = sort_by if isinstance(sort_by, (list, tuple)) else str(sort_by).split(",")
+    sort = []
+    for key in keys:
+        field, _, direction = str(key).strip().partition(":")
+        direction = direction.strip().lower() or "asc"
+        if field not in WORK_PACKAGE_SORT_FIELDS:
+            raise ValueError(
+                f"Unknown sort field: {field!r} (use {', '.join(WORK_PACKAGE_SORT_FIELDS)})"
+            )
+        if direction not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort direction: {direction!r} (use asc or desc)")
+        sort.append([WORK_PACKAGE_SORT_FIELDS[field], direction])
+    return sort
+
+
+def project_filters(active_only: bool = True, name_contains: Optional[str] = None) -> List[Dict]:
+    """
+    Build OpenProject filters for projects.
+
+    Args:
+        active_only: Only active projects
+        name_contains: Optional text the name or identifier must contain
+
+    Returns:
+        List[Dict]: Filter list (empty if no criteria)
+    """
+    filters = []
+    if active_only:
+        filters.append({"active": {"operator": "=", "values": ["t"]}})
+    if name_contains:
+        filters.append({"name_and_identifier": {"operator": "~", "values": [name_contains]}})
+    return filters
+
+
+# count_only/group_by dimensions per collection -> HAL link / OpenProject groupBy attribute
+COUNT_GROUPS = {
+    "work_packages": {
+        "status": "status",
+        "type": "type",
+        "priority": "priority",
+        "assignee": "assignee",
+        "responsible": "responsible",
+        "author": "author",
+        "project": "project",
+        "version": "version",
+        "category": "category",
+    },
+    "projects": {"status": "status", "parent": "parent"},
+    "time_entries": {
+        "user": "user",
+        "project": "project",
+        "work_package": "workPackage",
+        "activity": "activity",
+    },
+    "memberships": {"project": "project", "principal": "principal", "role": "roles"},
+}
+
+# Collections whose endpoint supports groupBy; the others are grouped in one
+# streaming pass over their pages
+GROUPBY_COLLECTIONS = frozenset({"work_packages"})
+
+
+def format_hours(hours: float) -> str:
+    """Format a number of hours without trailing zeros (2.5 -> "2.5", 3.0 -> "3")"""
+    return f"{hours:.2f}".rstrip("0").rstrip(".")
+
+
+def format_count(summary: Dict) -> str:
+    """Compact text for a count_collection() result"""
+    resource = summary["resource"].replace("_", " ")
+    if not summary.get("group_by"):
+        return f"{summary['total']} {resource}"
+    text = f"{summary['total']} {resource} by {summary['group_by']}:\n"
+    for group in summary["groups"]:
+        label = group["name"] or ("none" if group["id"] is None else f"#{group['id']}")
+        text += f"- {label}: {group['count']}\n"
+    return text
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a cached value, in bytes.
+
+    Parsed JSON takes several times its serialized size once it lives in
+    Python dicts and strings; a factor of 4 over the compact JSON length is a
+    cheap, stable estimate (exact sys.getsizeof walks are far slower).
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return 32
+    if isinstance(value, str):
+        return 49 + len(value)
+    try:
+        return 4 * len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class CacheManager:
+    """
+    Global byte budget shared by named cache regions (TTLCache instances).
+
+    Eviction is cost-aware LRU (GreedyDual-Size): every entry gets a priority
+    of `clock + cost / size`, refreshed on each hit; when the budget is
+    exceeded the lowest priority entry goes and the clock advances to it. Big,
+    cheap-to-rebuild entries leave first, small expensive ones stay longest,
+    and anything not used for a while ages out.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Total estimated bytes allowed across all regions
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.regions: Dict[str, "TTLCache"] = {}
+        self._clock = 0.0
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._sequence = 0
+        self.evictions = 0
+
+    def region(self, name: str, ttl: float, max_entries: int = 256, cost: float = 1.0) -> "TTLCache":
+        """
+        Create a region accounted against the shared budget.
+
+        Args:
+            name: Region name, as reported by stats()
+            ttl: Seconds an entry stays valid
+            max_entries: Entry cap of the region on top of the byte budget
+            cost: Relative cost of rebuilding an entry of this region
+        """
+        cache = TTLCache(ttl, max_entries, manager=self, name=name, cost=cost)
+        self.regions[name] = cache
+        return cache
+
+    def _schedule(self, cache: "TTLCache", key: str, size: int) -> int:
+        """Give an entry a fresh priority; returns the sequence that identifies it"""
+        self._sequence += 1
+        heapq.heappush(
+            self._heap, (self._clock + cache.cost * 1024 / max(size, 1), self._sequence, cache.name, key)
+        )
+        # Refreshed priorities leave stale heap items behind: compact now and then
+        if len(self._heap) > 4 * max(64, sum(len(region._entries) for region in self.regions.values())):
+            self._heap = [
+                item for item in self._heap
+                if (entry := self.regions[item[2]]._entries.get(item[3])) is not None and entry[3] == item[1]
+            ]
+            heapq.heapify(self._heap)
+        return self._sequence
+
+    def _make_room(self) -> None:
+        while self.total_bytes > self.max_bytes and self._heap:
+            priority, sequence, name, key = heapq.heappop(self._heap)
+            cache = self.regions[name]
+            entry = cache._entries.get(key)
+            if entry is None or entry[3] != sequence:
+                continue
+            self._clock = priority
+            cache._remove(key)
+            cache.evictions += 1
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the budget, its use and per-region usage"""
+        return {
+            "max_bytes": self.max_bytes,
+            "used_bytes": self.total_bytes,
+            "evictions": self.evictions,
+            "regions": {name: region.stats() for name, region in self.regions.items()},
+        }
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after a fixed time.
+
+    Created through CacheManager.region() it also counts the estimated size of
+    its entries against the manager's global byte budget.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 256,
+        manager: Optional[CacheManager] = None,
+        name: str = "",
+        cost: float = 1.0,
+    ):
+        """
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept before the least recently used is evicted
+            manager: Byte budget to account entries against (optional)
+            name: Region name within the manager
+            cost: Relative cost of rebuilding an entry (eviction weight)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.manager = manager
+        self.name = name
+        self.cost = cost
+        # key -> (expires_at, value, estimated size, manager sequence)
+        self._entries: "OrderedDict[str, Tuple[float, Any, int, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+            if self.manager is not None:
+                self.manager.total_bytes -= entry[2]
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if self.manager is not None:
+            self._entries[key] = entry[:3] + (self.manager._schedule(self, key, entry[2]),)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full"""
+        self._remove(key)
+        size = estimate_size(value) if self.manager is not None else 0
+        if self.manager is not None and size > self.manager.max_bytes:
+            # Would flush everything else and still not fit
+            return
+        sequence = self.manager._schedule(self, key, size) if self.manager is not None else 0
+        self._entries[key] = (time.monotonic() + self.ttl, value, size, sequence)
+        self.bytes += size
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        if self.manager is not None:
+            self.manager.total_bytes += size
+            self.manager._make_room()
+
+    def discard(self, key: str) -> None:
+        """Drop one entry, if present"""
+        self._remove(key)
+
+    def invalidate(self, predicate: Optional[Callable[[str], bool]] = None) -> int:
+        """
+        Drop entries whose key matches the predicate (all entries if None).
+
+        Returns:
+            int: Number of entries removed
+        """
+        keys = [key for key in self._entries if predicate is None or predicate(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# HAL resource types kept in the client's identity map, by API collection. Only
+# these are served from it (work packages are not: their lockVersion must be current)
+IDENTITY_MAP_TYPES = {"User": "users", "Project": "projects"}
+
+_API_PATH_RE = re.compile(r"/api/v3/([a-z_]+)/(\d+)$")
+
+
+def harvest_resources(body: Any, found: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """
+    Collect identity-mapped HAL resources from a response: the response itself
+    and everything nested under `_embedded` (collection elements included).
+
+    Args:
+        body: Parsed response
+        found: Dict to add to
+
+    Returns:
+        Dict[str, Dict]: Resources keyed by "<collection>/<id>" (e.g. "users/5")
+    """
+    found = {} if found is None else found
+    if isinstance(body, list):
+        for item in body:
+            harvest_resources(item, found)
+        return found
+    if not isinstance(body, dict):
+        return found
+    if body.get("_type") in IDENTITY_MAP_TYPES:
+        match = _API_PATH_RE.search(((body.get("_links") or {}).get("self") or {}).get("href") or "")
+        if match and match.group(1) == IDENTITY_MAP_TYPES[body["_type"]]:
+            found[f"{match.group(1)}/{match.group(2)}"] = body
+    for value in (body.get("_embedded") or {}).values():
+        harvest_resources(value, found)
+    return found
+
+
+# Startup warm-up steps (OpenProjectClient.warm_up); WARMUP_STEPS narrows them
+WARMUP_STEPS = [
+    step.strip() for step in os.getenv(
+        "WARMUP_STEPS",
+        "connection,statuses,priorities,types,roles,time_entry_activities,projects,current_user",
+    ).split(",") if step.strip()
+]
+
+
+# Seconds a GET response stays fresh in the persistent cache, per resource (the
+# last collection name in the path). Resources not listed are never stored;
+# OPENPROJECT_DISK_CACHE_TTLS="types=7200,work_packages=0" overrides entries
+DISK_CACHE_TTLS = {
+    "types": 3600,
+    "statuses": 3600,
+    "priorities": 3600,
+    "roles": 3600,
+    "projects": 600,
+    "users": 600,
+    "versions": 600,
+    "work_packages": 60,
+}
+
+
+def cache_resource(endpoint: str) -> Tuple[str, Optional[str]]:
+    """
+    Resource name and item id of an API endpoint.
+
+    /work_packages/12 -> ("work_packages", "12"); /projects/5/work_packages ->
+    ("work_packages", None) since it is a collection.
+    """
+    segments = [segment for segment in endpoint.split("?", 1)[0].split("/") if segment]
+    item = segments[-1] if segments and segments[-1].isdigit() else None
+    for segment in reversed(segments):
+        if not segment.isdigit():
+            return segment, item
+    return "", None
+
+
+class DiskCache:
+    """
+    SQLite-backed response cache that survives restarts.
+
+    Entries are fresh until `expires_at` and may still be served (while a
+    refresh runs) until `stale_until`. Bodies are stored zlib-compressed and
+    the least recently used entries are evicted once `max_bytes` is exceeded.
+    Methods are blocking; call them through asyncio.to_thread().
+    """
+
+    def __init__(self, path: str, max_bytes: int, stale_seconds: float):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: Total size of stored bodies before eviction
+            stale_seconds: How long past expiry an entry may still be served
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, resource TEXT NOT NULL, item TEXT, body BLOB NOT NULL,"
+            " size INTEGER NOT NULL, expires_at REAL NOT NULL, stale_until REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        if "item" not in {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}:
+            self._db.execute("ALTER TABLE entries ADD COLUMN item TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_resource ON entries (resource)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        Return (body, fresh) for a servable entry, or None.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, expires_at, stale_until FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        fresh = row[1] > now
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return json.loads(zlib.decompress(row[0])), fresh
+
+    def set(self, key: str, resource: str, item: Optional[str], body: Any, ttl: float) -> None:
+        """Store a body, evicting least recently used entries when over budget"""
+        blob = zlib.compress(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, resource, item, body, size, expires_at, stale_until, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resource, item, blob, len(blob), now + ttl, now + ttl + self.stale_seconds, now),
+            )
+            self.total_bytes += len(blob) - (previous[0] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target_bytes: int) -> None:
+        # Expired entries go first, then the least recently used ones
+        self._db.execute("DELETE FROM entries WHERE stale_until <= ?", (time.time(),))
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while self.total_bytes > target_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(row[0],) for row in rows])
+            self.total_bytes -= sum(row[1] for row in rows)
+            self.evictions += len(rows)
+
+    def invalidate(self, resource: str, item: Optional[str] = None) -> None:
+        """
+        Drop the cached collections of a resource and, if given, one item of it
+        (after a write or a change notification).
+        """
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM entries WHERE resource = ? AND (item IS NULL OR item = ?)",
+                (resource, item),
+            )
+            self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# OpenProject webhook event prefixes -> API resource names
+WEBHOOK_RESOURCES = {
+    "work_package": "work_packages",
+    "project": "projects",
+    "time_entry": "time_entries",
+    "membership": "memberships",
+    "attachment": "attachments",
+}
+
+
+def normalize_webhook(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn an OpenProject webhook payload into a change event.
+
+    Args:
+        payload: Webhook body, e.g. {"action": "work_package:updated", "work_package": {...}}
+
+    Returns:
+        Dict: resource, action, id, project_id, lock_version, received_at and
+            the resource representation sent by OpenProject (payload)
+
+    Raises:
+        ValueError: If the action is missing or not supported
+    """
+    kind, _, action = str(payload.get("action", "")).partition(":")
+    if kind not in WEBHOOK_RESOURCES or not action:
+        raise ValueError(f"Unsupported webhook action: {payload.get('action')!r}")
+    resource = payload.get(kind) or {}
+    links = resource.get("_links", {})
+    return {
+        "resource": WEBHOOK_RESOURCES[kind],
+        "action": action,
+        "id": str(resource["id"]) if resource.get("id") is not None else None,
+        "project_id": str(resource.get("id")) if kind == "project" else _link_id(links, "project"),
+        "lock_version": resource.get("lockVersion"),
+        "received_at": datetime.utcnow().isoformat(),
+        "payload": resource,
+    }
+
+
+class ChangeStream:
+    """
+    In-process stream of change events (fed by webhooks).
+
+    publish() puts events on a bounded queue without waiting; a dispatcher task
+    runs the registered handlers and copies each event to every subscriber
+    queue. A subscriber that falls behind loses its oldest events.
+    """
+
+    def __init__(self, max_queued: int = 1000):
+        """
+        Args:
+            max_queued: Events buffered before publish() starts rejecting them
+        """
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._handlers: List[Callable[[Dict[str, Any]], Awaitable[None]]] = []
+        self._subscribers: List[asyncio.Queue] = []
+        self.published = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    def add_handler(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Run `handler(event)` for every event, before subscribers see it"""
+        self._handlers.append(handler)
+
+    def subscribe(self, max_queued: int = 100) -> asyncio.Queue:
+        """Return a queue that receives every event published from now on"""
+        queue: asyncio.Queue = asyncio.Queue(max_queued)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue an event for dispatch.
+
+        Returns:
+            bool: False if the queue is full and the event was rejected
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(self.max_queued)
+            self._task = asyncio.ensure_future(self._dispatch(self._queue))
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.published += 1
+        return True
+
+    async def _dispatch(self, queue: asyncio.Queue) -> None:
+        while True:
+            event = await queue.get()
+            for handler in self._handlers:
+                try:
+                    await handler(event)
+                except Exception as e:
+                    logger.error(f"Change handler failed for {event['resource']} #{event['id']}: {e}")
+            for subscriber in list(self._subscribers):
+                if subscriber.full():
+                    subscriber.get_nowait()
+                    self.dropped += 1
+                subscriber.put_nowait(event)
+
+    async def close(self) -> None:
+        """Stop the dispatcher (pending events are discarded)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and counters"""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+        }
+
+
+class DataLoader:
+    """
+    Coalesce id lookups issued in the same event-loop tick into batch calls.
+
+    Every load() made before the loop gets back to its scheduler is collected
+    and resolved by a single call to `batch_fn` (split in chunks of
+    `max_batch`). With `memoize`, repeated loads of an id share one result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        max_batch: int = 100,
+        memoize: bool = True,
+        stats: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            batch_fn: Coroutine mapping a list of ids to {id: value or Exception}
+            max_batch: Maximum ids per batch call
+            memoize: Keep results for later loads of the same id
+            stats: Counters (loads, memo_hits, batches, batched_ids) to update
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.memoize = memoize
+        self.stats = stats if stats is not None else {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._memo: Dict[str, asyncio.Future] = {}
+        self._tasks: set = set()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        self.stats[name] = self.stats.get(name, 0) + amount
+
+    async def load(self, key: Any) -> Any:
+        """Resolve one id (raises the lookup error for that id, if any)"""
+        key = str(key)
+        self._count("loads")
+        future = self._memo.get(key) or self._pending.get(key)
+        if future is not None:
+            self._count("memo_hits")
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending[key] = future
+            if self.memoize:
+                self._memo[key] = future
+        # Shielded: a cancelled caller must not cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Any]) -> List[Any]:
+        """Resolve several ids with as few batch calls as possible"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self) -> None:
+        """Forget memoized results (e.g. after a write)"""
+        self._memo.clear()
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for i in range(0, len(keys), self.max_batch):
+            chunk = keys[i:i + self.max_batch]
+            task = asyncio.ensure_future(self._resolve(chunk, pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: List[str], futures: Dict[str, asyncio.Future]) -> None:
+        self._count("batches")
+        self._count("batched_ids", len(keys))
+        try:
+            results = await self.batch_fn(keys)
+        except Exception as e:
+            results = {key: e for key in keys}
+        for key in keys:
+            future = futures[key]
+            value = results.get(key)
+            if value is None:
+                value = Exception(f"{key} not found")
+            if isinstance(value, BaseException):
+                # Failures are not memoized, so a later load retries
+                if self._memo.get(key) is future:
+                    del self._memo[key]
+                if not future.done():
+                    future.set_exception(value)
+            elif not future.done():
+                future.set_result(value)
+
+
+class ImportRowParser:
+    """
+    Incremental CSV/JSONL parser for uploads that arrive in chunks.
+
+    CSV records may span lines inside quoted fields; a record is complete once
+    its double quotes are balanced. The first CSV record is the header.
+    """
+
+    def __init__(self, fmt: str = "csv"):
+        """
+        Args:
+            fmt: "csv" or "jsonl"
+        """
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+        self._pending = ""
+        self._record = ""
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Parse the complete records in a chunk of text; keeps the remainder"""
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        rows = []
+        for line in lines:
+            row = self._line(line + "\n")
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Parse whatever is left once the input ends"""
+        rows = []
+        if self._pending:
+            row = self._line(self._pending)
+            self._pending = ""
+            if row is not None:
+                rows.append(row)
+        if self._record.strip():
+            # Reported as an invalid row rather than raised: earlier rows may be imported already
+            rows.append({"_error": "Unterminated quoted field at end of CSV input"})
+            self._record = ""
+        return rows
+
+    def _line(self, line: str) -> Optional[Dict[str, Any]]:
+        if self.fmt == "jsonl":
+            if not line.strip():
+                return None
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                return {"_error": f"Invalid JSON: {e}"}
+            return row if isinstance(row, dict) else {"_error": "Each line must be a JSON object"}
+
+        self._record += line
+        if self._record.count('"') % 2:
+            return None
+        record, self._record = self._record, ""
+        if not record.strip():
+            return None
+        values = next(csv.reader([record.rstrip("\r\n")]))
+        if self.header is None:
+            self.header = [name.strip().lstrip("\ufeff") for name in values]
+            return None
+        return {name: value.strip() for name, value in zip(self.header, values)}
+
+
+def _parse_hours(value: Any) -> float:
+    """Hours as a number, "1,5", "1:30" or an ISO 8601 duration"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if ":" in text:
+        hours, minutes = text.split(":", 1)
+        return int(hours) + int(minutes) / 60
+    if text.upper().startswith(("P", "-P")):
+        return parse_iso_duration(text)
+    return float(text.replace(",", "."))
+
+
+def parse_time_entry_row(
+    row: Dict[str, Any], activities: Dict[str, str]
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Validate an imported row and map it to create_time_entry() data.
+
+    Recognised columns: work_package_id (or work_package), hours, spent_on (or
+    date), activity_id or activity (name), comment.
+
+    Args:
+        row: Parsed CSV/JSONL row
+        activities: Lookup of activity ids and lower-cased names to activity ids;
+            empty when the instance does not expose activities
+
+    Returns:
+        Tuple[Optional[Dict], Optional[str]]: (data, None) or (None, error)
+    """
+    if "_error" in row:
+        return None, row["_error"]
+
+    work_package = row.get("work_package_id") or row.get("work_package")
+    try:
+        work_package_id = int(str(work_package).lstrip("#"))
+    except (TypeError, ValueError):
+        return None, f"Invalid work_package_id: {work_package!r}"
+
+    try:
+        hours = _parse_hours(row.get("hours"))
+    except (TypeError, ValueError):
+        return None, f"Invalid hours: {row.get('hours')!r}"
+    if not 0 < hours <= 24:
+        return None, f"hours must be between 0 and 24, got {hours:g}"
+
+    spent_on = row.get("spent_on") or row.get("date")
+    try:
+        spent_on = date.fromisoformat(str(spent_on)).isoformat()
+    except ValueError:
+        return None, f"Invalid spent_on (expected YYYY-MM-DD): {spent_on!r}"
+
+    data = {"work_package_id": work_package_id, "hours": hours, "spent_on": spent_on}
+
+    activity = row.get("activity_id") or row.get("activity")
+    if activity:
+        activity_id = activities.get(str(activity)) or activities.get(str(activity).strip().lower())
+        if activity_id is None and activities:
+            return None, f"Unknown activity: {activity!r}"
+        data["activity_id"] = activity_id or activity
+    if row.get("comment"):
+        data["comment"] = row["comment"]
+    return data, None
+
+
+def _link_id(links: Dict, name: str) -> Optional[str]:
+    """Extract the trailing id from a HAL link href (e.g. /api/v3/users/5 -> "5")"""
+    href = (links.get(name) or {}).get("href")
+    return href.rstrip("/").rsplit("/", 1)[-1] if href else None
+
+
+def _link_group(name: str) -> Callable[[Dict], Tuple[Optional[str], Optional[str]]]:
+    """Group key from a HAL link: (id, title)"""
+    def key(entry: Dict) -> Tuple[Optional[str], Optional[str]]:
+        links = entry.get("_links", {})
+        return _link_id(links, name), (links.get(name) or {}).get("title")
+    return key
+
+
+def _period_group(period: str) -> Callable[[Dict], Tuple[Optional[str], Optional[str]]]:
+    """Group key from spentOn: day (2025-01-31), ISO week (2025-W05) or month (2025-01)"""
+    def key(entry: Dict) -> Tuple[Optional[str], Optional[str]]:
+        spent_on = entry.get("spentOn")
+        if not spent_on:
+            return None, None
+        if period == "day":
+            label = spent_on
+        elif period == "month":
+            label = spent_on[:7]
+        else:
+            year, week, _ = date.fromisoformat(spent_on).isocalendar()
+            label = f"{year}-W{week:02d}"
+        return label, label
+    return key
+
+
+# Dimensions accepted by summarize_time_entries(group_by=...)
+TIME_ENTRY_GROUPS: Dict[str, Callable[[Dict], Tuple[Optional[str], Optional[str]]]] = {
+    "user": _link_group("user"),
+    "project": _link_group("project"),
+    "work_package": _link_group("workPackage"),
+    "activity": _link_group("activity"),
+    "day": _period_group("day"),
+    "week": _period_group("week"),
+    "month": _period_group("month"),
+}
+
+
+# Work package ids per `involved` filter when crawling the relations of a project
+RELATION_ID_CHUNK = 100
+
+# Relation types that constrain scheduling, mapped to the edge direction:
+# True when the edge runs from -> to, False when it runs to -> from
+SCHEDULING_RELATIONS = {
+    "precedes": True,
+    "blocks": True,
+    "follows": False,
+    "blocked": False,
+}
+
+
+def _work_package_duration_days(work_package: Dict) -> float:
+    """Duration in days: the duration field, else the date span, else 0 (milestones)"""
+    if work_package.get("duration"):
+        try:
+            return parse_iso_duration(work_package["duration"]) / 24
+        except ValueError:
+            pass
+    start, due = work_package.get("startDate"), work_package.get("dueDate")
+    if start and due:
+        return float((date.fromisoformat(due) - date.fromisoformat(start)).days + 1)
+    return 0.0
+
+
+def analyze_schedule(
+    work_packages: List[Dict], relations: List[Dict]
+) -> Dict[str, Any]:
+    """
+    Critical path analysis over the precedence relations of a set of work packages.
+
+    Builds a DAG with one node per work package and one edge per scheduling
+    relation (with its lag), then runs a topological sort and the forward and
+    backward passes of the critical path method. Runs in O(V + E).
+
+    Args:
+        work_packages: Work package resources (id, subject, dates, duration)
+        relations: Relation resources; non-scheduling types and relations
+            leaving the given set are ignored
+
+    Returns:
+        Dict: Topological order, per-node earliest/latest start and finish,
+            slack, the critical path and the project duration (in days)
+
+    Raises:
+        Exception: If the relations contain a cycle
+    """
+    nodes = {}
+    for work_package in work_packages:
+        nodes[str(work_package["id"])] = {
+            "id": work_package["id"],
+            "subject": work_package.get("subject"),
+            "duration": _work_package_duration_days(work_package),
+            "start_date": work_package.get("startDate") or work_package.get("date"),
+        }
+
+    successors: Dict[str, List[Tuple[str, float]]] = {key: [] for key in nodes}
+    predecessors: Dict[str, List[Tuple[str, float]]] = {key: [] for key in nodes}
+    edges = 0
+    external = 0
+    for relation in relations:
+        direction = SCHEDULING_RELATIONS.get(relation.get("type"))
+        if direction is None:
+            continue
+        links = relation.get("_links", {})
+        source, target = _link_id(links, "from"), _link_id(links, "to")
+        if not direction:
+            source, target = target, source
+        if source not in nodes or target not in nodes:
+            external += 1
+            continue
+        lag = float(relation.get("lag") or 0)
+        successors[source].append((target, lag))
+        predecessors[target].append((source, lag))
+        edges += 1
+
+    # Kahn's algorithm; the forward pass runs in the same sweep
+    indegree = {key: len(predecessors[key]) for key in nodes}
+    queue = deque(key for key, degree in indegree.items() if degree == 0)
+    order: List[str] = []
+    earliest_start = {key: 0.0 for key in nodes}
+    critical_predecessor: Dict[str, Optional[str]] = {key: None for key in nodes}
+    while queue:
+        key = queue.popleft()
+        order.append(key)
+        finish = earliest_start[key] + nodes[key]["duration"]
+        for successor, lag in successors[key]:
+            candidate = finish + lag
+            if critical_predecessor[successor] is None or candidate > earliest_start[successor]:
+                earliest_start[successor] = candidate
+                critical_predecessor[successor] = key
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                queue.append(successor)
+
+    if len(order) < len(nodes):
+        remaining = sorted((key for key, degree in indegree.items() if degree > 0), key=int)
+        raise Exception(
+            f"Relations contain a cycle; {len(remaining)} work package(s) cannot be "
+            f"ordered (e.g. {', '.join('#' + key for key in remaining[:10])})"
+        )
+
+    earliest_finish = {key: earliest_start[key] + nodes[key]["duration"] for key in nodes}
+    project_duration = max(earliest_finish.values(), default=0.0)
+
+    # Backward pass in reverse topological order
+    latest_finish = {key: project_duration for key in nodes}
+    for key in reversed(order):
+        for successor, lag in successors[key]:
+            candidate = latest_finish[successor] - nodes[successor]["duration"] - lag
+            if candidate < latest_finish[key]:
+                latest_finish[key] = candidate
+
+    # The chain of binding predecessors ending at the latest finish is the critical path
+    critical_path: List[str] = []
+    if order:
+        key = max(order, key=lambda k: earliest_finish[k])
+        while key is not None:
+            critical_path.append(key)
+            key = critical_predecessor[key]
+        critical_path.reverse()
+
+    # Anchor day offsets to the earliest known start date, if any
+    known_starts = [
+        date.fromisoformat(node["start_date"]) - timedelta(days=int(earliest_start[key]))
+        for key, node in nodes.items() if node["start_date"]
+    ]
+    anchor = min(known_starts) if known_starts else None
+
+    def as_date(offset: float) -> Optional[str]:
+        return (anchor + timedelta(days=int(offset))).isoformat() if anchor else None
+
+    results = []
+    for key in order:
+        latest_start = latest_finish[key] - nodes[key]["duration"]
+        slack = round(latest_start - earliest_start[key], 6)
+        results.append({
+            "id": nodes[key]["id"],
+            "subject": nodes[key]["subject"],
+            "duration": nodes[key]["duration"],
+            "earliest_start": earliest_start[key],
+            "earliest_finish": earliest_finish[key],
+            "latest_start": latest_start,
+            "latest_finish": latest_finish[key],
+            "slack": slack,
+            "critical": slack <= 0,
+            "earliest_start_date": as_date(earliest_start[key]),
+            "latest_start_date": as_date(latest_start),
+        })
+
+    return {
+        "work_package_count": len(nodes),
+        "relation_count": edges,
+        "external_relation_count": external,
+        "project_duration": project_duration,
+        "anchor_date": anchor.isoformat() if anchor else None,
+        "topological_order": [nodes[key]["id"] for key in order],
+        "critical_path": [
+            {
+                "id": nodes[key]["id"],
+                "subject": nodes[key]["subject"],
+                "earliest_start": earliest_start[key],
+                "earliest_finish": earliest_finish[key],
+            }
+            for key in critical_path
+        ],
+        "nodes": results,
+    }
+
+
+class RelationConflictError(Exception):
+    """A relation would duplicate an existing one or close a scheduling cycle"""
+
+    def __init__(self, message: str, path: Optional[List[str]] = None, relation_id: Optional[str] = None):
+        super().__init__(message)
+        self.path = path or []
+        self.relation_id = relation_id
+
+
+class RelationGraph:
+    """
+    In-memory index of the relations of one project.
+
+    Scheduling relations (see SCHEDULING_RELATIONS) form a directed graph used
+    to reject cycles; every relation is also indexed by its unordered pair of
+    work packages to reject duplicates. Kept current incrementally by the
+    client's create/update/delete relation methods.
+    """
+
+    def __init__(self, project_id: int, work_package_ids: List[str], relations: List[Dict]):
+        """
+        Args:
+            project_id: The project the graph was loaded for
+            work_package_ids: Ids of the project's work packages
+            relations: Relation resources involving those work packages
+        """
+        self.project_id = project_id
+        self.work_packages = set(work_package_ids)
+        self.loaded_at = time.monotonic()
+        self.relations: Dict[str, Tuple[str, str, str]] = {}
+        self.pairs: Dict[FrozenSet[str], str] = {}
+        self.successors: Dict[str, Dict[str, int]] = {}
+        for relation in relations:
+            self.add(relation)
+
+    def covers(self, *work_package_ids: Any) -> bool:
+        """Whether any of the work packages belongs to this graph"""
+        return any(str(key) in self.work_packages for key in work_package_ids)
+
+    @staticmethod
+    def _edge(source: str, target: str, relation_type: str) -> Optional[Tuple[str, str]]:
+        direction = SCHEDULING_RELATIONS.get(relation_type)
+        if direction is None:
+            return None
+        return (source, target) if direction else (target, source)
+
+    def add(self, relation: Dict) -> None:
+        """Index a relation resource (replacing any previous version of it)"""
+        relation_id = str(relation.get("id"))
+        links = relation.get("_links", {})
+        source, target = _link_id(links, "from"), _link_id(links, "to")
+        if source is None or target is None:
+            return
+        self.remove(relation_id)
+        self._insert(relation_id, source, target, relation.get("type"))
+
+    def _insert(self, relation_id: str, source: str, target: str, relation_type: str) -> None:
+        self.relations[relation_id] = (source, target, relation_type)
+        self.pairs[frozenset((source, target))] = relation_id
+        edge = self._edge(source, target, relation_type)
+        if edge:
+            targets = self.successors.setdefault(edge[0], {})
+            targets[edge[1]] = targets.get(edge[1], 0) + 1
+
+    def remove(self, relation_id: Any) -> None:
+        """Drop a relation from the index, if present"""
+        entry = self.relations.pop(str(relation_id), None)
+        if entry is None:
+            return
+        source, target, relation_type = entry
+        pair = frozenset((source, target))
+        if self.pairs.get(pair) == str(relation_id):
+            del self.pairs[pair]
+        edge = self._edge(source, target, relation_type)
+        if edge:
+            targets = self.successors.get(edge[0], {})
+            targets[edge[1]] = targets.get(edge[1], 1) - 1
+            if targets[edge[1]] <= 0:
+                del targets[edge[1]]
+
+    def find_path(self, start: str, goal: str) -> Optional[List[str]]:
+        """Breadth-first search along scheduling edges; the path or None"""
+        parents: Dict[str, Optional[str]] = {start: None}
+        queue = deque([start])
+        while queue:
+            key = queue.popleft()
+            if key == goal:
+                path = []
+                while key is not None:
+                    path.append(key)
+                    key = parents[key]
+                return path[::-1]
+            for successor in self.successors.get(key, {}):
+                if successor not in parents:
+                    parents[successor] = key
+                    queue.append(successor)
+        return None
+
+    def check(
+        self,
+        from_id: Any,
+        to_id: Any,
+        relation_type: str,
+        relation_id: Optional[Any] = None,
+    ) -> None:
+        """
+        Validate a relation before it is sent to OpenProject.
+
+        Args:
+            from_id: Source work package ID
+            to_id: Target work package ID
+            relation_type: Relation type (precedes, follows, blocks, relates, ...)
+            relation_id: ID of the relation being updated, ignored in the checks
+
+        Raises:
+            RelationConflictError: On self-relations, duplicates or cycles
+        """
+        source, target = str(from_id), str(to_id)
+        if source == target:
+            raise RelationConflictError(f"Work package #{source} cannot be related to itself")
+
+        existing = self.pairs.get(frozenset((source, target)))
+        if existing is not None and existing != str(relation_id):
+            raise RelationConflictError(
+                f"Work packages #{source} and #{target} are already related "
+                f"(relation #{existing}, {self.relations[existing][2]})",
+                relation_id=existing,
+            )
+
+        edge = self._edge(source, target, relation_type)
+        if edge is None:
+            return
+        removed = self.relations.get(str(relation_id)) if relation_id is not None else None
+        if removed:
+            self.remove(relation_id)
+        try:
+            path = self.find_path(edge[1], edge[0])
+        finally:
+            if removed:
+                self._insert(str(relation_id), *removed)
+        if path:
+            cycle = [edge[0]] + path
+            raise RelationConflictError(
+                f"Relation '{relation_type}' from #{source} to #{target} would create a "
+                f"scheduling cycle: {' → '.join('#' + key for key in cycle)}",
+                path=cycle,
+            )
+
+
+class MembershipIndex:
+    """In-memory user × project index of memberships (with their roles)"""
+
+    def __init__(self, memberships: List[Dict]):
+        """
+        Args:
+            memberships: Membership resources to index
+        """
+        self.memberships: Dict[str, Dict] = {}
+        self.by_project: Dict[str, Dict[str, Dict]] = {}
+        self.by_user: Dict[str, Dict[str, Dict]] = {}
+        self.loaded_at = time.monotonic()
+        self.refreshed_at = self.loaded_at
+        self.synced_at = datetime.utcnow()
+        for membership in memberships:
+            self.add(membership)
+
+    def add(self, membership: Dict) -> None:
+        """Index a membership resource, replacing any previous version of it"""
+        key = str(membership.get("id"))
+        self.remove(key)
+        links = membership.get("_links", {})
+        self.memberships[key] = membership
+        self.by_project.setdefault(_link_id(links, "project"), {})[key] = membership
+        self.by_user.setdefault(_link_id(links, "principal"), {})[key] = membership
+
+    def remove(self, membership_id: Any) -> None:
+        """Drop a membership from the index, if present"""
+        membership = self.memberships.pop(str(membership_id), None)
+        if membership is None:
+            return
+        links = membership.get("_links", {})
+        self.by_project.get(_link_id(links, "project"), {}).pop(str(membership_id), None)
+        self.by_user.get(_link_id(links, "principal"), {}).pop(str(membership_id), None)
+
+    def for_project(self, project_id: Any) -> List[Dict]:
+        """Memberships of a project"""
+        return list(self.by_project.get(str(project_id), {}).values())
+
+    def for_user(self, user_id: Any) -> List[Dict]:
+        """Memberships of a user (or group)"""
+        return list(self.by_user.get(str(user_id), {}).values())
+
+
+_WORD_SPLIT_RE = re.compile(r"[\s.@_+-]+")
+
+
+def fold_text(text: Any) -> str:
+    """Lower-case and strip accents ("María" -> "maria") for matching"""
+    decomposed = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _deletes(word: str) -> List[str]:
+    """Every string obtained by removing one character"""
+    return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting an adjacent transposition as one edit"""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class UserDirectory:
+    """
+    Searchable in-memory directory of users.
+
+    Names, logins and e-mails are folded (case and accents) and split into
+    words kept in a sorted list, so a prefix lookup is a binary search. When no
+    user matches every query word by prefix, words one edit away (typo,
+    missing/extra letter or swapped neighbours) are looked up through an index
+    of single-character deletions built at load time.
+    """
+
+    def __init__(self, users: List[Dict]):
+        """
+        Args:
+            users: User (or principal) resources
+        """
+        self.users: List[Dict] = users
+        self.loaded_at = time.monotonic()
+        self._fields: List[Tuple[str, str, str]] = []
+        self._words: List[Tuple[str, ...]] = []
+        tokens: Dict[str, List[int]] = {}
+        for position, user in enumerate(users):
+            name = fold_text(user.get("name") or " ".join(
+                filter(None, (user.get("firstName"), user.get("lastName")))
+            ))
+            login = fold_text(user.get("login"))
+            email = fold_text(user.get("email"))
+            self._fields.append((name, login, email))
+            words = tuple(
+                word for word in set(_WORD_SPLIT_RE.split(f"{name} {login} {email}")) | {login} if word
+            )
+            self._words.append(words)
+            for word in words:
+                tokens.setdefault(word, []).append(position)
+        self._tokens: List[str] = sorted(tokens)
+        self._postings: List[List[int]] = [tokens[token] for token in self._tokens]
+
+        # Whole-field matches, plus a static order for prefix matches: shorter
+        # names first (the query covers more of them), then alphabetical
+        self._exact: Dict[str, List[int]] = {}
+        for position, fields in enumerate(self._fields):
+            for field in set(fields):
+                if field:
+                    self._exact.setdefault(field, []).append(position)
+        self._lengths = [max(len(name), len(login), 1) for name, login, _ in self._fields]
+        order = sorted(range(len(users)), key=lambda position: (self._lengths[position], self._fields[position][0]))
+        self._rank = [0] * len(users)
+        for rank, position in enumerate(order):
+            self._rank[position] = rank
+
+        # Words with digits (numbered logins, e-mail suffixes) are not typo-matched
+        self._deletes: Dict[str, List[int]] = {}
+        for i, token in enumerate(self._tokens):
+            if not any(char.isdigit() for char in token):
+                for variant in [token] + _deletes(token):
+                    self._deletes.setdefault(variant, []).append(i)
+
+    def _prefix_range(self, prefix: str) -> range:
+        """Indexes of the words that start with `prefix`"""
+        return range(bisect_left(self._tokens, prefix), bisect_left(self._tokens, prefix + "\uffff"))
+
+    def _prefix(self, prefix: str) -> set:
+        """Users having a word that starts with `prefix`"""
+        found: set = set()
+        for i in self._prefix_range(prefix):
+            found.update(self._postings[i])
+        return found
+
+    def _fuzzy(self, word: str) -> Dict[int, int]:
+        """Users having a word one edit away from `word`, with that distance"""
+        candidates = set()
+        for variant in [word] + _deletes(word):
+            candidates.update(self._deletes.get(variant, ()))
+        found: Dict[int, int] = {}
+        for i in candidates:
+            distance = _edit_distance(word, self._tokens[i])
+            if distance <= 1:
+                for position in self._postings[i]:
+                    found[position] = min(distance, found.get(position, distance))
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Dict, float, str]]:
+        """
+        Find users by name, login or e-mail.
+
+        Args:
+            query: Free text, e.g. "maria", "mlopez", "maría ló", "mraia"
+            limit: Maximum results
+
+        Returns:
+            List[Tuple[Dict, float, str]]: (user, score, match kind) best first;
+                match kind is "exact", "prefix" or "fuzzy"
+        """
+        folded = fold_text(query).strip()
+        words = [word for word in _WORD_SPLIT_RE.split(folded) if word]
+        if not words:
+            return []
+
+        # Start from the most selective word and check the others per candidate,
+        # so common words ("com", "example") never materialize large sets
+        def postings(word: str) -> int:
+            return sum(len(self._postings[i]) for i in self._prefix_range(word))
+
+        first, *rest = sorted(set(words), key=postings)
+        candidates = self._prefix(first)
+        if rest:
+            candidates = {
+                position for position in candidates
+                if all(any(token.startswith(word) for token in self._words[position]) for word in rest)
+            }
+
+        scored: List[Tuple[float, int, str]] = []
+        if candidates:
+            exact = candidates.intersection(self._exact.get(folded, ()))
+            scored.extend((1.0, position, "exact") for position in exact)
+            # Only the best `limit` prefix matches are scored
+            for position in heapq.nsmallest(limit, candidates - exact, key=self._rank.__getitem__):
+                scored.append((0.5 + 0.45 * len(folded) / self._lengths[position], position, "prefix"))
+        else:
+            # Every word must match by prefix or within one edit
+            distances: Optional[Dict[int, int]] = None
+            for word in words:
+                found = {position: 0 for position in self._prefix(word)} if len(word) < 4 else {}
+                for position, distance in self._fuzzy(word).items():
+                    found.setdefault(position, distance)
+                distances = found if distances is None else {
+                    position: distances[position] + found[position]
+                    for position in distances.keys() & found.keys()
+                }
+                if not distances:
+                    break
+            for position, distance in (distances or {}).items():
+                scored.append((0.45 - 0.1 * distance, position, "fuzzy"))
+
+        rank = self._rank
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], rank[item[1]]))
+        return [(self.users[position], round(score, 3), kind) for score, position, kind in best]
+
+
+# Columns stored in project snapshots, in order
+SNAPSHOT_COLUMNS = (
+    "id", "subject", "status", "closed", "assignee_id", "assignee",
+    "start_date", "due_date", "percentage_done", "updated_at",
+)
+
+# Older snapshots were stored with one-second ids (no ".ffffff" part)
+_SNAPSHOT_ID_RE = re.compile(r"^\d{8}T\d{6}(?:\.\d{6})?Z(?:-[A-Za-z0-9_-]{1,64})?$")
+
+
+def build_snapshot(
+    project_id: int, work_packages: List[Dict], closed_status_ids: set, label: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a columnar snapshot (one list per field) of a project's work packages.
+
+    Args:
+        project_id: The project ID
+        work_packages: Work package resources
+        closed_status_ids: Ids (as strings) of statuses that count as closed
+        label: Optional label stored with the snapshot
+
+    Returns:
+        Dict: Snapshot with metadata and a "columns" mapping
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in SNAPSHOT_COLUMNS}
+    for work_package in work_packages:
+        links = work_package.get("_links", {})
+        status_id = _link_id(links, "status")
+        columns["id"].append(work_package.get("id"))
+        columns["subject"].append(work_package.get("subject"))
+        columns["status"].append((links.get("status") or {}).get("title"))
+        columns["closed"].append(status_id in closed_status_ids)
+        columns["assignee_id"].append(_link_id(links, "assignee"))
+        columns["assignee"].append((links.get("assignee") or {}).get("title"))
+        columns["start_date"].append(work_package.get("startDate") or work_package.get("date"))
+        columns["due_date"].append(work_package.get("dueDate") or work_package.get("date"))
+        columns["percentage_done"].append(work_package.get("percentageDone"))
+        columns["updated_at"].append(work_package.get("updatedAt"))
+
+    taken_at = datetime.utcnow()
+    # Microseconds keep snapshots taken within the same second apart
+    snapshot_id = taken_at.strftime("%Y%m%dT%H%M%S.%fZ")
+    if label:
+        snapshot_id += "-" + re.sub(r"[^A-Za-z0-9_-]+", "-", label).strip("-")[:64]
+    return {
+        "id": snapshot_id,
+        "project_id": project_id,
+        "taken_at": taken_at.isoformat() + "Z",
+        "label": label,
+        "count": len(columns["id"]),
+        "columns": columns,
+    }
+
+
+def diff_snapshots(base: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare two snapshots of the same project in O(n).
+
+    Args:
+        base: Older snapshot
+        target: Newer snapshot
+
+    Returns:
+        Dict: Created, removed, closed, reopened, reassigned, rescheduled,
+            status-changed and progress-changed work packages
+    """
+    def rows(snapshot: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        columns = snapshot["columns"]
+        names = list(columns)
+        return {
+            values[0]: dict(zip(names, values))
+            for values in zip(*(columns[name] for name in names))
+        }
+
+    before, after = rows(base), rows(target)
+    changes: Dict[str, List[Dict[str, Any]]] = {
+        name: [] for name in (
+            "created", "removed", "closed", "reopened", "reassigned",
+            "rescheduled", "status_changed", "progress_changed",
+        )
+    }
+
+    for key, new in after.items():
+        old = before.get(key)
+        if old is None:
+            changes["created"].append(
+                {"id": key, "subject": new["subject"], "status": new["status"], "assignee": new["assignee"]}
+            )
+            continue
+        item = {"id": key, "subject": new["subject"]}
+        if new["closed"] and not old["closed"]:
+            changes["closed"].append(dict(item, **{"from": old["status"], "to": new["status"]}))
+        elif old["closed"] and not new["closed"]:
+            changes["reopened"].append(dict(item, **{"from": old["status"], "to": new["status"]}))
+        elif old["status"] != new["status"]:
+            changes["status_changed"].append(dict(item, **{"from": old["status"], "to": new["status"]}))
+        if old["assignee_id"] != new["assignee_id"]:
+            changes["reassigned"].append(dict(item, **{"from": old["assignee"], "to": new["assignee"]}))
+        if (old["start_date"], old["due_date"]) != (new["start_date"], new["due_date"]):
+            changes["rescheduled"].append(dict(
+                item,
+                **{
+                    "from": {"start_date": old["start_date"], "due_date": old["due_date"]},
+                    "to": {"start_date": new["start_date"], "due_date": new["due_date"]},
+                },
+            ))
+        if old["percentage_done"] != new["percentage_done"]:
+            changes["progress_changed"].append(
+                dict(item, **{"from": old["percentage_done"], "to": new["percentage_done"]})
+            )
+
+    for key, old in before.items():
+        if key not in after:
+            changes["removed"].append({"id": key, "subject": old["subject"], "status": old["status"]})
+
+    return {
+        "project_id": target.get("project_id"),
+        "base": {"id": base["id"], "taken_at": base["taken_at"], "count": base["count"]},
+        "target": {"id": target["id"], "taken_at": target["taken_at"], "count": target["count"]},
+        "summary": {name: len(items) for name, items in changes.items()},
+        "changes": changes,
+    }
+
+
+def _tree_node(work_package: Dict) -> Dict[str, Any]:
+    """Compact representation of a work package for hierarchy trees"""
+    links = work_package.get("_links", {})
+    return {
+        "id": work_package.get("id"),
+        "subject": work_package.get("subject"),
+        "type": (links.get("type") or {}).get("title"),
+        "status": (links.get("status") or {}).get("title"),
+        "assignee": (links.get("assignee") or {}).get("title"),
+        "percentage_done": work_package.get("percentageDone"),
+    }
+
+
+def build_work_package_tree(
+    root: Dict, descendants: List[Dict], max_depth: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Nest a flat list of descendants under their root work package.
+
+    The parent index and the roll-ups are built in O(n): descendant count,
+    average done ratio and status histogram of each subtree are always
+    computed over the full hierarchy, even where max_depth cuts the output.
+
+    Args:
+        root: The root work package resource
+        descendants: All its descendant work package resources, in any order
+        max_depth: Optional number of levels to include below the root
+
+    Returns:
+        Dict: Root node with nested "children" and roll-up fields
+    """
+    root_id = str(root.get("id"))
+    nodes = {root_id: _tree_node(root)}
+    children: Dict[str, List[str]] = {root_id: []}
+    for work_package in descendants:
+        key = str(work_package.get("id"))
+        nodes[key] = _tree_node(work_package)
+        children.setdefault(key, [])
+    for work_package in descendants:
+        parent = _link_id(work_package.get("_links", {}), "parent")
+        # Orphans (parent outside the result) hang from the root
+        children[parent if parent in nodes else root_id].append(str(work_package.get("id")))
+
+    # Breadth-first order gives depths; its reverse is a valid bottom-up order
+    order = [root_id]
+    depth = {root_id: 0}
+    for key in order:
+        for child in children[key]:
+            if child not in depth:
+                depth[child] = depth[key] + 1
+                order.append(child)
+
+    for key in reversed(order):
+        node = nodes[key]
+        statuses: Dict[str, int] = {}
+        count = 0
+        done_sum = 0.0
+        done_count = 0
+        for child in children[key]:
+            child_node = nodes[child]
+            count += 1 + child_node["descendant_count"]
+            status = child_node["status"] or "Unknown"
+            statuses[status] = statuses.get(status, 0) + 1
+            for name, value in child_node["_status_totals"].items():
+                statuses[name] = statuses.get(name, 0) + value
+            if child_node["percentage_done"] is not None:
+                done_sum += child_node["percentage_done"]
+                done_count += 1
+            done_sum += child_node["_done_sum"]
+            done_count += child_node["_done_count"]
+        node.update({
+            "depth": depth[key],
+            "child_count": len(children[key]),
+            "descendant_count": count,
+            "done_ratio": round(done_sum / done_count, 1) if done_count else None,
+            "status_counts": statuses,
+            "_status_totals": statuses,
+            "_done_sum": done_sum,
+            "_done_count": done_count,
+        })
+
+    for key in order:
+        node = nodes[key]
+        for name in ("_status_totals", "_done_sum", "_done_count"):
+            del node[name]
+        if max_depth is not None and depth[key] >= max_depth:
+            node["children"] = []
+            node["truncated"] = bool(children[key])
+        else:
+            node["children"] = [nodes[child] for child in children[key]]
+            node["truncated"] = False
+
+    return nodes[root_id]
+
+
 class OpenProjectClient:
     """Client for the OpenProject API v3 with optional proxy support"""
 
@@ -57,6 +2208,104 @@ class OpenProjectClient:
         self.api_key = api_key
         self.proxy = proxy
 
+        # Pooled HTTP session, created lazily on the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pool_size = int(os.getenv("OPENPROJECT_POOL_SIZE", "20"))
+
+        # Adaptive concurrency limit towards this OpenProject instance
+        self.limiter = get_upstream_limiter(self.base_url)
+
+        # Every in-memory cache below is a region of one byte budget. Aggregates
+        # cost whole crawls to rebuild, so they are weighted to stay longest
+        self.caches = CacheManager(int(float(os.getenv("OPENPROJECT_CACHE_MAX_MB", "64")) * 1024 * 1024))
+
+        # Aggregation results keyed by their filter set
+        self.cache_ttl = float(os.getenv("OPENPROJECT_CACHE_TTL", "300"))
+        self._summary_cache = self.caches.region("time_entry_summaries", self.cache_ttl, cost=10.0)
+        # Schedule analyses per project, dropped whenever a relation or date changes
+        self._schedule_cache = self.caches.region("schedules", self.cache_ttl, max_entries=32, cost=10.0)
+
+        # Workload matrices change constantly, so they get a short TTL of their own
+        self._workload_cache = self.caches.region(
+            "workload", float(os.getenv("OPENPROJECT_WORKLOAD_TTL", "60")), max_entries=32, cost=10.0
+        )
+
+        # Membership index shared by list_project_members/list_user_projects: changes
+        # are pulled every OPENPROJECT_MEMBERSHIP_TTL seconds and the index is
+        # rebuilt every OPENPROJECT_MEMBERSHIP_REBUILD seconds (to drop deletions)
+        self._membership_index: Optional[MembershipIndex] = None
+        self._membership_refresh: Optional[asyncio.Task] = None
+        self.membership_ttl = float(os.getenv("OPENPROJECT_MEMBERSHIP_TTL", "60"))
+        self.membership_rebuild = float(os.getenv("OPENPROJECT_MEMBERSHIP_REBUILD", "3600"))
+
+        # Point-in-time project snapshots (gzip JSON, one directory per project)
+        self.snapshot_dir = os.getenv(
+            "SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "openproject_mcp_snapshots")
+        )
+
+        # Reference data (activities, known work package ids) used to validate imports
+        self._reference_cache = self.caches.region("reference", self.cache_ttl, max_entries=50000, cost=5.0)
+        self.import_concurrency = int(os.getenv("OPENPROJECT_IMPORT_CONCURRENCY", "8"))
+
+        # Relation graphs per project, used to reject cycles and duplicates locally
+        self._relation_graphs: Dict[int, RelationGraph] = {}
+        self._relation_graph_loads: Dict[int, asyncio.Task] = {}
+        self.relation_precheck = os.getenv("OPENPROJECT_RELATION_PRECHECK", "true").lower() == "true"
+
+        # Optional persistent response cache (OPENPROJECT_DISK_CACHE=path/to/cache.sqlite)
+        self.disk_cache: Optional[DiskCache] = None
+        self.disk_cache_ttls = dict(DISK_CACHE_TTLS)
+        self._revalidations: Dict[str, asyncio.Task] = {}
+        disk_cache_path = os.getenv("OPENPROJECT_DISK_CACHE", "")
+        if disk_cache_path:
+            for item in filter(None, os.getenv("OPENPROJECT_DISK_CACHE_TTLS", "").split(",")):
+                resource, _, ttl = item.partition("=")
+                self.disk_cache_ttls[resource.strip()] = float(ttl)
+            self.disk_cache = DiskCache(
+                disk_cache_path,
+                max_bytes=int(float(os.getenv("OPENPROJECT_DISK_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                stale_seconds=float(os.getenv("OPENPROJECT_DISK_CACHE_STALE", "86400")),
+            )
+
+        # Change events (webhooks) keep the caches above fresh without polling
+        self.changes = ChangeStream(int(os.getenv("OPENPROJECT_CHANGE_QUEUE", "1000")))
+        self.changes.add_handler(self.apply_change)
+
+        # Searchable user directory behind find_user
+        self._user_directory: Optional[UserDirectory] = None
+        self._user_directory_load: Optional[asyncio.Task] = None
+        self.user_directory_ttl = float(os.getenv("OPENPROJECT_USER_DIRECTORY_TTL", "600"))
+
+        # Users and projects seen embedded in any response, so get_user/get_project
+        # can skip the request while the copy is fresh
+        self._identity_map = self.caches.region(
+            "entities",
+            float(os.getenv("OPENPROJECT_IDENTITY_TTL", "60")),
+            max_entries=int(os.getenv("OPENPROJECT_IDENTITY_MAX", "10000")),
+        )
+
+        # Dataloaders for users/projects/work packages referenced by id; outside
+        # a request_scope() lookups are batched but not memoized
+        self.loader_stats: Dict[str, int] = {}
+        self._loaders: Dict[str, DataLoader] = {}
+        self._unbatchable: set = set()
+
+        # Sequential crawls (iter_collection and the auto-pagination loops)
+        # page with an `id >` cursor unless set to "offset"
+        self.crawl_mode = os.getenv("OPENPROJECT_CRAWL_MODE", "keyset").lower()
+        self._keyset_unsupported: set = set()
+
+        # Crawls ask for max_page_size until a reply shows the server clamps a
+        # collection lower; that limit is then used for every later page
+        self.max_page_size = int(os.getenv("OPENPROJECT_MAX_PAGE_SIZE", "10000"))
+        self.page_size_limits: Dict[str, int] = {}
+
+        # Collection elements received from OpenProject, per resource
+        self.transfer_stats: Dict[str, int] = {}
+        # Collections whose server ignored groupBy (count_collection streams them instead)
+        self._ungroupable: set = set()
+
         # Setup headers with Basic Auth
         self.headers = {
             "Authorization": f"Basic {self._encode_api_key()}",
@@ -74,12 +2323,47 @@ class OpenProjectClient:
         credentials = f"apikey:{self.api_key}"
         return base64.b64encode(credentials.encode()).decode()
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the pooled HTTP session, creating it if needed.
+
+        The session is bound to the event loop it was created on, so a new one
+        is opened when the client is reused from a different loop (e.g. one
+        process per worker, or successive asyncio.run() calls).
+
+        Returns:
+            aiohttp.ClientSession: Shared session for this client
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            ssl_context = ssl.create_default_context()
+            connector = aiohttp.TCPConnector(ssl=ssl_context, limit=self.pool_size)
+            timeout = aiohttp.ClientTimeout(total=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._session_loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session (if any)"""
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        await self.changes.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
     async def _request(
         self,
         method: str,
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
+        priority: Optional[str] = None,
     ) -> Dict:
         """
         Execute an API request.
@@ -88,6 +2372,9 @@ class OpenProjectClient:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint path
             data: Optional request body data
+            params: Optional query parameters
+            priority: Scheduling class; defaults to the enclosing priority()
+                block, or interactive read/write depending on the method
 
         Returns:
             Dict: Response data from the API
@@ -97,59 +2384,468 @@ class OpenProjectClient:
         """
         url = f"{self.base_url}/api/v3{endpoint}"
 
+        if priority is None:
+            priority = _request_priority.get() or (
+                PRIORITY_INTERACTIVE_READ if method == "GET" else PRIORITY_INTERACTIVE_WRITE
+            )
+
+        resource, item = cache_resource(endpoint)
+        if method != "GET":
+            for loader in (_loader_scope.get() or {}).values():
+                loader.clear()
+            self._identity_map.discard(f"{resource}/{item}")
+            if self.disk_cache is not None:
+                await asyncio.to_thread(self.disk_cache.invalidate, resource, item)
+
+        if method == "GET" and self.disk_cache is not None and self.disk_cache_ttls.get(resource):
+            result = await self._cached_request(endpoint, url, params, priority)
+        else:
+            result = await self._send(method, url, data, params, priority)
+
+        for key, entity in harvest_resources(result).items():
+            self._identity_map.set(key, entity)
+        return result
+
+    def _disk_cache_key(self, url: str, params: Optional[Dict]) -> str:
+        """Cache key: API key identity plus the URL with sorted query parameters"""
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        identity = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+        return hashlib.sha256(f"{identity} {url}?{query}".encode("utf-8")).hexdigest()
+
+    async def _cached_request(
+        self, endpoint: str, url: str, params: Optional[Dict], priority: str
+    ) -> Dict:
+        """
+        GET through the persistent cache (stale-while-revalidate).
+
+        Fresh entries are returned directly. Stale entries are returned at once
+        to interactive reads while a refresh-lane request updates them; bulk
+        crawls and refreshes wait for a fresh response instead.
+        """
+        resource, item = cache_resource(endpoint)
+        ttl = self.disk_cache_ttls[resource]
+        key = self._disk_cache_key(url, params)
+
+        entry = await asyncio.to_thread(self.disk_cache.get, key)
+        if entry is not None:
+            body, fresh = entry
+            if fresh:
+                return body
+            if priority == PRIORITY_INTERACTIVE_READ:
+                if key not in self._revalidations:
+                    task = asyncio.ensure_future(
+                        self._revalidate(key, resource, item, ttl, url, params)
+                    )
+                    self._revalidations[key] = task
+                    task.add_done_callback(lambda _: self._revalidations.pop(key, None))
+                return body
+
+        body = await self._send("GET", url, None, params, priority)
+        await asyncio.to_thread(self.disk_cache.set, key, resource, item, body, ttl)
+        return body
+
+    async def _revalidate(
+        self,
+        key: str,
+        resource: str,
+        item: Optional[str],
+        ttl: float,
+        url: str,
+        params: Optional[Dict],
+    ) -> None:
+        try:
+            body = await self._send("GET", url, None, params, PRIORITY_REFRESH)
+            await asyncio.to_thread(self.disk_cache.set, key, resource, item, body, ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of {url} failed: {e}")
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict],
+        params: Optional[Dict],
+        priority: str,
+    ) -> Dict:
+        """Send one request to OpenProject through the concurrency limiter"""
         logger.debug(f"API Request: {method} {url}")
         if data:
             logger.debug(f"Request body: {json.dumps(data, indent=2)}")
 
-        # Configure SSL and timeout
-        ssl_context = ssl.create_default_context()
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        timeout = aiohttp.ClientTimeout(total=30)
+        session = await self._get_session()
 
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
-        ) as session:
-            try:
-                # Build request parameters
-                request_params = {
-                    "method": method,
-                    "url": url,
-                    "headers": self.headers,
-                    "json": data,
-                }
-                if params:
-                    request_params["params"] = params
+        await self.limiter.acquire(priority)
+        started = time.monotonic()
+        overloaded = False
+        try:
+            # Build request parameters
+            request_params = {
+                "method": method,
+                "url": url,
+                "headers": self.headers,
+                "json": data,
+            }
+            if params:
+                request_params["params"] = params
 
-                # Add proxy if configured
-                if self.proxy:
-                    request_params["proxy"] = self.proxy
+            # Add proxy if configured
+            if self.proxy:
+                request_params["proxy"] = self.proxy
 
-                async with session.request(**request_params) as response:
-                    response_text = await response.text()
+            async with session.request(**request_params) as response:
+                response_text = await response.text()
 
-                    logger.debug(f"Response status: {response.status}")
+                logger.debug(f"Response status: {response.status}")
+                overloaded = response.status == 429 or response.status >= 500
 
-                    # Parse response
-                    try:
-                        response_json = (
-                            json.loads(response_text) if response_text else {}
-                        )
-                    except json.JSONDecodeError:
-                        logger.error(f"Invalid JSON response: {response_text[:200]}...")
-                        response_json = {}
-
-                    # Handle errors
-                    if response.status >= 400:
-                        error_msg = self._format_error_message(
-                            response.status, response_text
-                        )
-                        raise Exception(error_msg)
+                # Parse response
+                try:
+                    response_json = (
+                        json.loads(response_text) if response_text else {}
+                    )
+                except json.JSONDecodeError:
+                    logger.error(f"Invalid JSON response: {response_text[:200]}...")
+                    response_json = {}
+
+                # Handle errors
+                if response.status >= 400:
+                    error_msg = self._format_error_message(
+                        response.status, response_text
+                    )
+                    raise Exception(error_msg)
 
-                    return response_json
+                return response_json
 
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error: {str(e)}")
+        except asyncio.TimeoutError as e:
+            overloaded = True
+            logger.error(f"Timeout accessing {url}")
+            if isinstance(e, aiohttp.ClientError):
                 raise Exception(f"Network error accessing {url}: {str(e)}")
+            raise
+        except aiohttp.ClientError as e:
+            logger.error(f"Network error: {str(e)}")
+            raise Exception(f"Network error accessing {url}: {str(e)}")
+        finally:
+            self.limiter.release(time.monotonic() - started, overloaded)
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: str) -> Iterator[None]:
+        """
+        Run the enclosed requests under a given priority class.
+
+        The priority propagates to tasks created inside the block (contextvars),
+        so parallel page fetches of a crawl all land in the same lane.
+
+        Args:
+            priority: One of the PRIORITY_* constants
+        """
+        token = _request_priority.set(priority)
+        try:
+            yield
+        finally:
+            _request_priority.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def request_scope() -> Iterator[None]:
+        """
+        Memoize id lookups (get_user, get_project, get_work_package) within the block.
+
+        Each scope gets its own dataloaders, so results are shared by everything
+        that runs for one MCP tool call or HTTP request and dropped afterwards.
+        Any write issued inside the scope clears the memoized results.
+        """
+        token = _loader_scope.set({})
+        try:
+            yield
+        finally:
+            _loader_scope.reset(token)
+
+    def _loader(self, kind: str) -> DataLoader:
+        scope = _loader_scope.get()
+        if scope is None:
+            loader = self._loaders.get(kind)
+            if loader is None:
+                loader = self._loaders[kind] = DataLoader(
+                    lambda ids: self._load_resources(kind, ids),
+                    max_batch=RELATION_ID_CHUNK, memoize=False, stats=self.loader_stats,
+                )
+            return loader
+        loader = scope.get((id(self), kind))
+        if loader is None:
+            loader = scope[(id(self), kind)] = DataLoader(
+                lambda ids: self._load_resources(kind, ids),
+                max_batch=RELATION_ID_CHUNK, stats=self.loader_stats,
+            )
+        return loader
+
+    async def _load_resources(self, kind: str, ids: List[str]) -> Dict[str, Any]:
+        """
+        Batch function of the dataloaders: one id-filtered collection request.
+
+        Ids missing from the collection (not visible, archived, or a collection
+        that does not support the id filter) are fetched one by one, so each
+        keeps the error the single-resource endpoint would give.
+        """
+        found: Dict[str, Any] = {}
+        if len(ids) > 1 and kind not in self._unbatchable:
+            try:
+                result = await self._request(
+                    "GET",
+                    f"/{kind}",
+                    params={
+                        "filters": json.dumps([{"id": {"operator": "=", "values": ids}}]),
+                        "pageSize": len(ids),
+                    },
+                )
+                for element in result.get("_embedded", {}).get("elements", []):
+                    found[str(element.get("id"))] = element
+            except Exception as e:
+                # e.g. /users needs admin rights: stop trying for this client
+                logger.info(f"Batched lookup of {kind} unavailable, using single requests: {e}")
+                self._unbatchable.add(kind)
+
+        missing = [key for key in ids if key not in found]
+        results = await asyncio.gather(
+            *(self._request("GET", f"/{kind}/{key}") for key in missing),
+            return_exceptions=True,
+        )
+        found.update(zip(missing, results))
+        return found
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Collect client-side metrics.
+
+        Returns:
+            Dict: Metrics grouped by component
+        """
+        return {
+            "upstream_limiter": self.limiter.snapshot(),
+            "caches": {
+                "memory": self.caches.stats(),
+                "user_directory": {
+                    "loaded": self._user_directory is not None,
+                    "users": len(self._user_directory.users) if self._user_directory else 0,
+                },
+                "membership_index": {
+                    "loaded": self._membership_index is not None,
+                    "memberships": len(self._membership_index.memberships)
+                    if self._membership_index else 0,
+                },
+            },
+            "dataloader": dict(self.loader_stats),
+            "disk_cache": self.disk_cache.stats() if self.disk_cache else None,
+            "changes": self.changes.stats(),
+            "page_size_limits": dict(self.page_size_limits),
+            "elements_transferred": dict(self.transfer_stats),
+        }
+
+    def _count_transfer(self, endpoint: str, elements: int, stats: Optional[Dict[str, int]] = None) -> None:
+        """Add the elements of a received collection page to transfer_stats and to stats, if given"""
+        resource = cache_resource(endpoint)[0]
+        self.transfer_stats[resource] = self.transfer_stats.get(resource, 0) + elements
+        if stats is not None:
+            stats["elements_transferred"] = stats.get("elements_transferred", 0) + elements
+
+    def _page_size(self, endpoint: str, requested: Optional[int] = None) -> int:
+        """
+        Page size to ask a collection for: the requested size (max_page_size
+        when omitted), capped at the server's limit once it has been seen.
+        """
+        size = requested or self.max_page_size
+        limit = self.page_size_limits.get(cache_resource(endpoint)[0])
+        return min(size, limit) if limit else size
+
+    def _learn_page_size(self, endpoint: str, requested: int, result: Dict) -> int:
+        """
+        Record the server's cap when a reply reports a smaller pageSize than
+        was asked for, and return the size the page was actually served with.
+        """
+        served = result.get("pageSize")
+        if not isinstance(served, int) or not 0 < served < requested:
+            return requested
+        resource = cache_resource(endpoint)[0]
+        if self.page_size_limits.get(resource) != served:
+            logger.info(f"Server caps {resource} pages at {served} elements")
+        self.page_size_limits[resource] = served
+        return served
+
+    async def iter_collection(
+        self,
+        endpoint: str,
+        filters: Optional[List] = None,
+        page_size: Optional[int] = None,
+        params: Optional[Dict] = None,
+        keyset: Optional[bool] = None,
+        stats: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[Tuple[List[Dict], int]]:
+        """
+        Stream a collection page by page (bulk priority lane unless the caller
+        runs inside another priority() block).
+
+        In keyset mode (the default, see OPENPROJECT_CRAWL_MODE) the crawl sorts
+        by id and asks for `id > last seen id` on every page, so the cost of a
+        page does not grow with its depth and rows inserted or removed meanwhile
+        cannot shift the remaining pages. Collections that reject the id filter
+        fall back to offset mode, where `offset` is a page number (1-based).
+        Either way elements are deduplicated by id.
+
+        Args:
+            endpoint: Collection endpoint (e.g. "/time_entries")
+            filters: Optional list of filter dictionaries
+            page_size: Elements requested per page (default: as many as the
+                server allows, see _page_size)
+            params: Optional extra query parameters (sortBy, select, ...)
+            keyset: Force keyset (True) or offset (False) mode; None uses the
+                client's crawl_mode
+            stats: Optional dict whose "elements_transferred" entry is increased
+                by the raw size of every page this crawl receives (re-read and
+                deduplicated rows included)
+
+        Yields:
+            Tuple[List[Dict], int]: Elements of each page and the total reported
+                by the first page
+        """
+        query = dict(params or {})
+        page_size = self._page_size(endpoint, page_size)
+        query["pageSize"] = page_size
+        filters = list(filters or [])
+        # Filters passed as a raw parameter are always sent, even "[]" (which
+        # lifts OpenProject's default filter), and the cursor is added to them
+        explicit_filters = "filters" in query
+        if explicit_filters:
+            filters += json.loads(query.pop("filters") or "[]")
+        resource = cache_resource(endpoint)[0]
+        if keyset is None:
+            keyset = self.crawl_mode == "keyset"
+        # The cursor needs the crawl ordered by id and the id filter left free
+        if "sortBy" in query or any("id" in f for f in filters):
+            keyset = False
+        if resource in self._keyset_unsupported:
+            keyset = False
+
+        # Passed explicitly rather than through priority(): a context set inside
+        # a generator would leak into the consumer between pages
+        priority = _request_priority.get() or PRIORITY_BULK
+        seen_ids: set = set()
+        total = None
+
+        if keyset:
+            query["sortBy"] = json.dumps([["id", "asc"]])
+            last_id = None
+            while True:
+                page_filters = list(filters)
+                if last_id is not None:
+                    page_filters.append({"id": {"operator": ">", "values": [str(last_id)]}})
+                if page_filters or explicit_filters:
+                    query["filters"] = json.dumps(page_filters)
+                try:
+                    result = await self._request("GET", endpoint, params=query, priority=priority)
+                except Exception as e:
+                    # Only the cursor filter can be what the server rejects
+                    if last_id is None or not str(e).startswith("API Error 400"):
+                        raise
+                    logger.info(f"Keyset crawl of {resource} unavailable, using offsets: {e}")
+                    self._keyset_unsupported.add(resource)
+                    break
+                page_size = self._learn_page_size(endpoint, page_size, result)
+                query["pageSize"] = page_size
+                elements = result.get("_embedded", {}).get("elements", [])
+                self._count_transfer(endpoint, len(elements), stats)
+                if total is None:
+                    total = result.get("total", 0)
+                fresh = [e for e in elements if e.get("id") not in seen_ids]
+                seen_ids.update(e.get("id") for e in fresh)
+                if fresh:
+                    yield fresh, total
+                if not elements or len(elements) < page_size:
+                    return
+                last_id = elements[-1].get("id")
+                if last_id is None:
+                    # Elements without ids: nothing to build a cursor from
+                    self._keyset_unsupported.add(resource)
+                    break
+            # Restart with offsets; what was already yielded is skipped by id
+            del query["sortBy"]
+
+        if filters or explicit_filters:
+            query["filters"] = json.dumps(filters)
+        else:
+            query.pop("filters", None)
+        page = 1
+        while True:
+            query["offset"] = page
+            result = await self._request("GET", endpoint, params=query, priority=priority)
+            if page == 1:
+                # Later page numbers must keep the size page 1 was served with
+                page_size = self._learn_page_size(endpoint, page_size, result)
+                query["pageSize"] = page_size
+            elements = result.get("_embedded", {}).get("elements", [])
+            self._count_transfer(endpoint, len(elements), stats)
+            if total is None:
+                total = result.get("total", 0)
+            if not elements:
+                break
+
+            fresh = [e for e in elements if e.get("id") is None or e.get("id") not in seen_ids]
+            seen_ids.update(e.get("id") for e in fresh if e.get("id") is not None)
+            if fresh:
+                yield fresh, total
+
+            if page * page_size >= result.get("total", 0) or len(elements) < page_size:
+                break
+            page += 1
+
+    async def _fetch_collection(
+        self,
+        endpoint: str,
+        filters: Optional[List] = None,
+        page_size: Optional[int] = None,
+        params: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """
+        Retrieve a whole collection, fetching the remaining pages in parallel.
+
+        The first page gives the total and the page size the server actually
+        serves; every other page is then requested at once and the adaptive
+        limiter decides how many run concurrently.
+
+        Args:
+            endpoint: Collection endpoint (e.g. "/work_packages")
+            filters: Optional list of filter dictionaries
+            page_size: Elements requested per page (default: as many as the
+                server allows, see _page_size)
+            params: Optional extra query parameters (sortBy, select, ...)
+
+        Returns:
+            List[Dict]: All elements, in page order
+        """
+        query = dict(params or {})
+        if filters:
+            query["filters"] = json.dumps(filters)
+        page_size = self._page_size(endpoint, page_size)
+        query["pageSize"] = page_size
+        priority = _request_priority.get() or PRIORITY_BULK
+
+        async def fetch_page(page: int) -> Dict:
+            return await self._request(
+                "GET", endpoint, params=dict(query, offset=page), priority=priority
+            )
+
+        first = await fetch_page(1)
+        elements = list(first.get("_embedded", {}).get("elements", []))
+        total = first.get("total", 0)
+        # Plan the fan-out with the size the server actually served
+        page_size = self._learn_page_size(endpoint, page_size, first)
+        query["pageSize"] = page_size
+        pages = -(-total // page_size) if page_size else 1
+
+        for result in await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1))):
+            elements.extend(result.get("_embedded", {}).get("elements", []))
+        self._count_transfer(endpoint, len(elements))
+        return elements
 
     def _format_error_message(self, status: int, response_text: str) -> str:
         """Format error message based on HTTP status code"""
@@ -170,6 +2866,103 @@ class OpenProjectClient:
 
         return base_msg
 
+    async def apply_change(self, event: Dict[str, Any]) -> None:
+        """
+        Evict or update whatever a change event makes stale.
+
+        Args:
+            event: Change event from normalize_webhook()
+        """
+        resource, item = event["resource"], event["id"]
+        self._identity_map.discard(f"{resource}/{item}")
+        if self.disk_cache is not None:
+            await asyncio.to_thread(self.disk_cache.invalidate, resource, item)
+
+        if resource == "work_packages":
+            self._workload_cache.invalidate()
+            self._schedule_cache.invalidate()
+            if item is not None:
+                deleted = event["action"] == "deleted"
+                self._reference_cache.set(f"work_package:{item}", not deleted)
+                if deleted:
+                    # Its relations went with it; reload those graphs on next use
+                    for project_id, graph in list(self._relation_graphs.items()):
+                        if graph.covers(item):
+                            del self._relation_graphs[project_id]
+        elif resource == "time_entries":
+            self._summary_cache.invalidate()
+        elif resource == "projects":
+            self._workload_cache.invalidate()
+        elif resource == "memberships" and self._membership_index is not None and item is not None:
+            if event["action"] == "deleted":
+                self._membership_index.remove(item)
+            elif event["payload"].get("_links"):
+                self._membership_index.add(event["payload"])
+
+        logger.debug(f"Applied change: {resource} #{item} {event['action']}")
+
+    async def _reference_list(self, endpoint: str) -> Dict:
+        """GET a rarely changing resource (statuses, types, roles...), cached in memory"""
+        key = f"list:{endpoint}"
+        result = self._reference_cache.get(key)
+        if result is None:
+            result = await self._request("GET", endpoint)
+            self._reference_cache.set(key, result)
+        return result
+
+    async def warm_up(self, steps: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Open pooled connections and prefetch reference data concurrently.
+
+        Statuses, priorities, types, roles, time entry activities and the
+        current user land in the in-memory reference cache. The project list
+        is only crawled when the persistent cache is enabled: without it the
+        result would be thrown away and no later call would be faster.
+
+        Args:
+            steps: Subset of WARMUP_STEPS to run (default: all)
+
+        Returns:
+            Dict: Total duration and per-step outcome
+        """
+        calls = {
+            "connection": self.test_connection,
+            "statuses": self.get_statuses,
+            "priorities": self.get_priorities,
+            "types": self.get_types,
+            "roles": self.get_roles,
+            "time_entry_activities": self.get_time_entry_activities,
+            "projects": self.get_projects,
+            "current_user": lambda: self._reference_list("/users/me"),
+        }
+        if self.disk_cache is None:
+            del calls["projects"]
+        selected = [step for step in (steps or WARMUP_STEPS) if step in calls]
+
+        async def run(step: str) -> Dict[str, Any]:
+            started = time.monotonic()
+            try:
+                await calls[step]()
+                outcome: Dict[str, Any] = {"ok": True}
+            except Exception as e:
+                outcome = {"ok": False, "error": str(e)}
+            outcome["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+            return outcome
+
+        started = time.monotonic()
+        outcomes = await asyncio.gather(*(run(step) for step in selected))
+        report = {
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "finished_at": datetime.utcnow().isoformat(),
+            "steps": dict(zip(selected, outcomes)),
+        }
+        failed = [step for step, outcome in report["steps"].items() if not outcome["ok"]]
+        logger.info(
+            f"Warm-up finished in {report['duration_ms']:.0f} ms"
+            + (f" (failed: {', '.join(failed)})" if failed else "")
+        )
+        return report
+
     async def test_connection(self) -> Dict:
         """Test the API connection and authentication"""
         logger.info("Testing API connection...")
@@ -194,41 +2987,15 @@ class OpenProjectClient:
         """
         logger.info(f"Starting FULL retrieval of ALL projects (active_only={active_only})")
         
+        filter_list = list(filters or []) + project_filters(active_only, name_contains)
+
         all_projects = []
-        current_offset = 1
-        page_size = 10000  # Use very large page size to retrieve all projects without limits
-        total_projects = 0
         
-        while True:
-            # Get a single page
-            result = await self._get_projects_page(
-                filters=filters,
-                active_only=active_only,
-                name_contains=name_contains,
-                offset=current_offset,
-                page_size=page_size
-            )
-            
-            projects = result.get("_embedded", {}).get("elements", [])
-            total = result.get("total", 0)
+        with self.priority(PRIORITY_BULK):
+            async for projects, total in self.iter_collection("/projects", filter_list):
+                all_projects.extend(projects)
             
-            if not projects:
-                break
-                
-            all_projects.extend(projects)
-            total_projects = total
-            
-            logger.info(f"Retrieved {len(projects)} projects (offset: {current_offset}, total so far: {len(all_projects)})")
-            
-            # Check if we've got all projects
-            if len(all_projects) >= total:
-                break
-                
-            current_offset += len(projects)
-            
-            # Safety check to prevent infinite loops
-            if len(projects) == 0:
-                break
+                logger.info(f"Retrieved {len(projects)} projects (total so far: {len(all_projects)} of {total})")
         
         logger.info(f"FULL retrieval complete: {len(all_projects)} projects retrieved")
         
@@ -322,15 +3089,20 @@ class OpenProjectClient:
         filters: Optional[List] = None,
         offset: Optional[int] = None,
         page_size: Optional[int] = None,
+        sort_by: Optional[List[List[str]]] = None,
     ) -> Dict:
         """
         Retrieve work packages.
 
+        Filters are always sent, so an empty list returns every work package
+        instead of OpenProject's default (open ones only).
+
         Args:
             project_id: Optional project ID to filter by
-            filters: Optional list of filter dictionaries
+            filters: Optional list of filter dictionaries (see work_package_filters)
             offset: Optional starting index for pagination
             page_size: Optional number of results per page
+            sort_by: Optional sortBy list (see work_package_sort)
 
         Returns:
             Dict: API response containing work packages
@@ -339,40 +3111,20 @@ class OpenProjectClient:
         if offset is None and page_size is None:
             logger.info(f"Starting FULL retrieval of ALL work packages (project_id={project_id})")
             
+            endpoint = f"/projects/{project_id}/work_packages" if project_id else "/work_packages"
+            params = {"filters": json.dumps(filters or [])}
+            if sort_by:
+                params["sortBy"] = json.dumps(sort_by)
             all_work_packages = []
-            current_offset = 1
-            page_size = 100  # Use larger page size for efficiency
-            total_work_packages = 0
-            
-            while True:
-                # Get a single page
-                result = await self._get_work_packages_page(
-                    project_id=project_id,
-                    filters=filters,
-                    offset=current_offset,
-                    page_size=page_size
-                )
-                
-                work_packages = result.get("_embedded", {}).get("elements", [])
-                total = result.get("total", 0)
-                
-                if not work_packages:
-                    break
-                    
-                all_work_packages.extend(work_packages)
-                total_work_packages = total
-                
-                logger.info(f"Retrieved {len(work_packages)} work packages (offset: {current_offset}, total so far: {len(all_work_packages)})")
-                
-                # Check if we've got all work packages
-                if len(all_work_packages) >= total:
-                    break
-                    
-                current_offset += len(work_packages)
-                
-                # Safety check to prevent infinite loops
-                if len(work_packages) == 0:
-                    break
+            # Elements this call received from OpenProject (pages re-read or
+            # deduplicated included); transfer_stats is shared by every crawl
+            stats = {"elements_transferred": 0}
+
+            with self.priority(PRIORITY_BULK):
+                async for work_packages, total in self.iter_collection(endpoint, params=params, stats=stats):
+                    all_work_packages.extend(work_packages)
+
+                    logger.info(f"Retrieved {len(work_packages)} work packages (total so far: {len(all_work_packages)} of {total})")
             
             logger.info(f"FULL retrieval complete: {len(all_work_packages)} work packages retrieved")
             
@@ -385,7 +3137,11 @@ class OpenProjectClient:
                 "offset": 1,
                 "_embedded": {
                     "elements": all_work_packages
-                }
+                },
+                "_retrieval_info": {
+                    "mode": "full_retrieval",
+                    "elements_transferred": stats["elements_transferred"],
+                },
             }
         
         # Manual pagination mode - just get requested page
@@ -393,7 +3149,8 @@ class OpenProjectClient:
             project_id=project_id,
             filters=filters,
             offset=offset,
-            page_size=page_size
+            page_size=page_size,
+            sort_by=sort_by,
         )
     
     async def _get_work_packages_page(
@@ -402,6 +3159,7 @@ class OpenProjectClient:
         filters: Optional[List] = None,
         offset: Optional[int] = None,
         page_size: Optional[int] = None,
+        sort_by: Optional[List[List[str]]] = None,
     ) -> Dict:
         """
         Get a single page of work packages (internal helper method).
@@ -411,6 +3169,7 @@ class OpenProjectClient:
             filters: Optional list of filter dictionaries
             offset: Optional starting index for pagination
             page_size: Optional number of results per page
+            sort_by: Optional sortBy list
 
         Returns:
             Dict: API response containing work packages
@@ -421,17 +3180,15 @@ class OpenProjectClient:
             endpoint = "/work_packages"
 
         # Build query parameters
-        query_params = []
-        if filters:
-            encoded_filters = quote(json.dumps(filters))
-            query_params.append(f"filters={encoded_filters}")
+        query_params = [f"filters={quote(json.dumps(filters or []))}"]
+        if sort_by:
+            query_params.append(f"sortBy={quote(json.dumps(sort_by))}")
         if offset is not None:
             query_params.append(f"offset={offset}")
         if page_size is not None:
             query_params.append(f"pageSize={page_size}")
 
-        if query_params:
-            endpoint += "?" + "&".join(query_params)
+        endpoint += "?" + "&".join(query_params)
 
         result = await self._request("GET", endpoint)
 
@@ -440,6 +3197,7 @@ class OpenProjectClient:
             result["_embedded"] = {"elements": []}
         elif "elements" not in result.get("_embedded", {}):
             result["_embedded"]["elements"] = []
+        self._count_transfer(endpoint, len(result["_embedded"]["elements"]))
 
         return result
 
@@ -507,7 +3265,9 @@ class OpenProjectClient:
             payload["date"] = data["date"]
 
         # Create work package
-        return await self._request("POST", "/work_packages", payload)
+        result = await self._request("POST", "/work_packages", payload)
+        self._schedule_cache.invalidate()
+        return result
 
     async def get_types(self, project_id: Optional[int] = None) -> Dict:
         """
@@ -524,7 +3284,7 @@ class OpenProjectClient:
         else:
             endpoint = "/types"
 
-        result = await self._request("GET", endpoint)
+        result = await self._reference_list(endpoint)
 
         # Ensure proper response structure
         if "_embedded" not in result:
@@ -536,7 +3296,7 @@ class OpenProjectClient:
 
     async def get_users(self, filters: Optional[List] = None, active_only: bool = False) -> Dict:
         """
-        Retrieve users.
+        Retrieve all users (every page, fetched in parallel).
 
         Args:
             filters: Optional list of filter dictionaries
@@ -545,28 +3305,91 @@ class OpenProjectClient:
         Returns:
             Dict: API response containing users
         """
-        endpoint = "/users"
-        
         # Build filters list
         filter_list = filters if filters else []
         
         # Note: active_only filter is disabled by default because it can cause errors
         # in different OpenProject configurations. Use filters parameter directly if needed.
-        
-        # Encode filters if any
-        if filter_list:
-            encoded_filters = quote(json.dumps(filter_list))
-            endpoint += f"?filters={encoded_filters}"
 
-        result = await self._request("GET", endpoint)
+        users = await self._fetch_collection("/users", filters=filter_list)
 
-        # Ensure proper response structure
-        if "_embedded" not in result:
-            result["_embedded"] = {"elements": []}
-        elif "elements" not in result.get("_embedded", {}):
-            result["_embedded"]["elements"] = []
+        return {
+            "_type": "Collection",
+            "total": len(users),
+            "count": len(users),
+            "pageSize": len(users),
+            "offset": 1,
+            "_embedded": {"elements": users},
+        }
 
-        return result
+    async def _load_user_directory(self) -> UserDirectory:
+        try:
+            users = (await self.get_users())["_embedded"]["elements"]
+            source = "users"
+        except Exception as e:
+            # Listing /users needs admin rights; principals are visible to everyone
+            logger.info(f"Cannot list /users ({e}); building the user directory from /principals")
+            users = await self._fetch_collection(
+                "/principals",
+                filters=[{"type": {"operator": "=", "values": ["User"]}}],
+            )
+            source = "principals"
+        # Indexing a large directory takes a while: keep it off the event loop
+        directory = self._user_directory = await asyncio.to_thread(UserDirectory, users)
+        logger.info(f"User directory loaded from /{source}: {len(users)} users")
+        return directory
+
+    async def get_user_directory(self) -> UserDirectory:
+        """
+        Return the user directory, loading it on first use and reloading it
+        every OPENPROJECT_USER_DIRECTORY_TTL seconds.
+
+        Concurrent callers share a single crawl.
+
+        Returns:
+            UserDirectory: Current directory
+        """
+        directory = self._user_directory
+        if directory is not None and time.monotonic() - directory.loaded_at <= self.user_directory_ttl:
+            return directory
+        task = self._user_directory_load
+        if task is None or task.done():
+            task = self._user_directory_load = asyncio.ensure_future(self._load_user_directory())
+        return await asyncio.shield(task)
+
+    async def find_user(self, query: str, limit: int = 10) -> Dict:
+        """
+        Find users by name, login or e-mail (case and accent insensitive,
+        prefix match with a fuzzy fallback).
+
+        Args:
+            query: Search text (e.g. "maria", "m.lopez@", "mraia")
+            limit: Maximum matches
+
+        Returns:
+            Dict: Matches with score and match kind, plus lookup time
+        """
+        directory = await self.get_user_directory()
+        started = time.perf_counter()
+        results = directory.search(query, limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return {
+            "query": query,
+            "directory_size": len(directory.users),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "matches": [
+                {
+                    "id": user.get("id"),
+                    "name": user.get("name"),
+                    "login": user.get("login"),
+                    "email": user.get("email"),
+                    "status": user.get("status"),
+                    "score": round(score, 3),
+                    "match": kind,
+                }
+                for user, score, kind in results
+            ],
+        }
 
     async def get_user(self, user_id: int) -> Dict:
         """
@@ -578,7 +3401,7 @@ class OpenProjectClient:
         Returns:
             Dict: User data
         """
-        return await self._request("GET", f"/users/{user_id}")
+        return self._identity_map.get(f"users/{user_id}") or await self._loader("users").load(user_id)
 
     async def get_memberships(
         self, 
@@ -587,7 +3410,7 @@ class OpenProjectClient:
         filters: Optional[List] = None,
         offset: Optional[int] = None,
         page_size: Optional[int] = None,
-        full_retrieval: bool = False
+        full_retrieval: bool = False,
     ) -> Dict:
         """
         Retrieve memberships.
@@ -620,36 +3443,17 @@ class OpenProjectClient:
             )
             all_memberships = []
             total_memberships = 0
-            current_offset = 1
-            retrieval_page_size = 100  # razonable por página
 
-            while True:
-                page_result = await self._get_memberships_page(
-                    filter_list=list(filter_list),
-                    offset=current_offset,
-                    page_size=retrieval_page_size,
-                )
-
-                memberships = page_result.get("_embedded", {}).get("elements", [])
-                total_memberships = page_result.get("total", total_memberships)
-
-                if not memberships:
-                    break
-
-                all_memberships.extend(memberships)
-
-                logger.info(
-                    f"Retrieved {len(memberships)} memberships "
-                    f"(offset: {current_offset}, total so far: {len(all_memberships)})"
-                )
-
-                if total_memberships and len(all_memberships) >= total_memberships:
-                    break
-
-                current_offset += len(memberships)
+            with self.priority(PRIORITY_BULK):
+                async for memberships, total_memberships in self.iter_collection(
+                    endpoint, list(filter_list)
+                ):
+                    all_memberships.extend(memberships)
 
-                if len(memberships) == 0:
-                    break
+                    logger.info(
+                        f"Retrieved {len(memberships)} memberships "
+                        f"(total so far: {len(all_memberships)} of {total_memberships})"
+                    )
 
             logger.info(
                 f"FULL retrieval complete: {len(all_memberships)} memberships retrieved"
@@ -712,7 +3516,7 @@ class OpenProjectClient:
         Returns:
             Dict: API response containing statuses
         """
-        result = await self._request("GET", "/statuses")
+        result = await self._reference_list("/statuses")
 
         # Ensure proper response structure
         if "_embedded" not in result:
@@ -724,20 +3528,201 @@ class OpenProjectClient:
 
     async def get_priorities(self) -> Dict:
         """
-        Retrieve available work package priorities.
+        Retrieve available work package priorities.
+
+        Returns:
+            Dict: API response containing priorities
+        """
+        result = await self._reference_list("/priorities")
+
+        # Ensure proper response structure
+        if "_embedded" not in result:
+            result["_embedded"] = {"elements": []}
+        elif "elements" not in result.get("_embedded", {}):
+            result["_embedded"]["elements"] = []
+
+        return result
+
+    async def count_collection(
+        self,
+        endpoint: str,
+        filters: Optional[List] = None,
+        group_by: Optional[str] = None,
+    ) -> Dict:
+        """
+        Count the elements of a collection, optionally per group, without
+        listing them.
+
+        A plain count is one pageSize=1 request read for its `total`. Per-group
+        counts of work packages use OpenProject's grouped results (`groupBy`) in
+        that same single request. The other collections (see
+        GROUPBY_COLLECTIONS), and servers that return no groups, are counted in
+        one streaming pass over all pages instead.
+
+        Args:
+            endpoint: Collection endpoint (e.g. "/work_packages")
+            filters: Optional list of filter dictionaries (always sent, so an
+                empty list lifts OpenProject's default filter)
+            group_by: Optional dimension from COUNT_GROUPS for the collection
+
+        Returns:
+            Dict: resource, total, mode and, when grouped, groups
+                [{id, name, count}] largest first
+
+        Raises:
+            ValueError: If group_by is not a dimension of the collection
+        """
+        resource = cache_resource(endpoint)[0]
+        dimensions = COUNT_GROUPS.get(resource, {})
+        if group_by and group_by not in dimensions:
+            raise ValueError(
+                f"Invalid group_by for {resource}: {group_by!r} "
+                f"(use {', '.join(dimensions) or 'no grouping'})"
+            )
+        params = {"filters": json.dumps(filters or []), "pageSize": 1}
+        summary: Dict[str, Any] = {"resource": resource, "group_by": group_by}
+
+        if not group_by:
+            result = await self._request("GET", endpoint, params=params)
+            return dict(summary, total=result.get("total", 0), mode="count")
+
+        attribute = dimensions[group_by]
+        counts: Dict[Tuple, int] = {}
+        if resource in GROUPBY_COLLECTIONS and resource not in self._ungroupable:
+            result = await self._request("GET", endpoint, params=dict(params, groupBy=attribute))
+            groups = result.get("groups")
+            if groups is not None:
+                for group in groups:
+                    value_links = group.get("_links", {}).get("valueLink") or [{}]
+                    href = value_links[0].get("href")
+                    key = (href.rstrip("/").rsplit("/", 1)[-1] if href else None, group.get("value"))
+                    counts[key] = counts.get(key, 0) + group.get("count", 0)
+                summary.update(total=result.get("total", 0), mode="grouped")
+            else:
+                self._ungroupable.add(resource)
+
+        if "mode" not in summary:
+            total = 0
+            del params["pageSize"]
+            async for elements, _total in self.iter_collection(endpoint, params=params):
+                total += len(elements)
+                for element in elements:
+                    links = element.get("_links", {}).get(attribute)
+                    # List links (e.g. membership roles) count once per entry
+                    for link in links if isinstance(links, list) else [links or {}]:
+                        href = link.get("href")
+                        key = (href.rstrip("/").rsplit("/", 1)[-1] if href else None, link.get("title"))
+                        counts[key] = counts.get(key, 0) + 1
+            summary.update(total=total, mode="streaming")
+
+        summary["groups"] = [
+            {"id": key[0], "name": key[1], "count": count}
+            for key, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        ]
+        return summary
+
+    async def workload_summary(
+        self, project_id: Optional[int] = None, status: str = "open"
+    ) -> Dict:
+        """
+        Count work packages per assignee and per project, broken down by status.
+
+        Uses OpenProject's grouped results (`groupBy`): one single-element query
+        per status and dimension, run in parallel. If the server returns no
+        groups, falls back to one streaming pass over the work packages with
+        only the assignee, status and project fields selected.
+
+        Args:
+            project_id: Optional project ID (default: whole instance)
+            status: "open", "closed" or "all"
 
         Returns:
-            Dict: API response containing priorities
+            Dict: Totals plus assignee and project rows with per-status counts
         """
-        result = await self._request("GET", "/priorities")
+        cache_key = f"{project_id}:{status}"
+        cached = self._workload_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        statuses = (await self.get_statuses()).get("_embedded", {}).get("elements", [])
+        if status == "open":
+            statuses = [s for s in statuses if not s.get("isClosed")]
+        elif status == "closed":
+            statuses = [s for s in statuses if s.get("isClosed")]
+
+        base_filters = []
+        if project_id:
+            base_filters.append({"project": {"operator": "=", "values": [str(project_id)]}})
 
-        # Ensure proper response structure
-        if "_embedded" not in result:
-            result["_embedded"] = {"elements": []}
-        elif "elements" not in result.get("_embedded", {}):
-            result["_embedded"]["elements"] = []
+        rows: Dict[str, Dict[Tuple, Dict[str, Any]]] = {"assignee": {}, "project": {}}
 
-        return result
+        def count(dimension: str, key: Tuple, status_name: str, amount: int) -> None:
+            row = rows[dimension].get(key)
+            if row is None:
+                row = rows[dimension][key] = {
+                    "id": key[0], "name": key[1], "total": 0, "by_status": {}
+                }
+            row["total"] += amount
+            row["by_status"][status_name] = row["by_status"].get(status_name, 0) + amount
+
+        async def grouped(status_resource: Dict, dimension: str) -> Optional[List[Dict]]:
+            filters = base_filters + [
+                {"status": {"operator": "=", "values": [str(status_resource["id"])]}}
+            ]
+            result = await self._request(
+                "GET",
+                "/work_packages",
+                params={"filters": json.dumps(filters), "groupBy": dimension, "pageSize": 1},
+                priority=_request_priority.get() or PRIORITY_BULK,
+            )
+            return result.get("groups")
+
+        queries = [(s, dimension) for s in statuses for dimension in rows]
+        results = await asyncio.gather(*(grouped(s, dimension) for s, dimension in queries))
+
+        if all(groups is not None for groups in results):
+            mode = "grouped"
+            for (status_resource, dimension), groups in zip(queries, results):
+                for group in groups:
+                    value_links = group.get("_links", {}).get("valueLink") or [{}]
+                    href = value_links[0].get("href")
+                    key = (href.rstrip("/").rsplit("/", 1)[-1] if href else None, group.get("value"))
+                    count(dimension, key, status_resource.get("name"), group.get("count", 0))
+        else:
+            mode = "streaming"
+            status_names = {str(s["id"]): s.get("name") for s in statuses}
+            filters = base_filters + [
+                {"status": {"operator": "=", "values": list(status_names)}}
+            ]
+            async for elements, _total in self.iter_collection(
+                "/work_packages",
+                filters=filters,
+                params={"select": "total,elements/id,elements/assignee,elements/status,elements/project"},
+            ):
+                for work_package in elements:
+                    links = work_package.get("_links", {})
+                    status_name = (links.get("status") or {}).get("title") or status_names.get(
+                        _link_id(links, "status")
+                    )
+                    for dimension in rows:
+                        key = (_link_id(links, dimension), (links.get(dimension) or {}).get("title"))
+                        count(dimension, key, status_name, 1)
+
+        def ordered(dimension: str) -> List[Dict]:
+            return sorted(rows[dimension].values(), key=lambda row: row["total"], reverse=True)
+
+        summary = {
+            "mode": mode,
+            "project_id": project_id,
+            "status": status,
+            "statuses": [s.get("name") for s in statuses],
+            "total": sum(row["total"] for row in rows["project"].values()),
+            "assignees": ordered("assignee"),
+            "projects": ordered("project"),
+            "cached": False,
+        }
+        self._workload_cache.set(cache_key, summary)
+        return summary
 
     async def get_work_package(self, work_package_id: int) -> Dict:
         """
@@ -749,7 +3734,7 @@ class OpenProjectClient:
         Returns:
             Dict: Work package data
         """
-        return await self._request("GET", f"/work_packages/{work_package_id}")
+        return await self._loader("work_packages").load(work_package_id)
 
     async def get_work_package_activities(self, work_package_id: int) -> Dict:
         """
@@ -927,9 +3912,12 @@ class OpenProjectClient:
         if "date" in data:
             payload["date"] = data["date"]
 
-        return await self._request(
+        result = await self._request(
             "PATCH", f"/work_packages/{work_package_id}", payload
         )
+        if any(field in data for field in ("startDate", "dueDate", "date")):
+            self._schedule_cache.invalidate()
+        return result
 
     async def delete_work_package(self, work_package_id: int) -> bool:
         """
@@ -942,6 +3930,7 @@ class OpenProjectClient:
             bool: True if successful
         """
         await self._request("DELETE", f"/work_packages/{work_package_id}")
+        self._schedule_cache.invalidate()
         return True
 
     async def get_time_entries(self, filters: Optional[List] = None) -> Dict:
@@ -969,6 +3958,91 @@ class OpenProjectClient:
 
         return result
 
+    async def summarize_time_entries(
+        self,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        work_package_id: Optional[int] = None,
+        activity_id: Optional[int] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        group_by: Optional[List[str]] = None,
+    ) -> Dict:
+        """
+        Aggregate logged hours over all matching time entries.
+
+        Every filter, including the date range, is sent to OpenProject, and the
+        entries are folded into totals page by page without being kept.
+
+        Args:
+            project_id: Optional project ID to filter by
+            user_id: Optional user ID to filter by
+            work_package_id: Optional work package ID to filter by
+            activity_id: Optional activity ID to filter by
+            from_date: Optional first day (YYYY-MM-DD), inclusive
+            to_date: Optional last day (YYYY-MM-DD), inclusive
+            group_by: Dimensions to group by, any of TIME_ENTRY_GROUPS
+                (default: ["user"])
+
+        Returns:
+            Dict: Total hours, entry count and one row per group sorted by hours
+
+        Raises:
+            ValueError: If a group_by dimension is unknown or a date is malformed
+        """
+        group_by = list(group_by or ["user"])
+        unknown = [dimension for dimension in group_by if dimension not in TIME_ENTRY_GROUPS]
+        if unknown:
+            raise ValueError(
+                f"Invalid group_by {unknown}; expected any of {sorted(TIME_ENTRY_GROUPS)}"
+            )
+
+        filters = time_entry_filters(
+            project_id, user_id, work_package_id, activity_id, from_date, to_date
+        )
+
+        cache_key = json.dumps({"filters": filters, "group_by": group_by}, sort_keys=True)
+        cached = self._summary_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        total_hours = 0.0
+        entry_count = 0
+        async for entries, _total in self.iter_collection("/time_entries", filters=filters):
+            for entry in entries:
+                hours = parse_iso_duration(entry.get("hours"))
+                key = tuple(TIME_ENTRY_GROUPS[dimension](entry) for dimension in group_by)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {
+                        "key": {
+                            dimension: {"id": value[0], "name": value[1]}
+                            for dimension, value in zip(group_by, key)
+                        },
+                        "hours": 0.0,
+                        "entries": 0,
+                    }
+                group["hours"] += hours
+                group["entries"] += 1
+                total_hours += hours
+                entry_count += 1
+
+        rows = sorted(groups.values(), key=lambda group: group["hours"], reverse=True)
+        for row in rows:
+            row["hours"] = round(row["hours"], 2)
+
+        summary = {
+            "filters": filters,
+            "group_by": group_by,
+            "total_hours": round(total_hours, 2),
+            "entry_count": entry_count,
+            "groups": rows,
+            "cached": False,
+        }
+        self._summary_cache.set(cache_key, summary)
+        return summary
+
     async def create_time_entry(self, data: Dict) -> Dict:
         """
         Create a new time entry.
@@ -1002,7 +4076,9 @@ class OpenProjectClient:
                 "href": f"/api/v3/time_entries/activities/{data['activity_id']}"
             }
 
-        return await self._request("POST", "/time_entries", payload)
+        result = await self._request("POST", "/time_entries", payload)
+        self._summary_cache.invalidate()
+        return result
 
     async def update_time_entry(self, time_entry_id: int, data: Dict) -> Dict:
         """
@@ -1035,7 +4111,9 @@ class OpenProjectClient:
                 "href": f"/api/v3/time_entries/activities/{data['activity_id']}"
             }
 
-        return await self._request("PATCH", f"/time_entries/{time_entry_id}", payload)
+        result = await self._request("PATCH", f"/time_entries/{time_entry_id}", payload)
+        self._summary_cache.invalidate()
+        return result
 
     async def delete_time_entry(self, time_entry_id: int) -> bool:
         """
@@ -1048,6 +4126,7 @@ class OpenProjectClient:
             bool: True if successful
         """
         await self._request("DELETE", f"/time_entries/{time_entry_id}")
+        self._summary_cache.invalidate()
         return True
 
     async def get_time_entry_activities(self) -> Dict:
@@ -1060,11 +4139,11 @@ class OpenProjectClient:
         # Note: The correct endpoint is /time_entries/activity (without 'activities')
         # Different OpenProject versions may have different endpoints
         try:
-            result = await self._request("GET", "/time_entries/activity")
+            result = await self._reference_list("/time_entries/activity")
         except Exception:
             # Fallback: try alternative endpoint
             try:
-                result = await self._request("GET", "/time_entry_activities")
+                result = await self._reference_list("/time_entry_activities")
             except Exception:
                 # Return empty result if neither endpoint works
                 return {
@@ -1081,6 +4160,142 @@ class OpenProjectClient:
 
         return result
 
+    async def _time_entry_activity_lookup(self) -> Dict[str, str]:
+        """Map activity ids and lower-cased names to ids (cached)"""
+        lookup = self._reference_cache.get("time_entry_activities")
+        if lookup is None:
+            result = await self.get_time_entry_activities()
+            lookup = {}
+            for activity in result.get("_embedded", {}).get("elements", []):
+                lookup[str(activity.get("id"))] = str(activity.get("id"))
+                if activity.get("name"):
+                    lookup[activity["name"].strip().lower()] = str(activity.get("id"))
+            self._reference_cache.set("time_entry_activities", lookup)
+        return lookup
+
+    async def _existing_work_packages(self, ids: Iterable[int]) -> set:
+        """
+        Return which of the given work package ids exist (cached per id).
+
+        Unknown ids are resolved with one id-filtered query per chunk.
+        """
+        known = set()
+        missing = []
+        for work_package_id in {str(i) for i in ids}:
+            exists = self._reference_cache.get(f"work_package:{work_package_id}")
+            if exists is None:
+                missing.append(work_package_id)
+            elif exists:
+                known.add(work_package_id)
+
+        async def resolve(chunk: List[str]) -> None:
+            result = await self._request(
+                "GET",
+                "/work_packages",
+                params={
+                    "filters": json.dumps([{"id": {"operator": "=", "values": chunk}}]),
+                    "pageSize": len(chunk),
+                    "select": "total,elements/id",
+                },
+            )
+            found = {str(e.get("id")) for e in result.get("_embedded", {}).get("elements", [])}
+            for work_package_id in chunk:
+                self._reference_cache.set(
+                    f"work_package:{work_package_id}", work_package_id in found
+                )
+            known.update(found)
+
+        chunks = [missing[i:i + RELATION_ID_CHUNK] for i in range(0, len(missing), RELATION_ID_CHUNK)]
+        await asyncio.gather(*(resolve(chunk) for chunk in chunks))
+        return known
+
+    async def import_time_entries(
+        self,
+        rows: Union[Iterable[Dict], AsyncIterable[Dict]],
+        concurrency: Optional[int] = None,
+        dry_run: bool = False,
+        batch_size: int = 200,
+    ) -> Dict:
+        """
+        Validate and create time entries from parsed CSV/JSONL rows.
+
+        Rows are consumed in batches: each batch is validated locally (format,
+        cached activities, one lookup for unknown work package ids) and the
+        valid rows are created concurrently in the bulk priority lane.
+
+        Args:
+            rows: Row dictionaries (sync or async iterable, e.g. from ImportRowParser)
+            concurrency: Maximum simultaneous creations (default: OPENPROJECT_IMPORT_CONCURRENCY)
+            dry_run: Only validate, do not create anything
+            batch_size: Rows validated and submitted together
+
+        Returns:
+            Dict: Counters and one result per row (created, valid, invalid or failed)
+        """
+        started = time.monotonic()
+        activities = await self._time_entry_activity_lookup()
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.import_concurrency))
+        results: List[Dict[str, Any]] = []
+
+        async def create(row_number: int, data: Dict) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    with self.priority(PRIORITY_BULK):
+                        created = await self.create_time_entry(data)
+                    return {"row": row_number, "status": "created", "id": created.get("id")}
+                except Exception as e:
+                    return {"row": row_number, "status": "failed", "error": str(e)}
+
+        async def process(batch: List[Tuple[int, Dict]]) -> None:
+            parsed = [(number, *parse_time_entry_row(row, activities)) for number, row in batch]
+            existing = await self._existing_work_packages(
+                data["work_package_id"] for _, data, _ in parsed if data
+            )
+            tasks = []
+            for number, data, error in parsed:
+                if error is None and str(data["work_package_id"]) not in existing:
+                    error = f"Work package #{data['work_package_id']} not found"
+                if error:
+                    results.append({"row": number, "status": "invalid", "error": error})
+                elif dry_run:
+                    results.append({"row": number, "status": "valid"})
+                else:
+                    tasks.append(create(number, data))
+            results.extend(await asyncio.gather(*tasks))
+
+        batch: List[Tuple[int, Dict]] = []
+        row_number = 0
+
+        async def as_async(source):
+            if hasattr(source, "__aiter__"):
+                async for item in source:
+                    yield item
+            else:
+                for item in source:
+                    yield item
+
+        async for row in as_async(rows):
+            row_number += 1
+            batch.append((row_number, row))
+            if len(batch) >= batch_size:
+                await process(batch)
+                batch = []
+        if batch:
+            await process(batch)
+
+        results.sort(key=lambda result: result["row"])
+        counts = {status: 0 for status in ("created", "valid", "invalid", "failed")}
+        for result in results:
+            counts[result["status"]] += 1
+        logger.info(f"Time entry import: {row_number} rows, {counts}")
+        return {
+            "total_rows": row_number,
+            "dry_run": dry_run,
+            **counts,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 2),
+            "results": results,
+        }
+
     async def get_versions(
         self, 
         project_id: Optional[int] = None,
@@ -1155,7 +4370,7 @@ class OpenProjectClient:
         """
         try:
             # Get current user info which includes permissions
-            return await self._request("GET", "/users/me")
+            return await self._reference_list("/users/me")
         except Exception as e:
             logger.error(f"Failed to check permissions: {e}")
             return {}
@@ -1257,7 +4472,7 @@ class OpenProjectClient:
         Returns:
             Dict: Project data
         """
-        return await self._request("GET", f"/projects/{project_id}")
+        return self._identity_map.get(f"projects/{project_id}") or await self._loader("projects").load(project_id)
 
     async def get_roles(self) -> Dict:
         """
@@ -1266,7 +4481,7 @@ class OpenProjectClient:
         Returns:
             Dict: API response containing roles
         """
-        result = await self._request("GET", "/roles")
+        result = await self._reference_list("/roles")
 
         # Ensure proper response structure
         if "_embedded" not in result:
@@ -1323,7 +4538,10 @@ class OpenProjectClient:
         if "notification_message" in data:
             payload["notificationMessage"] = {"raw": data["notification_message"]}
 
-        return await self._request("POST", "/memberships", payload)
+        result = await self._request("POST", "/memberships", payload)
+        if self._membership_index:
+            self._membership_index.add(result)
+        return result
 
     async def update_membership(self, membership_id: int, data: Dict) -> Dict:
         """
@@ -1360,7 +4578,10 @@ class OpenProjectClient:
         if "notification_message" in data:
             payload["notificationMessage"] = {"raw": data["notification_message"]}
 
-        return await self._request("PATCH", f"/memberships/{membership_id}", payload)
+        result = await self._request("PATCH", f"/memberships/{membership_id}", payload)
+        if self._membership_index:
+            self._membership_index.add(result)
+        return result
 
     async def delete_membership(self, membership_id: int) -> bool:
         """
@@ -1373,8 +4594,87 @@ class OpenProjectClient:
             bool: True if successful
         """
         await self._request("DELETE", f"/memberships/{membership_id}")
+        if self._membership_index:
+            self._membership_index.remove(membership_id)
         return True
 
+    async def _refresh_membership_index(self) -> MembershipIndex:
+        index = self._membership_index
+        now = time.monotonic()
+        if index is None or now - index.loaded_at > self.membership_rebuild:
+            logger.info("Building membership index")
+            memberships = await self._fetch_collection("/memberships")
+            self._membership_index = MembershipIndex(memberships)
+            logger.info(f"Membership index built: {len(memberships)} memberships")
+        else:
+            # Pull only what changed since the last sync (with a small overlap)
+            since = (index.synced_at - timedelta(seconds=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            synced_at = datetime.utcnow()
+            filters = [{"updatedAt": {"operator": "<>d", "values": [since, ""]}}]
+            changed = await self._fetch_collection("/memberships", filters=filters)
+            for membership in changed:
+                index.add(membership)
+            index.synced_at = synced_at
+            index.refreshed_at = now
+        return self._membership_index
+
+    async def get_membership_index(self) -> MembershipIndex:
+        """
+        Return the membership index, building or refreshing it when due.
+
+        Concurrent callers share a single crawl.
+
+        Returns:
+            MembershipIndex: Current index
+        """
+        index = self._membership_index
+        if index is not None and time.monotonic() - index.refreshed_at <= self.membership_ttl:
+            return index
+        task = self._membership_refresh
+        if task is None or task.done():
+            task = self._membership_refresh = asyncio.ensure_future(
+                self._refresh_membership_index()
+            )
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _membership_collection(memberships: List[Dict]) -> Dict:
+        return {
+            "_type": "Collection",
+            "total": len(memberships),
+            "count": len(memberships),
+            "pageSize": len(memberships),
+            "offset": 1,
+            "_embedded": {"elements": memberships},
+            "_retrieval_info": {"mode": "membership_index"},
+        }
+
+    async def list_project_members(self, project_id: int) -> Dict:
+        """
+        List the memberships of a project from the membership index.
+
+        Args:
+            project_id: The project ID
+
+        Returns:
+            Dict: Collection of memberships
+        """
+        index = await self.get_membership_index()
+        return self._membership_collection(index.for_project(project_id))
+
+    async def list_user_projects(self, user_id: int) -> Dict:
+        """
+        List the memberships of a user from the membership index.
+
+        Args:
+            user_id: The user ID
+
+        Returns:
+            Dict: Collection of memberships
+        """
+        index = await self.get_membership_index()
+        return self._membership_collection(index.for_user(user_id))
+
     async def get_membership(self, membership_id: int) -> Dict:
         """
         Retrieve a specific membership by ID.
@@ -1476,6 +4776,29 @@ class OpenProjectClient:
 
         return result
 
+    async def get_work_package_tree(
+        self, work_package_id: int, max_depth: Optional[int] = None
+    ) -> Dict:
+        """
+        Retrieve the full hierarchy below a work package as a nested tree.
+
+        All descendants (any status) are fetched with one parallel paginated
+        crawl instead of a children lookup per node.
+
+        Args:
+            work_package_id: The root work package ID
+            max_depth: Optional number of levels to include below the root
+
+        Returns:
+            Dict: Nested tree from build_work_package_tree()
+        """
+        filters = [{"descendantsOf": {"operator": "=", "values": [str(work_package_id)]}}]
+        root, descendants = await asyncio.gather(
+            self.get_work_package(work_package_id),
+            self._fetch_collection("/work_packages", filters=filters),
+        )
+        return build_work_package_tree(root, descendants, max_depth)
+
     async def create_work_package_relation(self, data: Dict) -> Dict:
         """
         Create a relationship between work packages.
@@ -1503,7 +4826,15 @@ class OpenProjectClient:
         if "description" in data:
             payload["description"] = data["description"]
 
-        return await self._request("POST", "/relations", payload)
+        if self.relation_precheck and {"from_id", "to_id", "relation_type"} <= data.keys():
+            await self.check_work_package_relation(
+                data["from_id"], data["to_id"], data["relation_type"]
+            )
+
+        result = await self._request("POST", "/relations", payload)
+        self._schedule_cache.invalidate()
+        self._index_relation(result)
+        return result
 
     async def list_work_package_relations(self, filters: Optional[str] = None) -> Dict:
         """
@@ -1542,6 +4873,7 @@ class OpenProjectClient:
             Dict: Updated relation data
         """
         # First get current relation to get lock version if needed
+        current_relation = None
         try:
             current_relation = await self.get_work_package_relation(relation_id)
             lock_version = current_relation.get("lockVersion", 0)
@@ -1559,7 +4891,18 @@ class OpenProjectClient:
         if "description" in data:
             payload["description"] = data["description"]
 
-        return await self._request("PATCH", f"/relations/{relation_id}", payload)
+        if self.relation_precheck and "relation_type" in data and current_relation:
+            links = current_relation.get("_links", {})
+            from_id, to_id = _link_id(links, "from"), _link_id(links, "to")
+            if from_id and to_id:
+                await self.check_work_package_relation(
+                    from_id, to_id, data["relation_type"], relation_id
+                )
+
+        result = await self._request("PATCH", f"/relations/{relation_id}", payload)
+        self._schedule_cache.invalidate()
+        self._index_relation(result)
+        return result
 
     async def delete_work_package_relation(self, relation_id: int) -> bool:
         """
@@ -1572,6 +4915,9 @@ class OpenProjectClient:
             bool: True if successful
         """
         await self._request("DELETE", f"/relations/{relation_id}")
+        self._schedule_cache.invalidate()
+        for graph in self._relation_graphs.values():
+            graph.remove(relation_id)
         return True
 
     async def get_work_package_relation(self, relation_id: int) -> Dict:
@@ -1586,6 +4932,287 @@ class OpenProjectClient:
         """
         return await self._request("GET", f"/relations/{relation_id}")
 
+    async def _crawl_project_relations(self, project_id: int) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Crawl all work packages of a project (any status) and their relations.
+
+        Relations are fetched in parallel chunks of work package ids using the
+        `involved` filter. The crawl also refreshes the project's relation graph.
+
+        Args:
+            project_id: The project ID
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: Work packages and de-duplicated relations
+        """
+        work_packages = await self._fetch_collection(
+            f"/projects/{project_id}/work_packages",
+            params={"filters": "[]"},
+        )
+
+        async def relations_for(ids: List[str]) -> List[Dict]:
+            filters = [{"involved": {"operator": "=", "values": ids}}]
+            return await self._fetch_collection("/relations", filters=filters)
+
+        ids = [str(work_package["id"]) for work_package in work_packages]
+        chunks = [ids[i:i + RELATION_ID_CHUNK] for i in range(0, len(ids), RELATION_ID_CHUNK)]
+        relations: Dict[Any, Dict] = {}
+        for found in await asyncio.gather(*(relations_for(chunk) for chunk in chunks)):
+            for relation in found:
+                relations[relation.get("id")] = relation
+
+        self._relation_graphs[project_id] = RelationGraph(
+            project_id, ids, list(relations.values())
+        )
+        return work_packages, list(relations.values())
+
+    async def get_relation_graph(self, project_id: int) -> RelationGraph:
+        """
+        Return the project's relation graph, crawling it if missing or older than the cache TTL.
+
+        Args:
+            project_id: The project ID
+
+        Returns:
+            RelationGraph: Relation index for the project
+        """
+        graph = self._relation_graphs.get(project_id)
+        if graph is not None and time.monotonic() - graph.loaded_at <= self.cache_ttl:
+            return graph
+        # Single flight: concurrent checks share one crawl per project
+        task = self._relation_graph_loads.get(project_id)
+        if task is None or task.done():
+            task = self._relation_graph_loads[project_id] = asyncio.ensure_future(
+                self._crawl_project_relations(project_id)
+            )
+        await asyncio.shield(task)
+        return self._relation_graphs[project_id]
+
+    async def check_work_package_relation(
+        self,
+        from_id: int,
+        to_id: int,
+        relation_type: str,
+        relation_id: Optional[int] = None,
+    ) -> None:
+        """
+        Reject a relation that duplicates another or closes a scheduling cycle.
+
+        Uses the relation graph of the source work package's project (loaded
+        on first use), so repeated checks do not touch the network. The check
+        fails open: if the graph cannot be loaded the relation is left for
+        OpenProject to validate. A duplicate is only reported after the
+        conflicting relation has been re-fetched, since the graph may predate
+        its deletion elsewhere.
+
+        Args:
+            from_id: Source work package ID
+            to_id: Target work package ID
+            relation_type: Relation type
+            relation_id: ID of the relation being updated, if any
+
+        Raises:
+            RelationConflictError: If the relation is invalid
+        """
+        try:
+            graphs = [graph for graph in self._relation_graphs.values() if graph.covers(from_id)]
+            if not graphs:
+                work_package = await self.get_work_package(from_id)
+                project_id = _link_id(work_package.get("_links", {}), "project")
+                if project_id is None:
+                    return
+                graph = await self.get_relation_graph(int(project_id))
+                # Created after the crawl: remember it to skip this lookup next time
+                graph.work_packages.add(str(from_id))
+                graphs = [graph]
+            graphs = [
+                await self.get_relation_graph(graph.project_id)
+                if time.monotonic() - graph.loaded_at > self.cache_ttl else graph
+                for graph in graphs
+            ]
+        except Exception as e:
+            logger.warning(f"Relation precheck skipped for #{from_id} -> #{to_id}: {e}")
+            return
+
+        for graph in graphs:
+            while True:
+                try:
+                    graph.check(from_id, to_id, relation_type, relation_id)
+                    break
+                except RelationConflictError as conflict:
+                    if conflict.relation_id is None:
+                        raise
+                    confirmed = await self._confirm_relation(graph, conflict.relation_id)
+                    if confirmed:
+                        raise
+                    if confirmed is None:
+                        return
+                    # The graph was stale about that relation and has been fixed: check again
+
+    async def _confirm_relation(self, graph: RelationGraph, relation_id: str) -> Optional[bool]:
+        """
+        Re-fetch a relation the graph reports as a duplicate.
+
+        Returns:
+            Optional[bool]: True if it still stands as indexed; False if the
+                graph entry was stale and has been corrected (dropped on 404,
+                replaced if its ends changed); None if it could not be checked
+        """
+        indexed = graph.relations.get(str(relation_id))
+        try:
+            relation = await self.get_work_package_relation(int(relation_id))
+        except Exception as e:
+            if str(e).startswith("API Error 404"):
+                graph.remove(relation_id)
+                return False
+            logger.warning(f"Could not re-fetch relation #{relation_id}, skipping precheck: {e}")
+            return None
+        links = relation.get("_links", {})
+        current = (_link_id(links, "from"), _link_id(links, "to"), relation.get("type"))
+        if indexed is not None and current != indexed:
+            graph.add(relation)
+            return False
+        return True
+
+    def _index_relation(self, relation: Dict) -> None:
+        """Apply a created or updated relation to the loaded relation graphs"""
+        links = relation.get("_links", {})
+        ends = (_link_id(links, "from"), _link_id(links, "to"))
+        for graph in self._relation_graphs.values():
+            if graph.covers(*ends) or str(relation.get("id")) in graph.relations:
+                graph.add(relation)
+
+    def _snapshot_path(self, project_id: int, snapshot_id: str) -> str:
+        if not _SNAPSHOT_ID_RE.match(snapshot_id):
+            raise ValueError(f"Invalid snapshot id: {snapshot_id}")
+        return os.path.join(self.snapshot_dir, str(int(project_id)), f"{snapshot_id}.json.gz")
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        path = self._snapshot_path(snapshot["project_id"], snapshot["id"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _read_snapshot(self, project_id: int, snapshot_id: str) -> Dict[str, Any]:
+        try:
+            with gzip.open(self._snapshot_path(project_id, snapshot_id), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise LookupError(f"Snapshot {snapshot_id} not found for project #{project_id}")
+
+    def list_project_snapshots(self, project_id: int) -> List[str]:
+        """
+        List the snapshot ids of a project, oldest first.
+
+        Args:
+            project_id: The project ID
+
+        Returns:
+            List[str]: Snapshot ids (UTC timestamp plus optional label)
+        """
+        directory = os.path.join(self.snapshot_dir, str(int(project_id)))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            name[:-len(".json.gz")] for name in os.listdir(directory)
+            if name.endswith(".json.gz") and _SNAPSHOT_ID_RE.match(name[:-len(".json.gz")])
+        )
+
+    async def create_project_snapshot(self, project_id: int, label: Optional[str] = None) -> Dict:
+        """
+        Store a columnar snapshot of all work packages of a project on disk.
+
+        Args:
+            project_id: The project ID
+            label: Optional label appended to the snapshot id (e.g. "week-12")
+
+        Returns:
+            Dict: Snapshot metadata (id, taken_at, count)
+        """
+        statuses, work_packages = await asyncio.gather(
+            self.get_statuses(),
+            self._fetch_collection(
+                f"/projects/{project_id}/work_packages", params={"filters": "[]"}
+            ),
+        )
+        closed = {
+            str(status.get("id"))
+            for status in statuses.get("_embedded", {}).get("elements", [])
+            if status.get("isClosed")
+        }
+        snapshot = build_snapshot(project_id, work_packages, closed, label)
+        await asyncio.to_thread(self._write_snapshot, snapshot)
+        logger.info(f"Snapshot {snapshot['id']} stored for project #{project_id} ({snapshot['count']} work packages)")
+        return {key: value for key, value in snapshot.items() if key != "columns"}
+
+    async def diff_project_snapshots(
+        self,
+        project_id: int,
+        base: Optional[str] = None,
+        target: Optional[str] = None,
+    ) -> Dict:
+        """
+        Compare two stored snapshots of a project (no OpenProject requests).
+
+        Args:
+            project_id: The project ID
+            base: Older snapshot id (default: the one before target)
+            target: Newer snapshot id (default: the latest)
+
+        Returns:
+            Dict: Output of diff_snapshots()
+
+        Raises:
+            ValueError: If base or target is not a valid snapshot id
+            LookupError: If a snapshot is missing or there is nothing to compare
+        """
+        snapshots = self.list_project_snapshots(project_id)
+        if target is None:
+            if not snapshots:
+                raise LookupError(f"No snapshots stored for project #{project_id}")
+            target = snapshots[-1]
+        if base is None:
+            older = [snapshot for snapshot in snapshots if snapshot < target]
+            if not older:
+                raise LookupError(f"No snapshot older than {target} for project #{project_id}")
+            base = older[-1]
+
+        base_snapshot, target_snapshot = await asyncio.gather(
+            asyncio.to_thread(self._read_snapshot, project_id, base),
+            asyncio.to_thread(self._read_snapshot, project_id, target),
+        )
+        return diff_snapshots(base_snapshot, target_snapshot)
+
+    async def analyze_project_schedule(self, project_id: int) -> Dict:
+        """
+        Critical path and slack for all work packages of a project.
+
+        Work packages and relations are crawled once (see
+        _crawl_project_relations). The result is cached per project until a
+        relation or work package date changes through this client, or the
+        cache TTL expires.
+
+        Args:
+            project_id: The project ID
+
+        Returns:
+            Dict: Output of analyze_schedule() plus project_id and a cached flag
+        """
+        cache_key = str(project_id)
+        cached = self._schedule_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        work_packages, relations = await self._crawl_project_relations(project_id)
+
+        analysis = analyze_schedule(work_packages, relations)
+        analysis["project_id"] = project_id
+        analysis["cached"] = False
+        self._schedule_cache.set(cache_key, analysis)
+        return analysis
+
 
 class OpenProjectMCPServer:
     """MCP Server for OpenProject integration"""
@@ -1618,28 +5245,108 @@ class OpenProjectMCPServer:
                                 "description": "Show only active projects",
                                 "default": True,
                             },
-                            "name_contains": {
+                            "name_contains": {
+                                "type": "string",
+                                "description": "Filter projects by name (case-insensitive partial match)",
+                            },
+                            "count_only": {
+                                "type": "boolean",
+                                "description": "Only return how many match (one request, no listing)",
+                            },
+                            "group_by": {
+                                "type": "string",
+                                "description": "Only return counts per group",
+                                "enum": list(COUNT_GROUPS["projects"]),
+                            },
+                        },
+                    },
+                ),
+                Tool(
+                    name="list_work_packages",
+                    description=(
+                        "List work packages with optional pagination. Filters and sorting are "
+                        "applied by OpenProject, so narrow the query instead of listing everything"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID (optional, for project-specific work packages)",
+                            },
+                            "status": {
+                                "type": "string",
+                                "description": "Status filter: open, closed, all, or comma-separated status IDs",
+                                "default": "open",
+                            },
+                            "assignee": {
+                                "type": "string",
+                                "description": "Assignee user IDs (comma-separated), 'me' or 'none' for unassigned",
+                            },
+                            "author": {
+                                "type": "string",
+                                "description": "Author user IDs (comma-separated) or 'me'",
+                            },
+                            "responsible": {
+                                "type": "string",
+                                "description": "Accountable user IDs (comma-separated), 'me' or 'none'",
+                            },
+                            "type_id": {
+                                "type": "string",
+                                "description": "Type IDs (comma-separated)",
+                            },
+                            "priority_id": {
+                                "type": "string",
+                                "description": "Priority IDs (comma-separated)",
+                            },
+                            "version_id": {
+                                "type": "string",
+                                "description": "Version IDs (comma-separated)",
+                            },
+                            "parent_id": {
+                                "type": "string",
+                                "description": "Parent work package IDs (comma-separated)",
+                            },
+                            "subject_contains": {
+                                "type": "string",
+                                "description": "Text the subject must contain",
+                            },
+                            "created_since": {
+                                "type": "string",
+                                "description": "Created on or after this date (YYYY-MM-DD)",
+                            },
+                            "updated_since": {
+                                "type": "string",
+                                "description": "Updated on or after this date (YYYY-MM-DD)",
+                            },
+                            "updated_before": {
                                 "type": "string",
-                                "description": "Filter projects by name (case-insensitive partial match)",
+                                "description": "Updated on or before this date (YYYY-MM-DD)",
                             },
-                        },
-                    },
-                ),
-                Tool(
-                    name="list_work_packages",
-                    description="List work packages with optional pagination",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "project_id": {
-                                "type": "integer",
-                                "description": "Project ID (optional, for project-specific work packages)",
+                            "due_after": {
+                                "type": "string",
+                                "description": "Due on or after this date (YYYY-MM-DD)",
                             },
-                            "status": {
+                            "due_before": {
                                 "type": "string",
-                                "description": "Status filter (open, closed, all)",
-                                "enum": ["open", "closed", "all"],
-                                "default": "open",
+                                "description": "Due on or before this date (YYYY-MM-DD)",
+                            },
+                            "sort_by": {
+                                "type": "string",
+                                "description": (
+                                    "Comma-separated field[:asc|desc], fields: "
+                                    + ", ".join(WORK_PACKAGE_SORT_FIELDS)
+                                    + " (e.g. 'priority:desc,due_date')"
+                                ),
+                            },
+                            "count_only": {
+                                "type": "boolean",
+                                "description": "Only return how many match (one request, no listing)",
+                            },
+                            "group_by": {
+                                "type": "string",
+                                "description": "Only return counts per group",
+                                "enum": list(COUNT_GROUPS["work_packages"]),
                             },
                             "offset": {
                                 "type": "integer",
@@ -1736,6 +5443,24 @@ class OpenProjectMCPServer:
                         "required": ["user_id"],
                     },
                 ),
+                Tool(
+                    name="find_user",
+                    description="Find users by name, login or email (case and accent insensitive, prefix matching with typo tolerance). Use it to resolve people mentioned by name, e.g. before assigning work",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Name, login or email (or the start of them), e.g. 'maria lop'",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum matches (default: 10)",
+                            },
+                        },
+                        "required": ["query"],
+                    },
+                ),
                 Tool(
                     name="list_memberships",
                     description="List project memberships",
@@ -1750,6 +5475,37 @@ class OpenProjectMCPServer:
                                 "type": "integer",
                                 "description": "User ID (optional, for user-specific memberships)",
                             },
+                            "count_only": {
+                                "type": "boolean",
+                                "description": "Only return how many match (one request, no listing)",
+                            },
+                            "group_by": {
+                                "type": "string",
+                                "description": "Only return counts per group",
+                                "enum": list(COUNT_GROUPS["memberships"]),
+                            },
+                        },
+                    },
+                ),
+                Tool(
+                    name="workload_summary",
+                    description="Work package counts per assignee and per project, broken down by status, for one project or the whole instance (use this instead of listing work packages to find who is overloaded)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID (optional, default: all projects)",
+                            },
+                            "status": {
+                                "type": "string",
+                                "description": "Which work packages to count (default: open)",
+                                "enum": ["open", "closed", "all"],
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum assignees and projects to show (default: 25)",
+                            },
                         },
                     },
                 ),
@@ -1977,6 +5733,56 @@ class OpenProjectMCPServer:
                                 "type": "integer",
                                 "description": "User ID (optional, for user-specific time entries)",
                             },
+                            "count_only": {
+                                "type": "boolean",
+                                "description": "Only return how many match (one request, no listing)",
+                            },
+                            "group_by": {
+                                "type": "string",
+                                "description": "Only return counts per group",
+                                "enum": list(COUNT_GROUPS["time_entries"]),
+                            },
+                        },
+                    },
+                ),
+                Tool(
+                    name="summarize_time_entries",
+                    description="Total logged hours grouped by user, project, work package, activity and/or day/week/month. Aggregates all matching time entries server-side",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID (optional)",
+                            },
+                            "user_id": {
+                                "type": "integer",
+                                "description": "User ID (optional)",
+                            },
+                            "work_package_id": {
+                                "type": "integer",
+                                "description": "Work package ID (optional)",
+                            },
+                            "activity_id": {
+                                "type": "integer",
+                                "description": "Activity ID (optional)",
+                            },
+                            "from_date": {
+                                "type": "string",
+                                "description": "First day, inclusive (YYYY-MM-DD, optional)",
+                            },
+                            "to_date": {
+                                "type": "string",
+                                "description": "Last day, inclusive (YYYY-MM-DD, optional)",
+                            },
+                            "group_by": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                    "enum": ["user", "project", "work_package", "activity", "day", "week", "month"],
+                                },
+                                "description": "Grouping dimensions (default: [\"user\"])",
+                            },
                         },
                     },
                 ),
@@ -2010,6 +5816,30 @@ class OpenProjectMCPServer:
                         "required": ["work_package_id", "hours", "spent_on"],
                     },
                 ),
+                Tool(
+                    name="import_time_entries",
+                    description="Bulk-create time entries from CSV (with header) or JSONL. Columns: work_package_id, hours (2.5, 1:30 or PT2H), spent_on (YYYY-MM-DD), activity_id or activity name, comment. Rows are validated before anything is created",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "content": {
+                                "type": "string",
+                                "description": "CSV or JSONL text",
+                            },
+                            "format": {
+                                "type": "string",
+                                "enum": ["csv", "jsonl"],
+                                "description": "Input format (default: csv)",
+                            },
+                            "dry_run": {
+                                "type": "boolean",
+                                "description": "Only validate the rows (default: false)",
+                                "default": False,
+                            },
+                        },
+                        "required": ["content"],
+                    },
+                ),
                 Tool(
                     name="update_time_entry",
                     description="Update an existing time entry",
@@ -2387,6 +6217,24 @@ class OpenProjectMCPServer:
                         "required": ["parent_id"],
                     },
                 ),
+                Tool(
+                    name="get_work_package_tree",
+                    description="Full hierarchy below a work package (e.g. epic → feature → task) as a nested tree with rolled-up done ratio and status counts, fetched in one pass",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "work_package_id": {
+                                "type": "integer",
+                                "description": "Root work package ID",
+                            },
+                            "max_depth": {
+                                "type": "integer",
+                                "description": "Levels to show below the root (optional, roll-ups always cover the full tree)",
+                            },
+                        },
+                        "required": ["work_package_id"],
+                    },
+                ),
                 Tool(
                     name="create_work_package_relation",
                     description="Create a relationship between work packages",
@@ -2427,6 +6275,68 @@ class OpenProjectMCPServer:
                         "required": ["from_id", "to_id", "relation_type"],
                     },
                 ),
+                Tool(
+                    name="analyze_project_schedule",
+                    description="Critical path and schedule analysis of a project: topological order, earliest/latest start, slack and the critical path over follows/precedes/blocks relations (with lag)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of non-critical work packages to list by slack (default: 20)",
+                            },
+                        },
+                        "required": ["project_id"],
+                    },
+                ),
+                Tool(
+                    name="create_project_snapshot",
+                    description="Store a point-in-time snapshot of a project's work packages (status, assignee, dates, progress) on disk for later diffing",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID",
+                            },
+                            "label": {
+                                "type": "string",
+                                "description": "Optional label appended to the snapshot id (e.g. 'sprint-4')",
+                            },
+                        },
+                        "required": ["project_id"],
+                    },
+                ),
+                Tool(
+                    name="diff_project_snapshots",
+                    description="Compare two stored snapshots of a project without contacting OpenProject: created, removed, closed, reopened, reassigned, rescheduled and progress changes. Defaults to the two most recent snapshots",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "project_id": {
+                                "type": "integer",
+                                "description": "Project ID",
+                            },
+                            "base": {
+                                "type": "string",
+                                "description": "Older snapshot id (optional)",
+                            },
+                            "target": {
+                                "type": "string",
+                                "description": "Newer snapshot id (optional, default: latest)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum items listed per change type (default: 20)",
+                            },
+                        },
+                        "required": ["project_id"],
+                    },
+                ),
                 Tool(
                     name="list_work_package_relations",
                     description="List work package relations with optional filtering",
@@ -2520,8 +6430,7 @@ class OpenProjectMCPServer:
                 ),
             ]
 
-        @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        async def execute_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Execute a tool"""
             if not self.client:
                 return [
@@ -2549,6 +6458,14 @@ class OpenProjectMCPServer:
                     active_only = arguments.get("active_only", True)
                     name_contains = arguments.get("name_contains")
 
+                    if arguments.get("count_only") or arguments.get("group_by"):
+                        summary = await self.client.count_collection(
+                            "/projects",
+                            project_filters(active_only, name_contains),
+                            arguments.get("group_by"),
+                        )
+                        return [TextContent(type="text", text=format_count(summary))]
+
                     # Get ALL projects with auto-pagination
                     result = await self.client.get_projects(
                         active_only=active_only,
@@ -2587,22 +6504,27 @@ class OpenProjectMCPServer:
                     offset = arguments.get("offset")
                     page_size = arguments.get("page_size", 100)  # Default to larger page size
 
-                    filters = None
-                    if status == "open":
-                        filters = json.dumps(
-                            [{"status_id": {"operator": "o", "values": None}}]
-                        )
-                    elif status == "closed":
-                        filters = json.dumps(
-                            [{"status_id": {"operator": "c", "values": None}}]
+                    # Raises ValueError on malformed criteria before any request
+                    filters = work_package_filters(
+                        status=status,
+                        **{key: arguments.get(key) for key in WORK_PACKAGE_CRITERIA},
+                    )
+                    sort_by = work_package_sort(arguments.get("sort_by"))
+
+                    if arguments.get("count_only") or arguments.get("group_by"):
+                        summary = await self.client.count_collection(
+                            f"/projects/{project_id}/work_packages" if project_id else "/work_packages",
+                            filters,
+                            arguments.get("group_by"),
                         )
+                        return [TextContent(type="text", text=format_count(summary))]
 
                     # Force auto-pagination mode for better user experience
                     # Only use manual mode if explicitly requested with large page_size
                     if offset is not None and page_size and page_size < 50:
                         # Manual pagination mode for small requests
                         result = await self.client.get_work_packages(
-                            project_id, filters, offset, page_size
+                            project_id, filters, offset, page_size, sort_by=sort_by
                         )
                         work_packages = result.get("_embedded", {}).get("elements", [])
 
@@ -2643,38 +6565,10 @@ class OpenProjectMCPServer:
                         return [TextContent(type="text", text=text)]
                     
                     # Auto-pagination mode: get all work packages
-                    all_work_packages = []
-                    current_offset = 1
-                    page_size = 100  # Use larger page size for efficiency
-                    total_work_packages = 0
-                    
                     logger.info(f"Starting auto-pagination for work packages (project_id={project_id}, status={status})")
-                    
-                    while True:
-                        result = await self.client.get_work_packages(
-                            project_id, filters, current_offset, page_size
-                        )
-                        
-                        work_packages = result.get("_embedded", {}).get("elements", [])
-                        total = result.get("total", 0)
-                        
-                        if not work_packages:
-                            break
-                            
-                        all_work_packages.extend(work_packages)
-                        total_work_packages = total
-                        
-                        logger.info(f"Retrieved {len(work_packages)} work packages (offset: {current_offset}, total so far: {len(all_work_packages)})")
-                        
-                        # Check if we've got all work packages
-                        if len(all_work_packages) >= total:
-                            break
-                            
-                        current_offset += len(work_packages)
-                        
-                        # Safety check to prevent infinite loops
-                        if len(work_packages) == 0:
-                            break
+
+                    result = await self.client.get_work_packages(project_id, filters, sort_by=sort_by)
+                    all_work_packages = result.get("_embedded", {}).get("elements", [])
                     
                     logger.info(f"Auto-pagination complete: {len(all_work_packages)} work packages retrieved")
                     
@@ -2684,7 +6578,8 @@ class OpenProjectMCPServer:
                         text = f"**All Work Packages ({len(all_work_packages)} total)**\n"
                         if project_id:
                             text += f"Project ID: {project_id}\n"
-                        text += f"Status: {status}\n\n"
+                        text += f"Status: {status}\n"
+                        text += f"Elements transferred: {result['_retrieval_info']['elements_transferred']}\n\n"
 
                         for wp in all_work_packages:
                             text += f"- **{wp.get('subject', 'No title')}** (#{wp.get('id', 'N/A')})\n"
@@ -2826,10 +6721,39 @@ class OpenProjectMCPServer:
 
                     return [TextContent(type="text", text=text)]
 
+                elif name == "find_user":
+                    query = arguments["query"]
+                    result = await self.client.find_user(query, arguments.get("limit", 10))
+                    matches = result["matches"]
+
+                    if not matches:
+                        return [TextContent(type="text", text=f"No users match '{query}'.")]
+
+                    text = f"👤 **Users matching '{query}' ({len(matches)}):**\n\n"
+                    for match in matches:
+                        text += f"- **{match['name']}** (ID: {match['id']})"
+                        details = [value for value in (match.get("login"), match.get("email")) if value]
+                        if details:
+                            text += f" — {', '.join(details)}"
+                        text += f" [{match['match']}]\n"
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "list_memberships":
                     project_id = arguments.get("project_id")
                     user_id = arguments.get("user_id")
 
+                    if arguments.get("count_only") or arguments.get("group_by"):
+                        filters = []
+                        if project_id:
+                            filters.append({"project": {"operator": "=", "values": [str(project_id)]}})
+                        if user_id:
+                            filters.append({"principal": {"operator": "=", "values": [str(user_id)]}})
+                        summary = await self.client.count_collection(
+                            "/memberships", filters, arguments.get("group_by")
+                        )
+                        return [TextContent(type="text", text=format_count(summary))]
+
                     try:
                         result = await self.client.get_memberships(
                             project_id=project_id, user_id=user_id, full_retrieval=True
@@ -2890,6 +6814,36 @@ class OpenProjectMCPServer:
 
                         return [TextContent(type="text", text=text)]
 
+                elif name == "workload_summary":
+                    summary = await self.client.workload_summary(
+                        project_id=arguments.get("project_id"),
+                        status=arguments.get("status", "open"),
+                    )
+                    limit = arguments.get("limit", 25)
+                    scope = (
+                        f"project #{summary['project_id']}" if summary["project_id"] else "all projects"
+                    )
+
+                    text = (
+                        f"📊 **Workload ({summary['status']} work packages, {scope}): "
+                        f"{summary['total']} total**\n"
+                    )
+                    for title, dimension, fallback in (
+                        ("By assignee", "assignees", "Unassigned"),
+                        ("By project", "projects", "Unknown"),
+                    ):
+                        rows = summary[dimension]
+                        text += f"\n**{title}:**\n"
+                        for row in rows[:limit]:
+                            breakdown = ", ".join(
+                                f"{name}: {amount}" for name, amount in row["by_status"].items()
+                            )
+                            text += f"- {row['name'] or fallback}: {row['total']} ({breakdown})\n"
+                        if len(rows) > limit:
+                            text += f"- … {len(rows) - limit} more\n"
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "list_statuses":
                     result = await self.client.get_statuses()
                     statuses = result.get("_embedded", {}).get("elements", [])
@@ -3151,6 +7105,17 @@ class OpenProjectMCPServer:
                     return [TextContent(type="text", text=text)]
 
                 elif name == "list_time_entries":
+                    if arguments.get("count_only") or arguments.get("group_by"):
+                        summary = await self.client.count_collection(
+                            "/time_entries",
+                            time_entry_filters(
+                                user_id=arguments.get("user_id"),
+                                work_package_id=arguments.get("work_package_id"),
+                            ),
+                            arguments.get("group_by"),
+                        )
+                        return [TextContent(type="text", text=format_count(summary))]
+
                     filters = []
 
                     # Add filters based on arguments
@@ -3182,13 +7147,7 @@ class OpenProjectMCPServer:
                     else:
                         text = f"Found {len(time_entries)} time entrie(s):\n\n"
                         for entry in time_entries:
-                            # Parse hours from ISO duration format (PT2.5H)
-                            hours_str = entry.get("hours", "PT0H")
-                            hours = (
-                                hours_str.replace("PT", "").replace("H", "")
-                                if "PT" in hours_str
-                                else "0"
-                            )
+                            hours = format_hours(parse_iso_duration(entry.get("hours")))
 
                             text += f"- **Time Entry #{entry.get('id', 'N/A')}**\n"
                             text += f"  Hours: {hours}\n"
@@ -3209,6 +7168,37 @@ class OpenProjectMCPServer:
 
                     return [TextContent(type="text", text=text)]
 
+                elif name == "summarize_time_entries":
+                    summary = await self.client.summarize_time_entries(
+                        project_id=arguments.get("project_id"),
+                        user_id=arguments.get("user_id"),
+                        work_package_id=arguments.get("work_package_id"),
+                        activity_id=arguments.get("activity_id"),
+                        from_date=arguments.get("from_date"),
+                        to_date=arguments.get("to_date"),
+                        group_by=arguments.get("group_by"),
+                    )
+
+                    if not summary["entry_count"]:
+                        text = "No time entries found."
+                    else:
+                        text = (
+                            f"⏱️ **{format_hours(summary['total_hours'])} hours** in "
+                            f"{summary['entry_count']} time entrie(s), grouped by "
+                            f"{', '.join(summary['group_by'])}:\n\n"
+                        )
+                        for group in summary["groups"]:
+                            label = " / ".join(
+                                str(value["name"] or value["id"] or "None")
+                                for value in group["key"].values()
+                            )
+                            text += (
+                                f"- **{label}**: {format_hours(group['hours'])} h "
+                                f"({group['entries']} entries)\n"
+                            )
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "create_time_entry":
                     data = {
                         "work_package_id": arguments["work_package_id"],
@@ -3223,13 +7213,7 @@ class OpenProjectMCPServer:
 
                     result = await self.client.create_time_entry(data)
 
-                    # Parse hours from ISO duration format
-                    hours_str = result.get("hours", "PT0H")
-                    hours = (
-                        hours_str.replace("PT", "").replace("H", "")
-                        if "PT" in hours_str
-                        else "0"
-                    )
+                    hours = format_hours(parse_iso_duration(result.get("hours")))
 
                     text = f"✅ Time entry created successfully:\n\n"
                     text += f"- **ID**: #{result.get('id', 'N/A')}\n"
@@ -3245,6 +7229,32 @@ class OpenProjectMCPServer:
 
                     return [TextContent(type="text", text=text)]
 
+                elif name == "import_time_entries":
+                    parser = ImportRowParser(arguments.get("format", "csv"))
+                    rows = parser.feed(arguments["content"]) + parser.close()
+                    report = await self.client.import_time_entries(
+                        rows, dry_run=arguments.get("dry_run", False)
+                    )
+
+                    verb = "validated" if report["dry_run"] else "imported"
+                    text = f"📥 **Time entries {verb}: {report['total_rows']} row(s)**\n\n"
+                    text += f"- Created: {report['created']}\n"
+                    if report["dry_run"]:
+                        text += f"- Valid: {report['valid']}\n"
+                    text += f"- Invalid: {report['invalid']}\n"
+                    text += f"- Failed: {report['failed']}\n"
+                    text += f"- Time: {report['elapsed_ms'] / 1000:.1f}s\n"
+
+                    problems = [r for r in report["results"] if r["status"] in ("invalid", "failed")]
+                    if problems:
+                        text += "\n**Rows with errors:**\n"
+                        for result in problems[:50]:
+                            text += f"- Row {result['row']} ({result['status']}): {result['error']}\n"
+                        if len(problems) > 50:
+                            text += f"- … {len(problems) - 50} more\n"
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "update_time_entry":
                     time_entry_id = arguments["time_entry_id"]
 
@@ -3265,13 +7275,7 @@ class OpenProjectMCPServer:
                         time_entry_id, update_data
                     )
 
-                    # Parse hours from ISO duration format
-                    hours_str = result.get("hours", "PT0H")
-                    hours = (
-                        hours_str.replace("PT", "").replace("H", "")
-                        if "PT" in hours_str
-                        else "0"
-                    )
+                    hours = format_hours(parse_iso_duration(result.get("hours")))
 
                     text = f"✅ Time entry #{time_entry_id} updated successfully:\n\n"
                     text += f"- **Hours**: {hours}\n"
@@ -3640,13 +7644,7 @@ class OpenProjectMCPServer:
                 elif name == "list_project_members":
                     project_id = arguments["project_id"]
 
-                    # Filter memberships by project
-                    filters = json.dumps(
-                        [{"project": {"operator": "=", "values": [str(project_id)]}}]
-                    )
-                    result = await self.client.get_memberships(
-                        project_id=project_id, full_retrieval=True
-                    )
+                    result = await self.client.list_project_members(project_id)
                     memberships = result.get("_embedded", {}).get("elements", [])
 
                     if not memberships:
@@ -3676,10 +7674,7 @@ class OpenProjectMCPServer:
                 elif name == "list_user_projects":
                     user_id = arguments["user_id"]
 
-                    # Filter memberships by user
-                    result = await self.client.get_memberships(
-                        user_id=user_id, full_retrieval=True
-                    )
+                    result = await self.client.list_user_projects(user_id)
                     memberships = result.get("_embedded", {}).get("elements", [])
 
                     if not memberships:
@@ -3767,6 +7762,36 @@ class OpenProjectMCPServer:
 
                     return [TextContent(type="text", text=text)]
 
+                elif name == "get_work_package_tree":
+                    work_package_id = arguments["work_package_id"]
+                    tree = await self.client.get_work_package_tree(
+                        work_package_id, arguments.get("max_depth")
+                    )
+
+                    text = (
+                        f"**Hierarchy of Work Package #{work_package_id} "
+                        f"({tree['descendant_count']} descendants):**\n\n"
+                    )
+                    stack = [tree]
+                    while stack:
+                        node = stack.pop()
+                        line = f"{'  ' * node['depth']}- #{node['id']} {node['subject']}"
+                        line += f" [{node['status'] or 'Unknown'}]"
+                        if node["descendant_count"]:
+                            line += f" — {node['descendant_count']} below"
+                            if node["done_ratio"] is not None:
+                                line += f", {node['done_ratio']:g}% done"
+                            statuses = ", ".join(
+                                f"{name}: {count}" for name, count in node["status_counts"].items()
+                            )
+                            line += f" ({statuses})"
+                        if node["truncated"]:
+                            line += " …"
+                        text += line + "\n"
+                        stack.extend(reversed(node["children"]))
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "list_work_package_children":
                     parent_id = arguments["parent_id"]
                     include_descendants = arguments.get("include_descendants", False)
@@ -3823,6 +7848,88 @@ class OpenProjectMCPServer:
 
                     return [TextContent(type="text", text=text)]
 
+                elif name == "analyze_project_schedule":
+                    project_id = arguments["project_id"]
+                    limit = arguments.get("limit", 20)
+                    analysis = await self.client.analyze_project_schedule(project_id)
+
+                    text = f"📈 **Schedule analysis for project #{project_id}**\n\n"
+                    text += f"- **Work packages**: {analysis['work_package_count']}\n"
+                    text += f"- **Scheduling relations**: {analysis['relation_count']}\n"
+                    text += f"- **Project duration**: {analysis['project_duration']:g} days\n"
+                    if analysis["anchor_date"]:
+                        text += f"- **Anchored at**: {analysis['anchor_date']}\n"
+
+                    text += f"\n**Critical path ({len(analysis['critical_path'])} work packages):**\n"
+                    for step in analysis["critical_path"]:
+                        text += (
+                            f"- #{step['id']} {step['subject'] or ''} "
+                            f"(day {step['earliest_start']:g} → {step['earliest_finish']:g})\n"
+                        )
+
+                    flexible = sorted(
+                        (node for node in analysis["nodes"] if not node["critical"]),
+                        key=lambda node: node["slack"],
+                    )
+                    if flexible:
+                        text += f"\n**Least slack outside the critical path:**\n"
+                        for node in flexible[:limit]:
+                            text += (
+                                f"- #{node['id']} {node['subject'] or ''}: "
+                                f"slack {node['slack']:g} days "
+                                f"(ES {node['earliest_start']:g}, LS {node['latest_start']:g})\n"
+                            )
+
+                    return [TextContent(type="text", text=text)]
+
+                elif name == "create_project_snapshot":
+                    project_id = arguments["project_id"]
+                    snapshot = await self.client.create_project_snapshot(
+                        project_id, arguments.get("label")
+                    )
+                    snapshots = self.client.list_project_snapshots(project_id)
+
+                    text = f"📸 **Snapshot stored for project #{project_id}**\n\n"
+                    text += f"- **ID**: {snapshot['id']}\n"
+                    text += f"- **Taken at**: {snapshot['taken_at']}\n"
+                    text += f"- **Work packages**: {snapshot['count']}\n"
+                    text += f"- **Stored snapshots**: {len(snapshots)}\n"
+
+                    return [TextContent(type="text", text=text)]
+
+                elif name == "diff_project_snapshots":
+                    project_id = arguments["project_id"]
+                    limit = arguments.get("limit", 20)
+                    diff = await self.client.diff_project_snapshots(
+                        project_id, arguments.get("base"), arguments.get("target")
+                    )
+
+                    text = f"🔍 **Snapshot diff for project #{project_id}**\n\n"
+                    text += f"- **From**: {diff['base']['id']} ({diff['base']['count']} work packages)\n"
+                    text += f"- **To**: {diff['target']['id']} ({diff['target']['count']} work packages)\n"
+
+                    def describe(value):
+                        if isinstance(value, dict):
+                            return f"{value['start_date'] or '?'} → {value['due_date'] or '?'}"
+                        return "none" if value is None else str(value)
+
+                    for change, items in diff["changes"].items():
+                        if not items:
+                            continue
+                        text += f"\n**{change.replace('_', ' ').capitalize()} ({len(items)}):**\n"
+                        for item in items[:limit]:
+                            line = f"- #{item['id']} {item.get('subject') or ''}"
+                            if "from" in item:
+                                line += f": {describe(item['from'])} ⇒ {describe(item['to'])}"
+                            text += line + "\n"
+                        if len(items) > limit:
+                            text += f"- … {len(items) - limit} more\n"
+
+                    if not any(diff["summary"].values()):
+                        text += "\nNo changes between the two snapshots.\n"
+
+                    return [TextContent(type="text", text=text)]
+
                 elif name == "list_work_package_relations":
                     filters = None
                     filter_conditions = []
@@ -3954,6 +8061,12 @@ class OpenProjectMCPServer:
 
                 return [TextContent(type="text", text=error_text)]
 
+        @self.server.call_tool()
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+            """Execute a tool, sharing id lookups across everything it resolves"""
+            with OpenProjectClient.request_scope():
+                return await execute_tool(name, arguments)
+
     async def run(self):
         """Start the MCP server"""
         # Initialize OpenProject client from environment variables
@@ -3976,13 +8089,21 @@ class OpenProjectMCPServer:
                 except Exception as e:
                     logger.error(f"❌ API connection test failed: {e}")
 
+            # Optional: open connections and prefetch reference data before serving
+            if os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true":
+                await self.client.warm_up()
+
         # Start the server
         from mcp.server.stdio import stdio_server
 
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream, write_stream, self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream, write_stream, self.server.create_initialization_options()
+                )
+        finally:
+            if self.client:
+                await self.client.close()
 
 
 async def main():
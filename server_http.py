@@ -1,5 +1,5 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Request, HTTPException, Depends, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
@@ -8,16 +8,38 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import secrets
 import asyncio
+import hashlib
+import hmac
+import codecs
+import csv
+import io
+import zlib
 import os
 import logging
 import json
-from typing import Optional, Dict, Any, List
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 from pythonjsonlogger import jsonlogger
 
 # Importar el cliente OpenProject
-from openproject_mcp import OpenProjectClient
+from openproject_mcp import (
+    ImportRowParser,
+    OpenProjectClient,
+    RelationConflictError,
+    TIME_ENTRY_GROUPS,
+    WORK_PACKAGE_CRITERIA,
+    normalize_webhook,
+    parse_iso_duration,
+    project_filters,
+    time_entry_filters,
+    work_package_filters,
+    work_package_sort,
+)
 
 # Cargar variables de entorno
 load_dotenv()
@@ -53,6 +75,8 @@ OPENPROJECT_PROXY = os.getenv("OPENPROJECT_PROXY")
 # Configuración HTTP Server
 HTTP_HOST = os.getenv("HTTP_HOST", "0.0.0.0")
 HTTP_PORT = int(os.getenv("HTTP_PORT", "8000"))
+# Número de procesos worker (uvicorn --workers). Cada worker tiene su propio cliente
+HTTP_WORKERS = int(os.getenv("HTTP_WORKERS", "1"))
 
 # Autenticación HTTP (opcional)
 HTTP_AUTH_ENABLED = os.getenv("HTTP_AUTH_ENABLED", "false").lower() == "true"
@@ -65,64 +89,54 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 
 # Rate Limiting
 RATE_LIMIT = os.getenv("RATE_LIMIT", "100/minute")
+# Almacenamiento del rate limiter. 'memory://' es local a cada worker (el límite
+# efectivo se multiplica por HTTP_WORKERS); usar redis:// o memcached:// para
+# compartirlo entre procesos
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
 
 # GZIP
 GZIP_ENABLED = os.getenv("GZIP_ENABLED", "true").lower() == "true"
 GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1000"))
 
-# Crear cliente global
-client = OpenProjectClient(
-    base_url=OPENPROJECT_URL,
-    api_key=OPENPROJECT_API_KEY,
-    proxy=OPENPROJECT_PROXY
-)
+# Batch (/batch)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "10"))
+
+# Jobs asíncronos (/jobs). El estado y los resultados se guardan en disco para
+# que cualquier worker pueda consultarlos
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(tempfile.gettempdir(), "openproject_mcp_jobs"))
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "50"))
+JOBS_TTL_SECONDS = int(os.getenv("JOBS_TTL_SECONDS", "3600"))
+JOBS_CHUNK_SIZE = int(os.getenv("JOBS_CHUNK_SIZE", "500"))
+# Un job en ejecución sin latido durante este tiempo se da por perdido (worker caído)
+JOBS_STALE_SECONDS = int(os.getenv("JOBS_STALE_SECONDS", "300"))
+
+# Export (/export). Elementos pedidos a OpenProject por página
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "200"))
+
+# Import (/import). Máximo de creaciones simultáneas que puede pedir el cliente
+IMPORT_MAX_CONCURRENCY = int(os.getenv("IMPORT_MAX_CONCURRENCY", "16"))
 
-logger.info(f"OpenProject Client initialized for: {OPENPROJECT_URL}")
+# Webhooks de OpenProject (/webhooks/openproject). Sin secreto el endpoint está
+# deshabilitado: la firma X-OP-Signature es su única autenticación
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+# Calentamiento al arrancar: abrir conexiones y precargar datos de referencia.
+# /health/ready responde 503 hasta que termina
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
 
 OPENAPI_BASE_URL = os.getenv("OPENAPI_BASE_URL", f"http://{HTTP_HOST}:{HTTP_PORT}")
 
-# Configurar FastAPI
-app = FastAPI(
-    title="OpenProject MCP HTTP Adapter",
-    description="API REST para acceder a todas las funcionalidades de OpenProject MCP",
-    version="1.1.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_tags=[
-        {"name": "Info", "description": "Información del servidor"},
-        {"name": "Core", "description": "Funcionalidades principales"},
-        {"name": "Projects", "description": "Gestión de proyectos"},
-        {"name": "Work Packages", "description": "Gestión de work packages"},
-        {"name": "Work Package Relations", "description": "Relaciones entre work packages"},
-        {"name": "Users", "description": "Gestión de usuarios"},
-        {"name": "Memberships", "description": "Gestión de membresías"},
-        {"name": "Roles", "description": "Gestión de roles"},
-        {"name": "Time Tracking", "description": "Seguimiento de tiempo"},
-        {"name": "Versions", "description": "Gestión de versiones"},
-        {"name": "REST Aliases", "description": "Endpoints REST simplificados"},
-    ]
-    ,
-    servers=[{"url": OPENAPI_BASE_URL}]
-)
+# Cliente OpenProject del worker actual. Se crea en el lifespan de la aplicación
+# (una instancia por proceso) y se cierra al apagar el worker.
+client: Optional[OpenProjectClient] = None
 
 # Configurar Rate Limiter
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# Configurar CORS
-if CORS_ENABLED:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=CORS_ORIGINS,
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
 
-# Configurar GZIP
-if GZIP_ENABLED:
-    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+# Todos los endpoints se registran en este router y se montan en create_app()
+router = APIRouter()
 
 # Configurar autenticación HTTP Basic (opcional)
 security = HTTPBasic(auto_error=False)
@@ -154,7 +168,7 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)):
 # ENDPOINTS DE INFORMACIÓN
 # ============================================================================
 
-@app.get("/", tags=["Info"])
+@router.get("/", tags=["Info"])
 async def root():
     """Información sobre el servidor"""
     return {
@@ -171,7 +185,7 @@ async def root():
         "documentation": "/docs"
     }
 
-@app.get("/health", tags=["Info"])
+@router.get("/health", tags=["Info"])
 @limiter.limit(RATE_LIMIT)
 async def health_check(request: Request):
     """Verificar estado del servicio (no depende de OpenProject)"""
@@ -179,10 +193,33 @@ async def health_check(request: Request):
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "service": "openproject-mcp-http",
+        "worker_pid": os.getpid(),
     }
 
 
-@app.get("/health/openproject", tags=["Info"])
+@router.get("/health/ready", tags=["Info"])
+@limiter.limit(RATE_LIMIT)
+async def health_ready(request: Request):
+    """Readiness: el worker está listo cuando ha terminado el calentamiento"""
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is not None and not warmup.done():
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "warming_up",
+                "timestamp": datetime.utcnow().isoformat(),
+                "worker_pid": os.getpid(),
+            },
+        )
+    return {
+        "status": "ready",
+        "timestamp": datetime.utcnow().isoformat(),
+        "worker_pid": os.getpid(),
+        "warmup": warmup.result() if warmup is not None else None,
+    }
+
+
+@router.get("/health/openproject", tags=["Info"])
 @limiter.limit(RATE_LIMIT)
 async def health_openproject(request: Request):
     """Verificar estado de la conexión con OpenProject"""
@@ -204,11 +241,21 @@ async def health_openproject(request: Request):
             },
         )
 
+@router.get("/metrics", tags=["Info"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def metrics(request: Request):
+    """Métricas del cliente OpenProject de este worker (límite de concurrencia, colas...)"""
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "worker_pid": os.getpid(),
+        **client.get_metrics(),
+    }
+
 # ============================================================================
 # CORE - Test Connection
 # ============================================================================
 
-@app.post("/tools/test_connection", tags=["Core"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/test_connection", tags=["Core"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def test_connection(request: Request):
     """1. Probar conexión con OpenProject"""
@@ -223,13 +270,32 @@ async def test_connection(request: Request):
 # PROJECTS
 # ============================================================================
 
-@app.post("/tools/list_projects", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+async def _count(name: str, endpoint: str, filters: List[Dict], group_by: Optional[str]) -> Dict:
+    """
+    Respuesta de count_only/group_by.
+
+    count_only es una sola consulta; group_by también lo es para work packages,
+    pero en el resto de colecciones recorre todas las páginas una vez.
+    """
+    try:
+        return await client.count_collection(endpoint, filters, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in {name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/list_projects", tags=["Projects"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_projects(
     request: Request,
-    active_only: bool = True
+    active_only: bool = True,
+    count_only: bool = False,
+    group_by: Optional[str] = None
 ):
     """2. Listar TODOS los proyectos (SIEMPRE devuelve todos sin paginación)"""
+    if count_only or group_by:
+        return await _count("list_projects", "/projects", project_filters(active_only), group_by)
     try:
         # SIEMPRE usar modo de recuperación completa
         # El cliente MCP ahora siempre usa auto-paginación internamente
@@ -267,7 +333,7 @@ async def list_projects(
         logger.error(f"Error in list_projects: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_project(request: Request, project_id: int):
     """24. Obtener información detallada de un proyecto"""
@@ -278,7 +344,7 @@ async def get_project(request: Request, project_id: int):
         logger.error(f"Error in get_project: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/create_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_project(
     request: Request,
@@ -304,7 +370,7 @@ async def create_project(
         logger.error(f"Error in create_project: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/update_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/update_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_project(
     request: Request,
@@ -332,7 +398,7 @@ async def update_project(
         logger.error(f"Error in update_project: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/delete_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/delete_project", tags=["Projects"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_project(request: Request, project_id: int):
     """23. Eliminar un proyecto"""
@@ -343,11 +409,54 @@ async def delete_project(request: Request, project_id: int):
         logger.error(f"Error in delete_project: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tools/create_project_snapshot", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def create_project_snapshot(request: Request, project_id: int, label: Optional[str] = None):
+    """Guardar en disco una instantánea de los work packages de un proyecto"""
+    try:
+        return await client.create_project_snapshot(project_id, label)
+    except Exception as e:
+        logger.error(f"Error in create_project_snapshot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/list_project_snapshots", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def list_project_snapshots(request: Request, project_id: int):
+    """Listar las instantáneas guardadas de un proyecto (de la más antigua a la más reciente)"""
+    try:
+        return {"project_id": project_id, "snapshots": client.list_project_snapshots(project_id)}
+    except Exception as e:
+        logger.error(f"Error in list_project_snapshots: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/diff_project_snapshots", tags=["Projects"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def diff_project_snapshots(
+    request: Request,
+    project_id: int,
+    base: Optional[str] = None,
+    target: Optional[str] = None
+):
+    """Comparar dos instantáneas de un proyecto sin consultar OpenProject"""
+    try:
+        return await client.diff_project_snapshots(project_id, base, target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in diff_project_snapshots: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================================================================
 # WORK PACKAGES
 # ============================================================================
 
-@app.post("/tools/list_work_packages", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+def _work_package_filters(project_id: Optional[int], status: str = "open", **criteria) -> List[Dict]:
+    """Construir los filtros de proyecto, estado ('open', 'closed', 'all' o ids) y demás criterios"""
+    return work_package_filters(project_id=project_id, status=status, **criteria)
+
+@router.post("/tools/list_work_packages", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_work_packages(
     request: Request,
@@ -355,45 +464,69 @@ async def list_work_packages(
     status: str = "open",
     offset: Optional[int] = None,
     page_size: Optional[int] = None,
-    full_retrieval: bool = True
+    full_retrieval: bool = True,
+    assignee: Optional[str] = None,
+    author: Optional[str] = None,
+    responsible: Optional[str] = None,
+    type_id: Optional[str] = None,
+    priority_id: Optional[str] = None,
+    version_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    subject_contains: Optional[str] = None,
+    created_since: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    updated_before: Optional[str] = None,
+    due_after: Optional[str] = None,
+    due_before: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    count_only: bool = False,
+    group_by: Optional[str] = None,
 ):
-    """3. Listar TODOS los work packages (requiere project_id y recupera todo)"""
+    """
+    3. Listar TODOS los work packages (requiere project_id y recupera todo)
+
+    Los criterios (asignado, tipo, prioridad, fechas...) y el orden se traducen a
+    `filters`/`sortBy` de OpenProject, que devuelve solo las filas necesarias.
+    Ids separados por comas; assignee/author/responsible admiten 'me' y
+    assignee/responsible 'none'. sort_by: 'campo[:asc|desc]' separados por comas.
+    count_only/group_by devuelven solo el total o el conteo por grupo.
+    """
+    try:
+        filters = _work_package_filters(
+            project_id,
+            status,
+            assignee=assignee,
+            author=author,
+            responsible=responsible,
+            type_id=type_id,
+            priority_id=priority_id,
+            version_id=version_id,
+            parent_id=parent_id,
+            subject_contains=subject_contains,
+            created_since=created_since,
+            updated_since=updated_since,
+            updated_before=updated_before,
+            due_after=due_after,
+            due_before=due_before,
+        )
+        sort = work_package_sort(sort_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if count_only or group_by:
+        return await _count("list_work_packages", "/work_packages", filters, group_by)
+
     try:
-        # Construir filtros
-        filters = []
-        if project_id:
-            filters.append({
-                "project": {
-                    "operator": "=",
-                    "values": [str(project_id)]
-                }
-            })
-        
-        if status == "open":
-            filters.append({
-                "status": {
-                    "operator": "o",
-                    "values": []
-                }
-            })
-        elif status == "closed":
-            filters.append({
-                "status": {
-                    "operator": "c",
-                    "values": []
-                }
-            })
-        
         # SIEMPRE usar modo de recuperación completa, NO pasar parámetros de paginación al cliente MCP
         # Esto permite que el cliente MCP use auto-paginación
         logger.info(f"Starting FULL retrieval of ALL work packages (project_id={project_id}, status={status})")
         
         result = await client.get_work_packages(
             project_id=project_id,
-            filters=filters if filters else None,
+            filters=filters,
             # NO pasar offset ni page_size para activar auto-paginación en el cliente MCP
             offset=None,
-            page_size=None
+            page_size=None,
+            sort_by=sort or None,
         )
         
         work_packages = result.get("_embedded", {}).get("elements", [])
@@ -414,6 +547,9 @@ async def list_work_packages(
             "_retrieval_info": {
                 "mode": "full_retrieval",
                 "total_retrieved": len(work_packages),
+                "elements_transferred": result.get("_retrieval_info", {}).get(
+                    "elements_transferred", len(work_packages)
+                ),
                 "note": "All work packages retrieved successfully"
             }
         }
@@ -423,7 +559,7 @@ async def list_work_packages(
         logger.error(f"Error in list_work_packages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_work_package(request: Request, work_package_id: int):
     """11. Obtener información detallada de un work package"""
@@ -434,7 +570,7 @@ async def get_work_package(request: Request, work_package_id: int):
         logger.error(f"Error in get_work_package: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_work_package_activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_work_package_activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_work_package_activities(request: Request, work_package_id: int):
     """11b. Listar actividades de un work package"""
@@ -445,7 +581,7 @@ async def list_work_package_activities(request: Request, work_package_id: int):
         logger.error(f"Error in list_work_package_activities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/add_work_package_comment", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/add_work_package_comment", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def add_work_package_comment(
     request: Request,
@@ -467,7 +603,7 @@ async def add_work_package_comment(
         logger.error(f"Error in add_work_package_comment: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_work_package_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/create_work_package_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_work_package_reminder(
     request: Request,
@@ -487,7 +623,7 @@ async def create_work_package_reminder(
         logger.error(f"Error in create_work_package_reminder: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/tools/list_work_package_reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.get("/tools/list_work_package_reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_work_package_reminders(request: Request, work_package_id: int):
     """11g. Listar recordatorios de un work package"""
@@ -498,7 +634,7 @@ async def list_work_package_reminders(request: Request, work_package_id: int):
         logger.error(f"Error in list_work_package_reminders: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/tools/list_reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.get("/tools/list_reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_reminders(request: Request):
     """11h. Listar recordatorios activos del usuario"""
@@ -509,7 +645,7 @@ async def list_reminders(request: Request):
         logger.error(f"Error in list_reminders: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.delete("/tools/delete_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.delete("/tools/delete_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_reminder(request: Request, reminder_id: int):
     """11e. Eliminar recordatorio"""
@@ -520,7 +656,7 @@ async def delete_reminder(request: Request, reminder_id: int):
         logger.error(f"Error in delete_reminder: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.patch("/tools/update_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.patch("/tools/update_reminder", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_reminder(
     request: Request,
@@ -542,7 +678,7 @@ async def update_reminder(
         logger.error(f"Error in update_reminder: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/create_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_work_package(
     request: Request,
@@ -575,7 +711,7 @@ async def create_work_package(
         logger.error(f"Error in create_work_package: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/update_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/update_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_work_package(
     request: Request,
@@ -605,7 +741,7 @@ async def update_work_package(
         logger.error(f"Error in update_work_package: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/delete_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/delete_work_package", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_work_package(request: Request, work_package_id: int):
     """13. Eliminar un work package"""
@@ -616,7 +752,7 @@ async def delete_work_package(request: Request, work_package_id: int):
         logger.error(f"Error in delete_work_package: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_types", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_types", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_types(request: Request, project_id: Optional[int] = None):
     """4. Listar tipos de work packages"""
@@ -627,7 +763,23 @@ async def list_types(request: Request, project_id: Optional[int] = None):
         logger.error(f"Error in list_types: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_statuses", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/workload_summary", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def workload_summary(
+    request: Request,
+    project_id: Optional[int] = None,
+    status: str = "open"
+):
+    """Número de work packages por asignado y por proyecto, desglosado por estado"""
+    if status not in ("open", "closed", "all"):
+        raise HTTPException(status_code=400, detail="status must be open, closed or all")
+    try:
+        return await client.workload_summary(project_id=project_id, status=status)
+    except Exception as e:
+        logger.error(f"Error in workload_summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/list_statuses", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_statuses(request: Request):
     """9. Listar estados de work packages"""
@@ -638,7 +790,7 @@ async def list_statuses(request: Request):
         logger.error(f"Error in list_statuses: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_priorities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_priorities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_priorities(request: Request):
     """10. Listar prioridades de work packages"""
@@ -653,7 +805,7 @@ async def list_priorities(request: Request):
 # WORK PACKAGE RELATIONS
 # ============================================================================
 
-@app.post("/tools/set_work_package_parent", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/set_work_package_parent", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def set_work_package_parent(request: Request, work_package_id: int, parent_id: int):
     """33. Establecer relación padre-hijo entre work packages"""
@@ -667,7 +819,7 @@ async def set_work_package_parent(request: Request, work_package_id: int, parent
         logger.error(f"Error in set_work_package_parent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/remove_work_package_parent", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/remove_work_package_parent", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def remove_work_package_parent(request: Request, work_package_id: int):
     """34. Eliminar relación padre de un work package"""
@@ -678,7 +830,7 @@ async def remove_work_package_parent(request: Request, work_package_id: int):
         logger.error(f"Error in remove_work_package_parent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_work_package_children", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_work_package_children", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_work_package_children(
     request: Request,
@@ -696,7 +848,32 @@ async def list_work_package_children(
         logger.error(f"Error in list_work_package_children: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_work_package_tree", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def get_work_package_tree(
+    request: Request,
+    work_package_id: int,
+    max_depth: Optional[int] = None
+):
+    """Árbol completo de descendientes con totales agregados (% completado, estados)"""
+    try:
+        return await client.get_work_package_tree(work_package_id, max_depth)
+    except Exception as e:
+        logger.error(f"Error in get_work_package_tree: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _relation_conflict(error: RelationConflictError) -> HTTPException:
+    """Relación rechazada localmente (duplicada o ciclo) -> 409 con el camino en conflicto"""
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": str(error),
+            "path": [int(key) for key in error.path],
+            "conflicting_relation_id": error.relation_id,
+        },
+    )
+
+@router.post("/tools/create_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_work_package_relation(
     request: Request,
@@ -708,19 +885,20 @@ async def create_work_package_relation(
 ):
     """36. Crear relación entre work packages"""
     try:
-        result = await client.create_work_package_relation(
-            from_id=from_id,
-            to_id=to_id,
-            relation_type=relation_type,
-            lag=lag,
-            description=description
-        )
+        data = {"from_id": from_id, "to_id": to_id, "relation_type": relation_type}
+        if lag is not None:
+            data["lag"] = lag
+        if description is not None:
+            data["description"] = description
+        result = await client.create_work_package_relation(data)
         return result
+    except RelationConflictError as e:
+        raise _relation_conflict(e)
     except Exception as e:
         logger.error(f"Error in create_work_package_relation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_work_package_relations", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_work_package_relations", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_work_package_relations(
     request: Request,
@@ -738,7 +916,20 @@ async def list_work_package_relations(
         logger.error(f"Error in list_work_package_relations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/analyze_project_schedule", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def analyze_project_schedule(request: Request, project_id: int, include_nodes: bool = True):
+    """Ruta crítica, holguras y orden topológico de los work packages de un proyecto"""
+    try:
+        analysis = await client.analyze_project_schedule(project_id)
+        if not include_nodes:
+            analysis = {key: value for key, value in analysis.items() if key != "nodes"}
+        return analysis
+    except Exception as e:
+        logger.error(f"Error in analyze_project_schedule: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/get_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_work_package_relation(request: Request, relation_id: int):
     """40. Obtener información detallada de una relación"""
@@ -749,7 +940,7 @@ async def get_work_package_relation(request: Request, relation_id: int):
         logger.error(f"Error in get_work_package_relation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/update_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/update_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_work_package_relation(
     request: Request,
@@ -760,18 +951,20 @@ async def update_work_package_relation(
 ):
     """38. Actualizar una relación existente"""
     try:
-        result = await client.update_work_package_relation(
-            relation_id=relation_id,
-            relation_type=relation_type,
-            lag=lag,
-            description=description
-        )
+        data = {
+            key: value for key, value in
+            (("relation_type", relation_type), ("lag", lag), ("description", description))
+            if value is not None
+        }
+        result = await client.update_work_package_relation(relation_id, data)
         return result
+    except RelationConflictError as e:
+        raise _relation_conflict(e)
     except Exception as e:
         logger.error(f"Error in update_work_package_relation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/delete_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/delete_work_package_relation", tags=["Work Package Relations"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_work_package_relation(request: Request, relation_id: int):
     """39. Eliminar una relación"""
@@ -786,7 +979,7 @@ async def delete_work_package_relation(request: Request, relation_id: int):
 # USERS
 # ============================================================================
 
-@app.post("/tools/list_users", tags=["Users"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_users", tags=["Users"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_users(request: Request, active_only: bool = True):
     """6. Listar usuarios"""
@@ -797,7 +990,7 @@ async def list_users(request: Request, active_only: bool = True):
         logger.error(f"Error in list_users: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_user", tags=["Users"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_user", tags=["Users"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_user(request: Request, user_id: int):
     """7. Obtener información de un usuario"""
@@ -808,25 +1001,38 @@ async def get_user(request: Request, user_id: int):
         logger.error(f"Error in get_user: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tools/find_user", tags=["Users"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def find_user(request: Request, query: str, limit: int = 10):
+    """Buscar usuarios por nombre, login o email (sin distinguir mayúsculas ni acentos)"""
+    try:
+        return await client.find_user(query, limit)
+    except Exception as e:
+        logger.error(f"Error in find_user: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================================================================
 # MEMBERSHIPS
 # ============================================================================
 
-@app.post("/tools/list_memberships", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_memberships", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_memberships(
     request: Request,
     project_id: Optional[int] = None,
-    user_id: Optional[int] = None
+    user_id: Optional[int] = None,
+    count_only: bool = False,
+    group_by: Optional[str] = None
 ):
-    """8. Listar membresías de proyectos"""
+    """8. Listar membresías de proyectos (count_only/group_by: solo el total o el conteo por grupo)"""
+    filters = []
+    if project_id:
+        filters.append({"project": {"operator": "=", "values": [str(project_id)]}})
+    if user_id:
+        filters.append({"principal": {"operator": "=", "values": [str(user_id)]}})
+    if count_only or group_by:
+        return await _count("list_memberships", "/memberships", filters, group_by)
     try:
-        filters = []
-        if project_id:
-            filters.append({"project": {"operator": "=", "values": [str(project_id)]}})
-        if user_id:
-            filters.append({"principal": {"operator": "=", "values": [str(user_id)]}})
-        
         result = await client.get_memberships(
             filters=filters if filters else None, full_retrieval=True
         )
@@ -835,7 +1041,7 @@ async def list_memberships(
         logger.error(f"Error in list_memberships: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_membership(request: Request, membership_id: int):
     """28. Obtener información de una membresía"""
@@ -846,7 +1052,7 @@ async def get_membership(request: Request, membership_id: int):
         logger.error(f"Error in get_membership: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/create_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_membership(
     request: Request,
@@ -871,7 +1077,7 @@ async def create_membership(
         logger.error(f"Error in create_membership: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/update_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/update_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_membership(
     request: Request,
@@ -892,7 +1098,7 @@ async def update_membership(
         logger.error(f"Error in update_membership: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/delete_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/delete_membership", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_membership(request: Request, membership_id: int):
     """27. Eliminar una membresía"""
@@ -903,24 +1109,23 @@ async def delete_membership(request: Request, membership_id: int):
         logger.error(f"Error in delete_membership: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_project_members", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_project_members", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_project_members(request: Request, project_id: int):
     """29. Listar miembros de un proyecto"""
     try:
-        filters = [{"project": {"operator": "=", "values": [str(project_id)]}}]
-        result = await client.get_memberships(filters=filters, full_retrieval=True)
+        result = await client.list_project_members(project_id)
         return result
     except Exception as e:
         logger.error(f"Error in list_project_members: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_user_projects", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_user_projects", tags=["Memberships"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_user_projects(request: Request, user_id: int):
     """30. Listar proyectos de un usuario"""
     try:
-        result = await client.get_memberships(user_id=user_id, full_retrieval=True)
+        result = await client.list_user_projects(user_id)
         return result
     except Exception as e:
         logger.error(f"Error in list_user_projects: {e}")
@@ -930,7 +1135,7 @@ async def list_user_projects(request: Request, user_id: int):
 # ROLES
 # ============================================================================
 
-@app.post("/tools/list_roles", tags=["Roles"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_roles", tags=["Roles"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_roles(request: Request):
     """31. Listar roles disponibles"""
@@ -941,7 +1146,7 @@ async def list_roles(request: Request):
         logger.error(f"Error in list_roles: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/get_role", tags=["Roles"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/get_role", tags=["Roles"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def get_role(request: Request, role_id: int):
     """32. Obtener información de un rol"""
@@ -956,14 +1161,19 @@ async def get_role(request: Request, role_id: int):
 # TIME TRACKING
 # ============================================================================
 
-@app.post("/tools/list_time_entries", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_time_entries", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_time_entries(
     request: Request,
     work_package_id: Optional[int] = None,
-    user_id: Optional[int] = None
+    user_id: Optional[int] = None,
+    count_only: bool = False,
+    group_by: Optional[str] = None
 ):
-    """14. Listar entradas de tiempo"""
+    """14. Listar entradas de tiempo (count_only/group_by: solo el total o el conteo por grupo)"""
+    if count_only or group_by:
+        filters = time_entry_filters(user_id=user_id, work_package_id=work_package_id)
+        return await _count("list_time_entries", "/time_entries", filters, group_by)
     try:
         filters = []
         if work_package_id:
@@ -977,7 +1187,47 @@ async def list_time_entries(
         logger.error(f"Error in list_time_entries: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+def _group_by_dimensions(group_by: Any) -> Optional[List[str]]:
+    """Dimensiones de group_by a partir de una lista o de un texto separado por comas"""
+    if group_by is None:
+        return None
+    items = group_by if isinstance(group_by, list) else str(group_by).split(",")
+    return [str(d).strip() for d in items if str(d).strip()]
+
+@router.post("/tools/summarize_time_entries", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def summarize_time_entries(
+    request: Request,
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    work_package_id: Optional[int] = None,
+    activity_id: Optional[int] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    group_by: str = "user"
+):
+    """Total de horas agrupado (group_by separado por comas: user,project,work_package,activity,day,week,month)"""
+    dimensions = _group_by_dimensions(group_by)
+    unknown = [d for d in dimensions if d not in TIME_ENTRY_GROUPS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by: {', '.join(unknown)}")
+    try:
+        return await client.summarize_time_entries(
+            project_id=project_id,
+            user_id=user_id,
+            work_package_id=work_package_id,
+            activity_id=activity_id,
+            from_date=from_date,
+            to_date=to_date,
+            group_by=dimensions,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in summarize_time_entries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tools/create_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_time_entry(
     request: Request,
@@ -1001,7 +1251,7 @@ async def create_time_entry(
         logger.error(f"Error in create_time_entry: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/update_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/update_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def update_time_entry(
     request: Request,
@@ -1025,7 +1275,7 @@ async def update_time_entry(
         logger.error(f"Error in update_time_entry: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/delete_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/delete_time_entry", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def delete_time_entry(request: Request, time_entry_id: int):
     """17. Eliminar entrada de tiempo"""
@@ -1036,7 +1286,7 @@ async def delete_time_entry(request: Request, time_entry_id: int):
         logger.error(f"Error in delete_time_entry: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/list_time_entry_activities", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_time_entry_activities", tags=["Time Tracking"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_time_entry_activities(request: Request):
     """18. Listar actividades de time entries (con IDs predefinidos)"""
@@ -1051,7 +1301,7 @@ async def list_time_entry_activities(request: Request):
 # VERSIONS
 # ============================================================================
 
-@app.post("/tools/list_versions", tags=["Versions"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/list_versions", tags=["Versions"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def list_versions(request: Request, project_id: Optional[int] = None):
     """19. Listar versiones/hitos"""
@@ -1066,7 +1316,7 @@ async def list_versions(request: Request, project_id: Optional[int] = None):
         logger.error(f"Error in list_versions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/create_version", tags=["Versions"], dependencies=[Depends(verify_credentials)])
+@router.post("/tools/create_version", tags=["Versions"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def create_version(
     request: Request,
@@ -1096,14 +1346,14 @@ async def create_version(
 # REST ALIASES - Endpoints estilo REST más simples
 # ============================================================================
 
-@app.get("/api/v1/projects", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/projects", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_projects(request: Request, active: bool = True):
     """Alias REST: Listar proyectos"""
     # Llamar directamente sin parámetros de paginación para forzar recuperación completa
     return await list_projects(request, active_only=active)
 
-@app.post("/api/v1/projects", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.post("/api/v1/projects", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_create_project(
     request: Request,
@@ -1115,13 +1365,13 @@ async def rest_create_project(
     """Alias REST: Crear proyecto"""
     return await create_project(request, name, identifier, description, public)
 
-@app.get("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_get_project(request: Request, project_id: int):
     """Alias REST: Obtener proyecto específico"""
     return await get_project(request, project_id)
 
-@app.put("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.put("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_update_project(
     request: Request,
@@ -1133,25 +1383,25 @@ async def rest_update_project(
     """Alias REST: Actualizar proyecto"""
     return await update_project(request, project_id, name, identifier, description)
 
-@app.delete("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.delete("/api/v1/projects/{project_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_delete_project(request: Request, project_id: int):
     """Alias REST: Eliminar proyecto"""
     return await delete_project(request, project_id)
 
-@app.get("/api/v1/users", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/users", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_users(request: Request, active: bool = True):
     """Alias REST: Listar usuarios"""
     return await list_users(request, active)
 
-@app.get("/api/v1/users/{user_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/users/{user_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_get_user(request: Request, user_id: int):
     """Alias REST: Obtener usuario específico"""
     return await get_user(request, user_id)
 
-@app.get("/api/v1/workpackages", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/workpackages", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_workpackages(
     request: Request,
@@ -1161,7 +1411,7 @@ async def rest_list_workpackages(
     """Alias REST: Listar work packages"""
     return await list_work_packages(request, project_id, status)
 
-@app.post("/api/v1/workpackages", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.post("/api/v1/workpackages", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_create_workpackage(
     request: Request,
@@ -1175,19 +1425,19 @@ async def rest_create_workpackage(
     """Alias REST: Crear work package"""
     return await create_work_package(request, project_id, subject, type_id, description, priority_id, assignee_id)
 
-@app.get("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_get_workpackage(request: Request, work_package_id: int):
     """Alias REST: Obtener work package específico"""
     return await get_work_package(request, work_package_id)
 
-@app.get("/api/v1/workpackages/{work_package_id}/activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/workpackages/{work_package_id}/activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_workpackage_activities(request: Request, work_package_id: int):
     """Alias REST: Listar actividades de un work package"""
     return await list_work_package_activities(request, work_package_id)
 
-@app.post("/api/v1/workpackages/{work_package_id}/activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/api/v1/workpackages/{work_package_id}/activities", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_add_workpackage_comment(
     request: Request,
@@ -1205,7 +1455,7 @@ async def rest_add_workpackage_comment(
         notify=notify
     )
 
-@app.post("/api/v1/workpackages/{work_package_id}/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.post("/api/v1/workpackages/{work_package_id}/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_create_workpackage_reminder(
     request: Request,
@@ -1221,25 +1471,25 @@ async def rest_create_workpackage_reminder(
         note=note
     )
 
-@app.get("/api/v1/workpackages/{work_package_id}/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/workpackages/{work_package_id}/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_workpackage_reminders(request: Request, work_package_id: int):
     """Alias REST: Listar recordatorios de un work package"""
     return await list_work_package_reminders(request, work_package_id)
 
-@app.get("/api/v1/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/reminders", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_reminders(request: Request):
     """Alias REST: Listar recordatorios activos del usuario"""
     return await list_reminders(request)
 
-@app.delete("/api/v1/reminders/{reminder_id}", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.delete("/api/v1/reminders/{reminder_id}", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_delete_reminder(request: Request, reminder_id: int):
     """Alias REST: Eliminar recordatorio"""
     return await delete_reminder(request, reminder_id)
 
-@app.patch("/api/v1/reminders/{reminder_id}", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
+@router.patch("/api/v1/reminders/{reminder_id}", tags=["Work Packages"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_update_reminder(
     request: Request,
@@ -1250,7 +1500,7 @@ async def rest_update_reminder(
     """Alias REST: Actualizar recordatorio"""
     return await update_reminder(request, reminder_id, remind_at, note)
 
-@app.put("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.put("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_update_workpackage(
     request: Request,
@@ -1263,19 +1513,19 @@ async def rest_update_workpackage(
     """Alias REST: Actualizar work package"""
     return await update_work_package(request, work_package_id, subject, description, None, status_id, priority_id)
 
-@app.delete("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.delete("/api/v1/workpackages/{work_package_id}", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_delete_workpackage(request: Request, work_package_id: int):
     """Alias REST: Eliminar work package"""
     return await delete_work_package(request, work_package_id)
 
-@app.get("/api/v1/roles", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/roles", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_roles(request: Request):
     """Alias REST: Listar roles"""
     return await list_roles(request)
 
-@app.get("/api/v1/memberships", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/memberships", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_memberships(
     request: Request,
@@ -1285,7 +1535,7 @@ async def rest_list_memberships(
     """Alias REST: Listar membresías"""
     return await list_memberships(request, project_id, user_id)
 
-@app.get("/api/v1/time-entries", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
+@router.get("/api/v1/time-entries", tags=["REST Aliases"], dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def rest_list_time_entries(
     request: Request,
@@ -1295,11 +1545,950 @@ async def rest_list_time_entries(
     """Alias REST: Listar entradas de tiempo"""
     return await list_time_entries(request, work_package_id, user_id)
 
+# ============================================================================
+# BATCH - Varias herramientas en una sola petición HTTP
+# ============================================================================
+
+def _filters_for(**values) -> Optional[List[Dict]]:
+    """Construir filtros OpenProject '=' a partir de los valores no vacíos"""
+    filters = [
+        {name: {"operator": "=", "values": [str(value)]}}
+        for name, value in values.items()
+        if value
+    ]
+    return filters or None
+
+
+# Herramientas disponibles en /batch: nombre -> (llamada al cliente, cacheable).
+# Solo las lecturas se comparten dentro del batch; las escrituras se ejecutan siempre.
+BATCH_TOOLS = {
+    "test_connection": (lambda c, p: c.test_connection(), True),
+    "list_projects": (lambda c, p: c.get_projects(active_only=p.get("active_only", True)), True),
+    "get_project": (lambda c, p: c.get_project(int(p["project_id"])), True),
+    "get_work_package": (lambda c, p: c.get_work_package(int(p["work_package_id"])), True),
+    "list_work_package_activities": (
+        lambda c, p: c.get_work_package_activities(int(p["work_package_id"])), True
+    ),
+    "list_work_package_children": (
+        lambda c, p: c.list_work_package_children(
+            int(p["parent_id"]), p.get("include_descendants", False)
+        ),
+        True,
+    ),
+    "get_work_package_tree": (
+        lambda c, p: c.get_work_package_tree(int(p["work_package_id"]), p.get("max_depth")),
+        True,
+    ),
+    "list_work_package_reminders": (
+        lambda c, p: c.list_work_package_reminders(int(p["work_package_id"])), True
+    ),
+    "get_work_package_relation": (
+        lambda c, p: c.get_work_package_relation(int(p["relation_id"])), True
+    ),
+    "analyze_project_schedule": (
+        lambda c, p: c.analyze_project_schedule(int(p["project_id"])), True
+    ),
+    "diff_project_snapshots": (
+        lambda c, p: c.diff_project_snapshots(int(p["project_id"]), p.get("base"), p.get("target")),
+        True,
+    ),
+    "list_types": (lambda c, p: c.get_types(p.get("project_id")), True),
+    "list_statuses": (lambda c, p: c.get_statuses(), True),
+    "workload_summary": (
+        lambda c, p: c.workload_summary(p.get("project_id"), p.get("status", "open")), True
+    ),
+    "list_priorities": (lambda c, p: c.get_priorities(), True),
+    "list_users": (lambda c, p: c.get_users(), True),
+    "get_user": (lambda c, p: c.get_user(int(p["user_id"])), True),
+    "find_user": (lambda c, p: c.find_user(p["query"], int(p.get("limit", 10))), True),
+    "list_memberships": (
+        lambda c, p: c.get_memberships(
+            project_id=p.get("project_id"), user_id=p.get("user_id"), full_retrieval=True
+        ),
+        True,
+    ),
+    "get_membership": (lambda c, p: c.get_membership(int(p["membership_id"])), True),
+    "list_project_members": (
+        lambda c, p: c.list_project_members(int(p["project_id"])), True
+    ),
+    "list_user_projects": (lambda c, p: c.list_user_projects(int(p["user_id"])), True),
+    "list_roles": (lambda c, p: c.get_roles(), True),
+    "get_role": (lambda c, p: c.get_role(int(p["role_id"])), True),
+    "list_time_entries": (
+        lambda c, p: c.get_time_entries(
+            filters=_filters_for(work_package=p.get("work_package_id"), user=p.get("user_id"))
+        ),
+        True,
+    ),
+    "summarize_time_entries": (
+        lambda c, p: c.summarize_time_entries(
+            **{key: p[key] for key in
+               ("project_id", "user_id", "work_package_id", "activity_id",
+                "from_date", "to_date") if key in p},
+            group_by=_group_by_dimensions(p.get("group_by")),
+        ),
+        True,
+    ),
+    "list_time_entry_activities": (lambda c, p: c.get_time_entry_activities(), True),
+    "list_versions": (
+        lambda c, p: c.get_versions(filters=_filters_for(project=p.get("project_id"))), True
+    ),
+    "add_work_package_comment": (
+        lambda c, p: c.add_work_package_comment(
+            work_package_id=int(p["work_package_id"]),
+            comment=p["comment"],
+            internal=p.get("internal", False),
+            notify=p.get("notify"),
+        ),
+        False,
+    ),
+    "create_time_entry": (
+        lambda c, p: c.create_time_entry(
+            {key: p[key] for key in
+             ("work_package_id", "hours", "spent_on", "comment", "activity_id") if key in p}
+        ),
+        False,
+    ),
+}
+
+
+async def run_batch(
+    items: List[Dict[str, Any]], concurrency: int = BATCH_MAX_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Ejecutar una lista de llamadas {tool, params} de forma concurrente.
+
+    Las lecturas idénticas dentro del mismo batch comparten una única llamada
+    al upstream (caché con alcance de la petición). Los resultados se devuelven
+    en el mismo orden que las entradas, con estado y tiempo por elemento.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    shared: Dict[str, asyncio.Task] = {}
+
+    async def call_upstream(call):
+        async with semaphore:
+            return await call
+
+    async def run_item(index: int, item: Any) -> Dict[str, Any]:
+        started = time.perf_counter()
+        tool = item.get("tool") if isinstance(item, dict) else None
+        params = (item.get("params") or {}) if isinstance(item, dict) else {}
+        entry: Dict[str, Any] = {"index": index, "tool": tool}
+
+        try:
+            if tool not in BATCH_TOOLS:
+                raise ValueError(f"Unknown tool: {tool}")
+            if not isinstance(params, dict):
+                raise ValueError("params must be an object")
+
+            tool_fn, cacheable = BATCH_TOOLS[tool]
+            key = f"{tool}:{json.dumps(params, sort_keys=True, default=str)}"
+            task = shared.get(key) if cacheable else None
+            cached = task is not None
+            if not cached:
+                # Las funciones leen params al construir la llamada y el cliente
+                # solo se ejecuta al esperarla: solo estos errores son del llamante
+                try:
+                    call = tool_fn(client, params)
+                except KeyError as e:
+                    raise ValueError(f"Missing parameter: {e}")
+                except TypeError as e:
+                    raise ValueError(f"Invalid parameter: {e}")
+            if cacheable:
+                if task is None:
+                    task = asyncio.ensure_future(call_upstream(call))
+                    shared[key] = task
+                # shield: un elemento cancelado no cancela a los que comparten la llamada
+                result = await asyncio.shield(task)
+            else:
+                result = await call_upstream(call)
+
+            entry.update({"status": 200, "ok": True, "cached": cached, "result": result})
+        except ValueError as e:
+            entry.update({"status": 400, "ok": False, "error": str(e)})
+        except Exception as e:
+            # KeyError también es LookupError, pero durante la ejecución es un fallo interno
+            if isinstance(e, LookupError) and not isinstance(e, KeyError):
+                entry.update({"status": 404, "ok": False, "error": str(e)})
+            else:
+                logger.error(f"Error in batch item {index} ({tool}): {e}")
+                entry.update({"status": 500, "ok": False, "error": str(e)})
+
+        entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return entry
+
+    return await asyncio.gather(*(run_item(i, item) for i, item in enumerate(items)))
+
+
+@router.post("/batch", tags=["Batch"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def batch(request: Request):
+    """
+    Ejecutar varias herramientas en una sola petición.
+
+    Body: {"requests": [{"tool": "get_work_package", "params": {"work_package_id": 1}}, ...],
+           "concurrency": 5}
+    """
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    items = data.get("requests") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="requests must be a list of {tool, params}")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many requests in batch ({len(items)} > {BATCH_MAX_ITEMS})",
+        )
+
+    concurrency = BATCH_MAX_CONCURRENCY
+    if isinstance(data, dict) and data.get("concurrency"):
+        try:
+            concurrency = max(1, min(int(data["concurrency"]), BATCH_MAX_CONCURRENCY))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="concurrency must be an integer")
+
+    started = time.perf_counter()
+    results = await run_batch(items, concurrency=concurrency)
+    succeeded = sum(1 for r in results if r["ok"])
+
+    logger.info(f"Batch complete: {succeeded}/{len(results)} succeeded (concurrency={concurrency})")
+
+    return {
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "concurrency": concurrency,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results,
+    }
+
+# ============================================================================
+# JOBS - Recuperaciones largas en segundo plano
+# ============================================================================
+
+class JobCancelled(Exception):
+    """El job se canceló mientras se ejecutaba"""
+
+
+def _work_package_job(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Argumentos de iter_collection para el job list_work_packages"""
+    project_id = int(p["project_id"])
+    filters = _work_package_filters(
+        project_id,
+        p.get("status", "open"),
+        **{key: p.get(key) for key in WORK_PACKAGE_CRITERIA},
+    )
+    # filters se envía siempre (aunque sea "[]") para no heredar el filtro
+    # por defecto de OpenProject (solo work packages abiertos)
+    params = {"filters": json.dumps(filters)}
+    sort = work_package_sort(p.get("sort_by"))
+    if sort:
+        params["sortBy"] = json.dumps(sort)
+    return {"endpoint": f"/projects/{project_id}/work_packages", "params": params}
+
+
+# Tipos de job: nombre -> función (params) que devuelve los argumentos de
+# client.iter_collection. Cada página se vuelca a disco según llega, sin
+# acumular el resultado completo en memoria.
+JOB_KINDS = {
+    "list_work_packages": _work_package_job,
+    "list_projects": lambda p: {
+        "endpoint": "/projects",
+        "filters": project_filters(p.get("active_only", True)),
+    },
+    "list_project_members": lambda p: {
+        "endpoint": "/memberships",
+        "filters": _filters_for(project=int(p["project_id"])),
+    },
+}
+
+# Estados en los que el job ya no va a cambiar
+JOB_FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+
+class JobManager:
+    """
+    Cola de jobs con un pool acotado de tareas worker.
+
+    Cada job guarda su estado en `<id>.json` y sus resultados en `<id>.jsonl`
+    (un elemento por línea, escritos página a página) dentro de JOBS_DIR. La
+    cancelación se señaliza con un fichero `<id>.cancel`, de modo que funciona
+    aunque la petición DELETE llegue a otro worker. Los jobs en ejecución
+    renuevan `updated_at` (latido) en cada limpieza periódica; cualquier worker
+    marca como fallidos los que dejan de latir o siguen en cola al caducar.
+    """
+
+    def __init__(
+        self,
+        directory: str = JOBS_DIR,
+        max_workers: int = JOBS_MAX_WORKERS,
+        max_queued: int = JOBS_MAX_QUEUED,
+        ttl_seconds: int = JOBS_TTL_SECONDS,
+        stale_seconds: int = JOBS_STALE_SECONDS,
+    ):
+        self.directory = directory
+        self.max_workers = max(1, max_workers)
+        self.ttl_seconds = ttl_seconds
+        # Siempre por encima del intervalo del latido
+        self.stale_seconds = max(stale_seconds, 2 * self._cleanup_interval(ttl_seconds))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queued))
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    # --- ficheros -----------------------------------------------------------
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{job_id}{suffix}")
+
+    def _write_state(self, job: Dict[str, Any]) -> None:
+        """Escribir el estado de forma atómica (fichero temporal + rename)"""
+        job["updated_at"] = time.time()
+        path = self._path(job["id"], ".json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Leer el estado de un job (None si no existe o el id no es válido)"""
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        try:
+            with open(self._path(job_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        """Listar todos los jobs conocidos, más recientes primero"""
+        jobs = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                job = self.get(name[:-len(".json")])
+                if job:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def read_results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        """Leer un bloque de resultados sin cargar el fichero completo en memoria"""
+        results = []
+        try:
+            with open(self._path(job_id, ".jsonl"), encoding="utf-8") as f:
+                for index, line in enumerate(f):
+                    if index < offset:
+                        continue
+                    if len(results) >= limit:
+                        break
+                    results.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return results
+
+    # --- ciclo de vida --------------------------------------------------------
+
+    def start(self) -> None:
+        """Arrancar las tareas worker y la limpieza periódica"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self) -> None:
+        """Parar los workers; los jobs en curso o en cola de este proceso quedan como cancelados"""
+        tasks = self._workers + ([self._cleanup_task] if self._cleanup_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._cleanup_task = None
+
+        # La cola vive en memoria: sin este proceso nadie ejecutaría esos jobs
+        while not self.queue.empty():
+            job = self.get(self.queue.get_nowait())
+            self.queue.task_done()
+            if job is not None and job["status"] == "queued":
+                self._finish(job, "cancelled", "Server shut down before the job started")
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encolar un job y devolver su estado inicial.
+
+        Raises:
+            ValueError: Si el tipo de job no existe
+            asyncio.QueueFull: Si la cola está llena
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = time.time()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": now + self.ttl_seconds,
+            "progress": {"pages": 0, "elements": 0, "total": None},
+            "result_count": None,
+            "error": None,
+            "worker_pid": os.getpid(),
+        }
+        self.queue.put_nowait(job["id"])
+        self._write_state(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Solicitar la cancelación de un job pendiente o en ejecución"""
+        job = self.get(job_id)
+        if job is None or job["status"] in JOB_FINAL_STATES:
+            return job
+
+        open(self._path(job_id, ".cancel"), "w").close()
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        elif job["status"] == "queued":
+            self._finish(job, "cancelled")
+        return self.get(job_id)
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        return os.path.exists(self._path(job_id, ".cancel"))
+
+    def _finish(self, job: Dict[str, Any], status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        job.update({
+            "status": status,
+            "finished_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "error": error,
+        })
+        if status == "succeeded":
+            job["result_count"] = job["progress"]["elements"]
+        self._write_state(job)
+
+    # --- ejecución ------------------------------------------------------------
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self.queue.get()
+            try:
+                job = self.get(job_id)
+                if job is None or job["status"] != "queued":
+                    continue
+                if self._cancel_requested(job_id):
+                    self._finish(job, "cancelled")
+                    continue
+                task = asyncio.create_task(self._run(job))
+                self._running[job_id] = task
+                try:
+                    await asyncio.shield(task)
+                except asyncio.CancelledError:
+                    # Cancelación del propio worker (apagado): cancelar también el job
+                    if not task.done():
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                        raise
+                finally:
+                    self._running.pop(job_id, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in job worker ({job_id}): {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        job.update({"status": "running", "started_at": time.time(), "worker_pid": os.getpid()})
+        self._write_state(job)
+        logger.info(f"Job {job_id} started ({job['kind']})")
+
+        results_path = self._path(job_id, ".jsonl")
+        try:
+            crawl = JOB_KINDS[job["kind"]](job["params"])
+            with open(results_path, "w", encoding="utf-8") as out:
+                async for elements, total in client.iter_collection(**crawl):
+                    if self._cancel_requested(job_id):
+                        raise JobCancelled()
+                    for element in elements:
+                        out.write(json.dumps(element, default=str))
+                        out.write("\n")
+                    out.flush()
+                    progress = job["progress"]
+                    progress["pages"] += 1
+                    progress["elements"] += len(elements)
+                    progress["total"] = total
+                    self._write_state(job)
+        except (JobCancelled, asyncio.CancelledError):
+            self._finish(job, "cancelled")
+            logger.info(f"Job {job_id} cancelled")
+            return
+        except Exception as e:
+            logger.error(f"Error in job {job_id}: {e}")
+            self._finish(job, "failed", str(e))
+            return
+
+        self._finish(job, "succeeded")
+        logger.info(f"Job {job_id} succeeded ({job['result_count']} elements)")
+
+    # --- limpieza -------------------------------------------------------------
+
+    @staticmethod
+    def _cleanup_interval(ttl_seconds: int) -> int:
+        return min(60, max(1, ttl_seconds))
+
+    def heartbeat(self) -> None:
+        """Renovar `updated_at` de los jobs que este proceso está ejecutando"""
+        for job_id in list(self._running):
+            job = self.get(job_id)
+            if job is not None and job["status"] == "running":
+                self._write_state(job)
+
+    def cleanup(self) -> int:
+        """
+        Marcar como fallidos los jobs abandonados y borrar los ficheros de los
+        jobs finalizados cuyo TTL ha expirado.
+
+        Un job está abandonado si sigue en cola tras su `expires_at` (el worker
+        que lo encoló se paró) o si está en ejecución sin latido desde hace más
+        de `stale_seconds` (el worker que lo ejecutaba murió).
+        """
+        now = time.time()
+        removed = 0
+        for job in self.list_all():
+            if job["id"] in self._running:
+                continue
+            if job["status"] == "queued" and job["expires_at"] <= now:
+                self._finish(job, "failed", "Job was never started; its worker stopped")
+                continue
+            if job["status"] == "running":
+                last_seen = job.get("updated_at") or job["started_at"] or job["created_at"]
+                if now - last_seen > self.stale_seconds:
+                    self._finish(job, "failed", "Worker stopped while the job was running")
+                continue
+            if job["status"] in JOB_FINAL_STATES and job["expires_at"] <= now:
+                for suffix in (".json", ".jsonl", ".cancel"):
+                    try:
+                        os.remove(self._path(job["id"], suffix))
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        return removed
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._cleanup_interval(self.ttl_seconds))
+            try:
+                self.heartbeat()
+                removed = self.cleanup()
+                if removed:
+                    logger.info(f"Removed {removed} expired job(s)")
+            except OSError as e:
+                logger.error(f"Error cleaning up jobs: {e}")
+
+
+# Gestor de jobs del worker actual (se crea en el lifespan)
+jobs: Optional[JobManager] = None
+
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("/jobs", tags=["Jobs"], status_code=202, dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def submit_job(request: Request):
+    """
+    Lanzar una recuperación completa en segundo plano y devolver el id del job.
+
+    Body: {"kind": "list_work_packages", "params": {"project_id": 5, "status": "all"}}
+    """
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Body must be an object with kind and params")
+
+    kind = data.get("kind")
+    params = data.get("params") or {}
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="params must be an object")
+    if kind in ("list_work_packages", "list_project_members") and params.get("project_id") is None:
+        raise HTTPException(status_code=400, detail="project_id is required")
+
+    try:
+        job = jobs.submit(kind, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=429, detail="Job queue is full, try again later")
+
+    logger.info(f"Job {job['id']} queued ({kind})")
+    return job
+
+
+@router.get("/jobs", tags=["Jobs"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def list_jobs(request: Request):
+    """Listar los jobs y su estado"""
+    return {"jobs": jobs.list_all()}
+
+
+@router.get("/jobs/{job_id}", tags=["Jobs"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def get_job(request: Request, job_id: str):
+    """Consultar el estado y progreso (páginas, elementos) de un job"""
+    return _get_job_or_404(job_id)
+
+
+@router.get("/jobs/{job_id}/results", tags=["Jobs"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def get_job_results(
+    request: Request,
+    job_id: str,
+    offset: int = 0,
+    limit: int = JOBS_CHUNK_SIZE,
+):
+    """Descargar por bloques los resultados de un job finalizado"""
+    job = _get_job_or_404(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is {job['status']}, results are available once it succeeds",
+        )
+
+    offset = max(0, offset)
+    limit = max(1, min(limit, JOBS_CHUNK_SIZE))
+    elements = await asyncio.to_thread(jobs.read_results, job_id, offset, limit)
+    next_offset = offset + len(elements)
+
+    return {
+        "job_id": job_id,
+        "total": job["result_count"],
+        "offset": offset,
+        "count": len(elements),
+        "next_offset": next_offset if next_offset < job["result_count"] else None,
+        "_embedded": {"elements": elements},
+    }
+
+
+@router.delete("/jobs/{job_id}", tags=["Jobs"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def cancel_job(request: Request, job_id: str):
+    """Cancelar un job pendiente o en ejecución"""
+    _get_job_or_404(job_id)
+    return jobs.cancel(job_id)
+
+# ============================================================================
+# EXPORT - Descargas CSV/JSONL en streaming
+# ============================================================================
+
+# Campos ISO 8601 que se exportan como número de horas
+DURATION_FIELDS = {"hours", "estimatedTime", "remainingTime", "spentTime", "derivedEstimatedTime"}
+
+# Columnas por defecto de cada export
+EXPORT_COLUMNS = {
+    "work_packages": [
+        "id", "subject", "type", "status", "priority", "project", "assignee",
+        "responsible", "author", "startDate", "dueDate", "percentageDone",
+        "estimatedTime", "createdAt", "updatedAt",
+    ],
+    "time_entries": [
+        "id", "spentOn", "hours", "user", "project", "workPackage", "activity", "comment",
+    ],
+    "memberships": ["id", "project", "principal", "roles", "createdAt", "updatedAt"],
+}
+
+
+def flatten_column(element: Dict[str, Any], column: str) -> Any:
+    """
+    Obtener el valor plano de una columna de un recurso HAL.
+
+    Acepta rutas con puntos (`_links.assignee.href`, `description.raw`) o nombres
+    simples, que se resuelven en este orden: atributo escalar, texto formateado
+    (`raw`), título del link en `_links` y nombre del recurso en `_embedded`.
+    """
+    if "." in column:
+        value: Any = element
+        for part in column.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+    else:
+        value = element.get(column)
+        if value is None or isinstance(value, (dict, list)):
+            if isinstance(value, dict) and "raw" in value:
+                value = value["raw"]
+            elif column in element.get("_links", {}):
+                link = element["_links"][column]
+                value = (
+                    "; ".join(item.get("title") or "" for item in link)
+                    if isinstance(link, list) else link.get("title")
+                )
+            elif isinstance(element.get("_embedded", {}).get(column), dict):
+                value = element["_embedded"][column].get("name")
+
+    if column in DURATION_FIELDS and isinstance(value, str):
+        try:
+            return parse_iso_duration(value)
+        except ValueError:
+            return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+async def export_rows(
+    resource: str,
+    fmt: str,
+    columns: List[str],
+    compress: bool,
+    pages: AsyncIterator[Tuple[List[Dict], int]],
+    first_page: List[Dict],
+):
+    """
+    Generar el fichero exportado página a página.
+
+    Cada página de OpenProject se convierte en filas y se envía al cliente en
+    cuanto llega, así que la memoria usada no depende del tamaño del export.
+    La primera página ya se ha pedido antes de empezar la respuesta.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    async def all_pages():
+        yield first_page
+        async for elements, _total in pages:
+            yield elements
+
+    rows = 0
+    try:
+        async for elements in all_pages():
+            for element in elements:
+                values = [flatten_column(element, column) for column in columns]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), default=str))
+                    buffer.write("\n")
+            rows += len(elements)
+            chunk = encode(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            if chunk:
+                yield chunk
+        chunk = encode(buffer.getvalue())
+        if chunk:
+            yield chunk
+        if compressor:
+            yield compressor.flush()
+        logger.info(f"Export complete: {resource}.{fmt} ({rows} rows)")
+    except Exception as e:
+        # La respuesta ya está en curso: solo se puede cortar el stream
+        logger.error(f"Error in export {resource}.{fmt} after {rows} rows: {e}")
+        raise
+
+
+@router.get("/export/{resource}.{fmt}", tags=["Export"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def export(
+    request: Request,
+    resource: str,
+    fmt: str,
+    columns: Optional[str] = None,
+    gzip: bool = False,
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    work_package_id: Optional[int] = None,
+    status: str = "all",
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    """
+    Exportar work packages, entradas de tiempo o membresías en CSV o JSONL.
+
+    Ejemplo: /export/time_entries.csv?project_id=5&from_date=2025-01-01&gzip=true
+    """
+    if resource not in EXPORT_COLUMNS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export: {resource} (expected {', '.join(EXPORT_COLUMNS)})",
+        )
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=404, detail="Format must be csv or jsonl")
+
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else EXPORT_COLUMNS[resource]
+
+    try:
+        if resource == "work_packages":
+            endpoint = "/work_packages"
+            filters = _work_package_filters(project_id, status)
+        elif resource == "time_entries":
+            endpoint = "/time_entries"
+            filters = time_entry_filters(
+                project_id=project_id,
+                user_id=user_id,
+                work_package_id=work_package_id,
+                from_date=from_date,
+                to_date=to_date,
+            )
+        else:
+            endpoint = "/memberships"
+            filters = _filters_for(project=project_id, principal=user_id) or []
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # filters se envía siempre (aunque sea "[]") para no heredar el filtro
+    # por defecto de OpenProject (solo work packages abiertos)
+    pages = client.iter_collection(
+        endpoint, page_size=EXPORT_PAGE_SIZE, params={"filters": json.dumps(filters)}
+    )
+    # Pedir la primera página antes de responder: una vez enviado el 200 un
+    # error de OpenProject solo podría cortar el fichero
+    try:
+        first_page, _total = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = []
+    except Exception as e:
+        logger.error(f"Error in export {resource}.{fmt}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    filename = f"{resource}.{fmt}" + (".gz" if gzip else "")
+    media_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(resource, fmt, selected, gzip, pages, first_page),
+        media_type="application/gzip" if gzip else media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# ============================================================================
+# IMPORT - Carga masiva de entradas de tiempo
+# ============================================================================
+
+async def stream_import_rows(request: Request, fmt: str):
+    """Parsear el cuerpo de la petición según llega (sin cargarlo entero en memoria)"""
+    parser = ImportRowParser(fmt)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in request.stream():
+        for row in parser.feed(decoder.decode(chunk)):
+            yield row
+    for row in parser.feed(decoder.decode(b"", final=True)) + parser.close():
+        yield row
+
+
+@router.post("/import/time_entries", tags=["Import"], dependencies=[Depends(verify_credentials)])
+@limiter.limit(RATE_LIMIT)
+async def import_time_entries(
+    request: Request,
+    format: Optional[str] = None,
+    dry_run: bool = False,
+    concurrency: Optional[int] = None
+):
+    """
+    Crear entradas de tiempo en bloque desde un CSV (con cabecera) o JSONL.
+
+    El fichero va en el cuerpo de la petición, p. ej.:
+    curl --data-binary @horas.csv -H "Content-Type: text/csv" /import/time_entries
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "jsonl" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="format must be csv or jsonl")
+    if concurrency is not None:
+        concurrency = max(1, min(concurrency, IMPORT_MAX_CONCURRENCY))
+
+    try:
+        return await client.import_time_entries(
+            stream_import_rows(request, format), concurrency=concurrency, dry_run=dry_run
+        )
+    except Exception as e:
+        logger.error(f"Error in import_time_entries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================================================
+# WEBHOOKS - Cambios notificados por OpenProject
+# ============================================================================
+
+def verify_webhook_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Comprobar la cabecera X-OP-Signature (`sha1=<HMAC-SHA1 hex del cuerpo>`)"""
+    if not signature:
+        return False
+    expected = "sha1=" + hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha1).hexdigest()
+    return hmac.compare_digest(expected, signature.strip())
+
+
+# Sin rate limit: OpenProject envía ráfagas al editar en bloque y la firma ya
+# filtra a quien no conoce el secreto
+@router.post("/webhooks/openproject", tags=["Webhooks"], status_code=202)
+async def receive_webhook(request: Request):
+    """Recibir un webhook de OpenProject y publicarlo en el flujo de cambios"""
+    if not WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Webhooks disabled (WEBHOOK_SECRET not set)")
+    body = await request.body()
+    if not verify_webhook_signature(body, request.headers.get("X-OP-Signature")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        event = normalize_webhook(json.loads(body))
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not client.changes.publish(event):
+        # Cola llena: OpenProject reintentará la entrega
+        raise HTTPException(status_code=503, detail="Change queue full")
+    return {
+        "accepted": True,
+        "resource": event["resource"],
+        "action": event["action"],
+        "id": event["id"],
+    }
+
+
+@router.get("/changes", tags=["Webhooks"], dependencies=[Depends(verify_credentials)])
+async def stream_changes(request: Request, include_payload: bool = False):
+    """Flujo de cambios en vivo (Server-Sent Events) de este worker"""
+    queue = client.changes.subscribe()
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": keep-alive\n\n"
+                    continue
+                if not include_payload:
+                    event = {key: value for key, value in event.items() if key != "payload"}
+                yield f"event: {event['resource']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            client.changes.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 # ============================================================================
 # ENDPOINT GENÉRICO (Compatibilidad)
 # ============================================================================
 
-@app.post("/query", dependencies=[Depends(verify_credentials)])
+@router.post("/query", dependencies=[Depends(verify_credentials)])
 @limiter.limit(RATE_LIMIT)
 async def query(request: Request):
     """
@@ -1328,11 +2517,127 @@ async def query(request: Request):
         return await list_work_packages(
             request,
             project_id=project_id,
-            status=params.get("status", "open")
+            status=params.get("status", "open"),
+            sort_by=params.get("sort_by"),
+            **{key: params.get(key) for key in WORK_PACKAGE_CRITERIA},
         )
     else:
         raise HTTPException(status_code=400, detail=f"Unknown tool: {tool}")
 
+# ============================================================================
+# APP FACTORY
+# ============================================================================
+
+class RequestScopeMiddleware:
+    """
+    Middleware ASGI que abre un `request_scope()` del cliente por petición HTTP:
+    las búsquedas por id (usuarios, proyectos, work packages) que coinciden en
+    la misma petición se agrupan en una sola consulta y se reutilizan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with OpenProjectClient.request_scope():
+            await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Crear el cliente OpenProject (y su pool de conexiones) por worker y cerrarlo al salir"""
+    global client, jobs
+    client = OpenProjectClient(
+        base_url=OPENPROJECT_URL,
+        api_key=OPENPROJECT_API_KEY,
+        proxy=OPENPROJECT_PROXY
+    )
+    app.state.client = client
+    logger.info(f"OpenProject Client initialized for: {OPENPROJECT_URL} (pid {os.getpid()})")
+
+    jobs = JobManager()
+    jobs.start()
+    app.state.jobs = jobs
+
+    # El calentamiento corre en segundo plano: /health responde ya y /health/ready
+    # espera a que termine
+    app.state.warmup = asyncio.create_task(client.warm_up()) if WARMUP_ON_STARTUP else None
+    try:
+        yield
+    finally:
+        if app.state.warmup is not None and not app.state.warmup.done():
+            app.state.warmup.cancel()
+        await jobs.stop()
+        await client.close()
+        logger.info(f"OpenProject Client closed (pid {os.getpid()})")
+
+
+def create_app() -> FastAPI:
+    """
+    Construir la aplicación FastAPI.
+
+    Se usa tanto para el `app` del módulo como como factory de uvicorn
+    (`uvicorn server_http:create_app --factory --workers N`), de modo que cada
+    worker crea su propio cliente y sesión HTTP dentro de su event loop.
+    """
+    app = FastAPI(
+        title="OpenProject MCP HTTP Adapter",
+        description="API REST para acceder a todas las funcionalidades de OpenProject MCP",
+        version="1.1.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+        openapi_tags=[
+            {"name": "Info", "description": "Información del servidor"},
+            {"name": "Core", "description": "Funcionalidades principales"},
+            {"name": "Projects", "description": "Gestión de proyectos"},
+            {"name": "Work Packages", "description": "Gestión de work packages"},
+            {"name": "Work Package Relations", "description": "Relaciones entre work packages"},
+            {"name": "Users", "description": "Gestión de usuarios"},
+            {"name": "Memberships", "description": "Gestión de membresías"},
+            {"name": "Roles", "description": "Gestión de roles"},
+            {"name": "Time Tracking", "description": "Seguimiento de tiempo"},
+            {"name": "Versions", "description": "Gestión de versiones"},
+            {"name": "REST Aliases", "description": "Endpoints REST simplificados"},
+            {"name": "Batch", "description": "Ejecución de varias herramientas en una petición"},
+            {"name": "Jobs", "description": "Recuperaciones largas en segundo plano"},
+            {"name": "Export", "description": "Exportación CSV/JSONL en streaming"},
+            {"name": "Import", "description": "Importación masiva en streaming"},
+            {"name": "Webhooks", "description": "Webhooks de OpenProject y flujo de cambios"},
+        ],
+        servers=[{"url": OPENAPI_BASE_URL}]
+    )
+
+    # Configurar Rate Limiter
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    # Configurar CORS
+    if CORS_ENABLED:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=CORS_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+    # Configurar GZIP
+    if GZIP_ENABLED:
+        app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
+    app.add_middleware(RequestScopeMiddleware)
+
+    app.include_router(router)
+    return app
+
+
+# Aplicación por defecto (compatibilidad con `uvicorn server_http:app`)
+app = create_app()
+
 # ============================================================================
 # INICIALIZACIÓN
 # ============================================================================
@@ -1344,16 +2649,20 @@ if __name__ == "__main__":
     logger.info(f"📍 Conectado a: {OPENPROJECT_URL}")
     logger.info(f"🔐 Autenticación HTTP: {'Habilitada' if HTTP_AUTH_ENABLED else 'Deshabilitada'}")
     logger.info(f"🌐 CORS: {'Habilitado' if CORS_ENABLED else 'Deshabilitado'}")
-    logger.info(f"⚡ Rate limit: {RATE_LIMIT}")
+    logger.info(f"⚡ Rate limit: {RATE_LIMIT} ({RATE_LIMIT_STORAGE_URI})")
+    logger.info(f"🧵 Workers: {HTTP_WORKERS}")
     logger.info(f"🚀 Iniciando servidor en http://{HTTP_HOST}:{HTTP_PORT}")
     logger.info(f"📚 Documentación disponible en http://{HTTP_HOST}:{HTTP_PORT}/docs")
     
     if GZIP_ENABLED:
         logger.info(f"Compresión GZIP habilitada (mínimo {GZIP_MIN_SIZE}B)")
     
+    # Con varios workers uvicorn necesita la ruta de importación de la factory
     uvicorn.run(
-        app,
+        "server_http:create_app",
+        factory=True,
         host=HTTP_HOST,
         port=HTTP_PORT,
+        workers=HTTP_WORKERS,
         log_level=LOG_LEVEL.lower()
     )